@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark do caminho binário das imagens (QR codes)
+
+Compara, por imagem, a latência e o pico de memória (tracemalloc) de:
+
+- antes: ``response.content`` -> ``Image`` -> base64 feito pelo FastMCP;
+- blob: corpo codificado em base64 bloco a bloco (``get_blob``);
+- blob em cache: a mesma imagem de novo (sem busca nem codificação).
+
+A origem é simulada e entrega o corpo em blocos de 16 KB.
+
+Uso:
+    uv run python benchmarks/bench_blobs.py [--size-kb 256] [--rounds 50]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcp.server.fastmcp.utilities.types import Image
+
+from mcp_server_one.api_client import APIClient
+
+
+CHUNK = 16 * 1024
+
+
+class ChunkedBody(httpx.AsyncByteStream):
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def __aiter__(self):
+        for i in range(0, len(self.data), CHUNK):
+            yield self.data[i:i + CHUNK]
+
+
+def make_client(payload: bytes) -> APIClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, stream=ChunkedBody(payload),
+            headers={"content-type": "image/png", "content-length": str(len(payload))},
+        )
+
+    client = APIClient()
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+async def before(client: APIClient, url: str) -> str:
+    data = await client.get_bytes(url)
+    return Image(data=data, format="png").to_image_content().data
+
+
+async def blob(client: APIClient, url: str) -> str:
+    return (await client.get_blob(url)).data
+
+
+async def measure(fetch, client: APIClient, rounds: int, fresh: bool):
+    samples, peaks = [], []
+    for i in range(rounds):
+        url = f"https://qr.test/png?data={i if fresh else 0}"
+        tracemalloc.start()
+        start = time.perf_counter()
+        data = await fetch(client, url)
+        samples.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del data
+        # Sem guardar os blobs das rodadas anteriores no pico seguinte
+        if fresh:
+            client.blobs = type(client.blobs)(client.blobs.max_bytes)
+    return samples, peaks
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-kb", type=int, default=256)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    payload = os.urandom(args.size_kb * 1024)
+    print(f"Imagem de {args.size_kb} KB, {args.rounds} rodadas")
+    cases = (
+        ("antes (bytes + Image)", before, True),
+        ("blob (base64 em blocos)", blob, True),
+        ("blob em cache", blob, False),
+    )
+    for label, fetch, fresh in cases:
+        client = make_client(payload)
+        await fetch(client, "https://qr.test/png?data=0")  # aquecimento
+        samples, peaks = await measure(fetch, client, args.rounds, fresh)
+        print(
+            f"  {label}: mediana {statistics.median(samples) * 1000:.2f} ms, "
+            f"pico {statistics.median(peaks) / 1024:.0f} KB "
+            f"({statistics.median(peaks) / len(payload):.1f}x a imagem)"
+        )
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark do custo de despacho das ferramentas geradas pelo registro
+
+Compara uma ferramenta gerada a partir de upstreams.py (get_post_by_id) com
+uma equivalente escrita à mão, ambas chamadas pelo protocolo MCP (sessão
+em memória) com a resposta da origem já em cache.
+
+Uso:
+    uv run python benchmarks/bench_dispatch.py [--calls 2000]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Annotated, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import httpx
+from mcp.server.fastmcp import Context
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.shared.memory import create_connected_server_and_client_session
+from mcp.types import CallToolResult
+
+from mcp_server_one import server
+from mcp_server_one.api_client import APIManager, track_freshness
+from mcp_server_one.models import Post
+from mcp_server_one.projection import parse_fields, project
+
+
+POST = {"userId": 1, "id": 1, "title": "Post 1", "body": "Body 1"}
+
+
+def upstream(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json=POST)
+
+
+def make_api_manager() -> APIManager:
+    manager = APIManager()
+    manager.client.client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    return manager
+
+
+async def reference_get_post_by_id(
+    post_id: int, fields: Optional[List[str]] = None, ctx: Context = None
+) -> Annotated[CallToolResult, Post]:
+    """Versão escrita à mão de get_post_by_id (referência)"""
+    try:
+        app_ctx = server.mcp.get_context().request_context.lifespan_context
+        with track_freshness() as freshness:
+            post = await app_ctx.api_manager.jsonplaceholder.get_post(post_id)
+        if ctx:
+            await ctx.info(f"Buscando post {post_id}")
+        return server._structured_result(project(post, parse_fields(fields)), freshness)
+    except Exception as e:
+        raise ToolError(str(e)) from e
+
+
+async def measure(client, tool: str, calls: int) -> list:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        result = await client.call_tool(tool, {"post_id": 1})
+        samples.append(time.perf_counter() - start)
+        assert not result.isError
+    return samples
+
+
+async def run(calls: int) -> None:
+    server.APIManager = make_api_manager
+    server.mcp.add_tool(reference_get_post_by_id)
+    async with create_connected_server_and_client_session(server.mcp._mcp_server) as client:
+        # Aquece o cache e os caminhos de validação
+        await measure(client, "get_post_by_id", 50)
+        await measure(client, "reference_get_post_by_id", 50)
+        generated = await measure(client, "get_post_by_id", calls)
+        reference = await measure(client, "reference_get_post_by_id", calls)
+
+    print(f"despacho por chamada ({calls} chamadas, cache quente)")
+    for name, samples in (("gerada", generated), ("manual", reference)):
+        print(
+            f"  {name}: mediana {statistics.median(samples) * 1e6:.0f} µs, "
+            f"p95 {sorted(samples)[int(len(samples) * 0.95)] * 1e6:.0f} µs"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Teste de carga do servidor sobre um cassete gravado (sem rede)
+
+Faz chamadas de ferramentas em paralelo, pelo protocolo MCP (sessão em
+memória), com as APIs de origem servidas por ``ReplayTransport``. A latência
+gravada pode ser reduzida ou ampliada com ``--latency-scale``.
+
+Sem ``--cassette``, usa um cassete sintético no formato do JSONPlaceholder
+(100 posts, 10 usuários, 500 comentários, 50 ms por requisição). Para gravar
+um cassete real:
+
+    uv run mcp-server-one --record cassete.jsonl.gz
+
+Uso:
+    uv run python benchmarks/bench_load.py [--cassette cassete.jsonl.gz]
+        [--calls 2000] [--concurrency 32] [--latency-scale 1.0]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from mcp_server_one import server
+from mcp_server_one.replay import CASSETTE_ENV, LATENCY_SCALE_ENV, MODE_ENV
+
+
+BASE_URL = "https://jsonplaceholder.typicode.com"
+
+
+def synthetic_cassette(path: str, elapsed: float = 0.05) -> None:
+    posts = [
+        {"userId": i % 10 + 1, "id": i, "title": f"Post {i}", "body": f"Corpo do post {i}"}
+        for i in range(1, 101)
+    ]
+    users = [{"id": i, "name": f"Usuário {i}", "username": f"user{i}"} for i in range(1, 11)]
+    comments = [
+        {"postId": i // 5 + 1, "id": i, "name": f"Comentário {i}",
+         "email": f"c{i}@example.com", "body": "Texto"}
+        for i in range(500)
+    ]
+    responses = {"/posts": posts, "/users": users, "/comments": comments}
+    responses.update({f"/posts/{post['id']}": post for post in posts})
+    responses.update({f"/users/{user['id']}": user for user in users})
+    responses.update({
+        f"/posts/{i}/comments": [c for c in comments if c["postId"] == i] for i in range(1, 101)
+    })
+    with open(path, "w", encoding="utf-8") as file:
+        for url_path, body in responses.items():
+            file.write(json.dumps({
+                "method": "GET", "url": BASE_URL + url_path, "status": 200,
+                "headers": {"content-type": "application/json"},
+                "body": json.dumps(body), "elapsed": elapsed,
+            }) + "\n")
+
+
+def calls(rng: random.Random, count: int):
+    for _ in range(count):
+        choice = rng.random()
+        if choice < 0.4:
+            yield "get_post_by_id", {"post_id": rng.randint(1, 100)}
+        elif choice < 0.6:
+            yield "get_comments", {"post_id": rng.randint(1, 100)}
+        elif choice < 0.8:
+            yield "get_user_by_id", {"user_id": rng.randint(1, 10)}
+        else:
+            yield "get_posts", {"limit": 10}
+
+
+async def run(args) -> None:
+    samples = []
+    errors = 0
+    queue = list(calls(random.Random(42), args.calls))
+
+    async with create_connected_server_and_client_session(server.mcp._mcp_server) as client:
+        async def worker():
+            nonlocal errors
+            while queue:
+                name, arguments = queue.pop()
+                start = time.perf_counter()
+                result = await client.call_tool(name, arguments)
+                samples.append(time.perf_counter() - start)
+                errors += bool(result.isError)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        total = time.perf_counter() - start
+
+    samples.sort()
+    print(
+        f"{len(samples)} chamadas em {total:.2f} s ({len(samples) / total:.0f}/s), "
+        f"{errors} erros"
+    )
+    print(
+        f"  latência: mediana {statistics.median(samples) * 1000:.1f} ms, "
+        f"p95 {samples[int(len(samples) * 0.95)] * 1000:.1f} ms, "
+        f"máx {samples[-1] * 1000:.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cassette")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    args = parser.parse_args()
+    # Um log por requisição atrapalharia a medição
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cassette = args.cassette
+        if cassette is None:
+            cassette = os.path.join(tmp, "sintetico.jsonl")
+            synthetic_cassette(cassette)
+        os.environ[MODE_ENV] = "replay"
+        os.environ[CASSETTE_ENV] = cassette
+        os.environ[LATENCY_SCALE_ENV] = str(args.latency_scale)
+        print(f"Cassete: {args.cassette or 'sintético'}, escala de latência {args.latency_scale}")
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Atraso do event loop com chamadas pequenas e grandes misturadas
+
+Chamadas pequenas (um post) concorrem com chamadas grandes (todos os
+comentários, sem paginação) sobre um cassete sintético, sem rede. Compara
+o JSON grande no próprio loop (``MCP_OFFLOAD_WORKERS=0``) com o pool de
+threads e o de processos: atraso do loop, vazão e latência das chamadas
+pequenas.
+
+Uso:
+    uv run python benchmarks/bench_offload.py [--comments 20000]
+        [--calls 400] [--large-ratio 0.1] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from mcp_server_one import server
+from mcp_server_one.config import OFFLOAD_KIND_ENV, OFFLOAD_WORKERS_ENV
+from mcp_server_one.metrics import metrics
+from mcp_server_one.replay import CASSETTE_ENV, LATENCY_SCALE_ENV, MODE_ENV
+from mcp_server_one.watchdog import LoopMonitor
+
+
+BASE_URL = "https://jsonplaceholder.typicode.com"
+
+
+def synthetic_cassette(path: str, comments: int) -> int:
+    body = [
+        {"postId": i // 5 + 1, "id": i, "name": f"Comentário {i}",
+         "email": f"c{i}@example.com", "body": "Texto de exemplo " * 10}
+        for i in range(comments)
+    ]
+    large = json.dumps(body)
+    with open(path, "w", encoding="utf-8") as file:
+        for url_path, data in (("/comments", large), ("/posts/1", json.dumps({"id": 1}))):
+            file.write(json.dumps({
+                "method": "GET", "url": BASE_URL + url_path, "status": 200,
+                "headers": {"content-type": "application/json"},
+                "body": data, "elapsed": 0.01,
+            }) + "\n")
+    return len(large)
+
+
+async def run(args) -> None:
+    rng = random.Random(42)
+    queue = [rng.random() < args.large_ratio for _ in range(args.calls)]
+    small = []
+    monitor = LoopMonitor(interval=0.005)
+
+    async with create_connected_server_and_client_session(server.mcp._mcp_server) as client:
+        await client.call_tool("get_comments", {"max_tokens": 10**9})  # aquece o cache
+        # O cliente valida o structuredContent com jsonschema no mesmo loop
+        # (mais de 1 s por resposta grande); aqui só interessa o servidor
+        client._tool_output_schemas = dict.fromkeys(client._tool_output_schemas)
+
+        async def worker():
+            while queue:
+                large = queue.pop()
+                start = time.perf_counter()
+                if large:
+                    await client.call_tool("get_comments", {"max_tokens": 10**9})
+                else:
+                    await client.call_tool("get_post_by_id", {"post_id": 1})
+                    small.append(time.perf_counter() - start)
+
+        monitor.start()
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        total = time.perf_counter() - start
+        await monitor.stop()
+
+    small.sort()
+    print(
+        f"  {args.calls / total:6.1f} chamadas/s | pequenas: mediana "
+        f"{statistics.median(small) * 1000:6.1f} ms, p95 "
+        f"{small[int(len(small) * 0.95)] * 1000:6.1f} ms | atraso do loop: "
+        f"máx {monitor.max_lag * 1000:6.1f} ms, {slow_share():.0%} das amostras acima de 10 ms"
+    )
+
+
+def slow_share() -> float:
+    """Fração das medidas do loop com atraso acima de 10 ms"""
+    histogram = metrics.snapshot()["histograms"]["event_loop_lag_seconds"]
+    slow = sum(count for bound, count in histogram["buckets"].items()
+               if bound == "+Inf" or float(bound) > 0.01)
+    return slow / max(1, histogram["count"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--large-ratio", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cassette = os.path.join(tmp, "sintetico.jsonl")
+        size = synthetic_cassette(cassette, args.comments)
+        os.environ[MODE_ENV] = "replay"
+        os.environ[CASSETTE_ENV] = cassette
+        os.environ[LATENCY_SCALE_ENV] = "1.0"
+        print(f"Resposta grande: {size / 1e6:.1f} MB, {args.large_ratio:.0%} das chamadas")
+        for label, workers, kind in (("no loop", "0", "thread"),
+                                     ("threads", "2", "thread"),
+                                     ("processos", "2", "process")):
+            os.environ[OFFLOAD_WORKERS_ENV] = workers
+            os.environ[OFFLOAD_KIND_ENV] = kind
+            metrics.reset()
+            print(f"{label}:")
+            asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
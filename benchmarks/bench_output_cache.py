@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Vazão de chamadas repetidas servidas do cache, com e sem resultados prontos
+
+Repete ``get_users`` e ``get_posts`` (com e sem projeção) sobre um cassete
+sintético do tamanho das respostas reais do JSONPlaceholder, sem rede. Com
+o cache de respostas já aquecido, compara o caminho completo (decodificar,
+projetar, validar e serializar a cada chamada) com os resultados prontos
+(``MCP_OUTPUT_CACHE_ENTRIES``). Mede a vazão e o tempo de CPU por chamada
+(cliente e servidor rodam no mesmo processo).
+
+Uso:
+    uv run python benchmarks/bench_output_cache.py [--calls 2000] [--posts 100]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from mcp_server_one import server
+from mcp_server_one.config import OUTPUT_CACHE_ENV
+from mcp_server_one.metrics import metrics
+from mcp_server_one.replay import CASSETTE_ENV, LATENCY_SCALE_ENV, MODE_ENV
+
+
+BASE_URL = "https://jsonplaceholder.typicode.com"
+
+CALLS = (
+    ("get_users", {}),
+    ("get_posts", {}),
+    ("get_posts", {"fields": ["id", "title"]}),
+)
+
+
+def synthetic_cassette(path: str, posts: int) -> None:
+    users = [
+        {"id": i, "name": f"Usuário {i}", "username": f"user{i}", "email": f"u{i}@example.com",
+         "address": {"street": "Rua A", "suite": "Apt. 1", "city": "Cidade",
+                     "zipcode": "00000-000", "geo": {"lat": "0", "lng": "0"}},
+         "phone": "1-770-736-8031", "website": "example.com",
+         "company": {"name": "Empresa", "catchPhrase": "Frase", "bs": "bs"}}
+        for i in range(1, 11)
+    ]
+    body = [
+        {"userId": i // 10 + 1, "id": i, "title": f"Título do post {i}",
+         "body": "Texto de exemplo do post " * 8}
+        for i in range(1, posts + 1)
+    ]
+    with open(path, "w", encoding="utf-8") as file:
+        for url_path, data in (("/users", users), ("/posts", body)):
+            file.write(json.dumps({
+                "method": "GET", "url": BASE_URL + url_path, "status": 200,
+                "headers": {"content-type": "application/json"},
+                "body": json.dumps(data), "elapsed": 0.0,
+            }) + "\n")
+
+
+async def run(calls: int) -> None:
+    async with create_connected_server_and_client_session(server.mcp._mcp_server) as client:
+        for name, arguments in CALLS:
+            await client.call_tool(name, arguments)  # aquece os caches
+        # A validação do structuredContent no cliente não faz parte do servidor
+        client._tool_output_schemas = dict.fromkeys(client._tool_output_schemas)
+
+        start, cpu = time.perf_counter(), time.process_time()
+        for i in range(calls):
+            name, arguments = CALLS[i % len(CALLS)]
+            await client.call_tool(name, arguments)
+        elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+
+    hits = sum(value for key, value in metrics.snapshot()["counters"].items()
+               if key.startswith("output_cache_requests{result=hit"))
+    print(f"  {calls / elapsed:7.1f} chamadas/s | {cpu / calls * 1e6:7.0f} µs de CPU por chamada "
+          f"| {hits} resultados prontos")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--posts", type=int, default=100)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cassette = os.path.join(tmp, "sintetico.jsonl")
+        synthetic_cassette(cassette, args.posts)
+        os.environ[MODE_ENV] = "replay"
+        os.environ[CASSETTE_ENV] = cassette
+        os.environ[LATENCY_SCALE_ENV] = "0"
+        for label, entries in (("sem resultados prontos", "0"), ("com resultados prontos", "256")):
+            os.environ[OUTPUT_CACHE_ENV] = entries
+            metrics.reset()
+            print(f"{label}:")
+            asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark da busca textual (índice invertido + BM25)
+
+Indexa um corpus sintético do tamanho do JSONPlaceholder (100 posts e 500
+comentários) e mede a latência das consultas, com e sem prefixo.
+
+Uso:
+    uv run python benchmarks/bench_search.py [--queries 2000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcp_server_one.search import SearchIndex
+
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud "
+    "exercitation ullamco laboris nisi aliquip ex ea commodo consequat duis aute irure "
+    "reprehenderit voluptate velit esse cillum fugiat nulla pariatur excepteur sint "
+    "occaecat cupidatat non proident sunt culpa qui officia deserunt mollit anim id est"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def corpus(rng: random.Random, count: int, body_words: int):
+    return [
+        {"id": i, "title": sentence(rng, 6), "name": sentence(rng, 5), "body": sentence(rng, body_words)}
+        for i in range(1, count + 1)
+    ]
+
+
+def measure(index: SearchIndex, queries, prefix: bool):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, prefix=prefix)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    datasets = {
+        "posts": (SearchIndex(("title", "body")), corpus(rng, 100, 30)),
+        "comments": (SearchIndex(("name", "body")), corpus(rng, 500, 25)),
+    }
+    queries = [" ".join(rng.sample(WORDS, 2)) for _ in range(args.queries)]
+    prefixes = [query[:4] for query in queries]
+
+    for name, (index, items) in datasets.items():
+        start = time.perf_counter()
+        index.sync(items)
+        build = time.perf_counter() - start
+        print(f"{name}: {len(items)} documentos indexados em {build * 1000:.1f} ms")
+        for label, batch, prefix in (("termos", queries, False), ("prefixo", prefixes, True)):
+            samples = measure(index, batch, prefix)
+            print(
+                f"  {label}: mediana {statistics.median(samples) * 1e6:.0f} µs, "
+                f"p95 {sorted(samples)[int(len(samples) * 0.95)] * 1e6:.0f} µs"
+            )
+
+
+if __name__ == "__main__":
+    main()
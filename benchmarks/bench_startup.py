@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark do tempo de inicialização do servidor via stdio
+
+Mede o tempo entre iniciar o processo `python -m mcp_server_one.main` e
+receber a resposta do `initialize`, como acontece quando o Claude Desktop
+abre uma sessão.
+
+Uso:
+    uv run python benchmarks/bench_startup.py [--runs 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "bench-startup", "version": "0.1.0"},
+    },
+}
+
+
+def time_to_initialize() -> float:
+    """Inicia o servidor e retorna os segundos até a resposta do initialize"""
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    env = {**os.environ, "PYTHONPATH": os.path.abspath(src)}
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "mcp_server_one.main"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+    )
+    try:
+        proc.stdin.write((json.dumps(INITIALIZE) + "\n").encode())
+        proc.stdin.flush()
+        line = proc.stdout.readline()
+        elapsed = time.perf_counter() - start
+        if b'"result"' not in line:
+            raise RuntimeError(f"Resposta inesperada: {line!r}")
+        return elapsed
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    samples = [time_to_initialize() for _ in range(args.runs)]
+    print(f"time-to-initialize ({args.runs} execuções)")
+    print(f"  mediana: {statistics.median(samples) * 1000:.1f} ms")
+    print(f"  mínimo:  {min(samples) * 1000:.1f} ms")
+    print(f"  máximo:  {max(samples) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
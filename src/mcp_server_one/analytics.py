@@ -0,0 +1,128 @@
+"""
+Agregações calculadas no servidor sobre os dados do JSONPlaceholder
+"""
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+
+def _email_domain(email: Optional[str]) -> str:
+    return (email or "").rsplit("@", 1)[-1].lower()
+
+
+class AnalyticsIndex:
+    """Contadores mantidos sobre as listas de todos, posts e comentários
+
+    Cada lista é sincronizada com ``sync``: se for a mesma lista (ou a mesma
+    versão) da última vez nada é feito; caso contrário, só os itens
+    adicionados, removidos ou alterados atualizam os contadores.
+    """
+
+    def __init__(self) -> None:
+        self._sources: Dict[str, Sequence[Dict[str, Any]]] = {}
+        self._versions: Dict[str, Any] = {}
+        self._items: Dict[str, Dict[Any, Dict[str, Any]]] = {
+            "todos": {}, "posts": {}, "comments": {},
+        }
+        self._apply: Dict[str, Callable[[Dict[str, Any], int], None]] = {
+            "todos": self._apply_todo,
+            "posts": self._apply_post,
+            "comments": self._apply_comment,
+        }
+        self.todos_total: Counter = Counter()
+        self.todos_completed: Counter = Counter()
+        self.posts_by_user: Dict[Any, Set[Any]] = defaultdict(set)
+        self.comments_by_post: Counter = Counter()
+        self.comments_by_domain: Counter = Counter()
+
+    def sync(self, name: str, items: Sequence[Dict[str, Any]], version: Any = None) -> int:
+        """Atualiza os contadores do conjunto ``name``; retorna quantos itens mudaram
+
+        ``version`` identifica o conteúdo de ``items`` (por exemplo, a entrada
+        do cache de onde a lista foi decodificada, um objeto novo a cada
+        leitura): com a mesma versão da última vez, nada é comparado.
+        """
+        if version is not None:
+            if self._versions.get(name) == version:
+                return 0
+        elif self._sources.get(name) is items:
+            return 0
+        apply = self._apply[name]
+        current = self._items[name]
+        latest = {item.get("id"): item for item in items}
+        changed = 0
+        for item_id in current.keys() - latest.keys():
+            apply(current[item_id], -1)
+            changed += 1
+        for item_id, item in latest.items():
+            old = current.get(item_id)
+            if old != item:
+                if old is not None:
+                    apply(old, -1)
+                apply(item, 1)
+                changed += 1
+        self._items[name] = latest
+        self._sources[name] = items
+        self._versions[name] = version
+        return changed
+
+    def version(self, name: str) -> Any:
+        """Versão da última lista sincronizada em ``name`` (ver ``sync``)"""
+        return self._versions.get(name)
+
+    def _apply_todo(self, todo: Dict[str, Any], sign: int) -> None:
+        user_id = todo.get("userId")
+        self.todos_total[user_id] += sign
+        if todo.get("completed"):
+            self.todos_completed[user_id] += sign
+
+    def _apply_post(self, post: Dict[str, Any], sign: int) -> None:
+        posts = self.posts_by_user[post.get("userId")]
+        if sign > 0:
+            posts.add(post.get("id"))
+        else:
+            posts.discard(post.get("id"))
+
+    def _apply_comment(self, comment: Dict[str, Any], sign: int) -> None:
+        self.comments_by_post[comment.get("postId")] += sign
+        self.comments_by_domain[_email_domain(comment.get("email"))] += sign
+
+    def todo_stats(self, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Todos completados e pendentes por usuário"""
+        users = [user_id] if user_id is not None else sorted(+self.todos_total)
+        stats = []
+        for user in users:
+            total = self.todos_total[user]
+            completed = self.todos_completed[user]
+            stats.append({
+                "user_id": user,
+                "total": total,
+                "completed": completed,
+                "pending": total - completed,
+                "completion_rate": round(completed / total, 3) if total else 0.0,
+            })
+        return stats
+
+    def user_activity(self, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Número de posts e de comentários recebidos por usuário"""
+        if user_id is not None:
+            users = [user_id]
+        else:
+            users = sorted(user for user, posts in self.posts_by_user.items() if posts)
+        return [
+            {
+                "user_id": user,
+                "posts": len(self.posts_by_user.get(user, ())),
+                "comments": sum(
+                    self.comments_by_post[post_id]
+                    for post_id in self.posts_by_user.get(user, ())
+                ),
+            }
+            for user in users
+        ]
+
+    def top_comment_domains(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Domínios de e-mail com mais comentários"""
+        return [
+            {"domain": domain, "comments": count}
+            for domain, count in (+self.comments_by_domain).most_common(limit)
+        ]
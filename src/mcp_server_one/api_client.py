@@ -2,28 +2,637 @@
 Cliente HTTP para interagir com APIs públicas
 """
 import httpx
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import partial
+from typing import (
+    Any, Awaitable, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple,
+)
+import codecs
 import json
 import asyncio
+import logging
+import time
+
+from .blobs import Blob, BlobReader, BlobStore
+from .cache import CacheEntry, CachePolicy, ResponseCache, encode_value
+from .compression import accept_encoding, decoded_response
+from .config import timeout_settings, upstream_limits, upstream_urls_from_env
+from .deadlines import DeadlineExceeded, detached_context, remaining, within_deadline
+from .memory import memory_budget
+from .metrics import metrics
+from .mirrors import Mirror, MirrorSet
+from .offload import estimate_size, offloader
+from .registry import UpstreamAPI, build_api_class
+from .replay import transport_from_env
+from .scheduling import BATCH, Caller, FairScheduler, set_caller, shared_scheduler
+from .upstreams import UPSTREAMS
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Freshness:
+    """Frescor das respostas servidas durante uma chamada de ferramenta"""
+
+    stale: bool = False
+    age: float = 0.0
+    reason: Optional[str] = None
+
+    def mark_stale(self, age: float, reason: str) -> None:
+        """Registra que uma resposta antiga foi servida"""
+        self.stale = True
+        if age >= self.age:
+            self.age = age
+            self.reason = reason
+
+    def as_meta(self) -> Optional[Dict[str, Any]]:
+        """Metadados para anexar ao resultado da ferramenta"""
+        if not self.stale:
+            return None
+        return {"stale": True, "age": round(self.age, 3), "stale_reason": self.reason}
+
+
+_freshness: ContextVar[Optional[Freshness]] = ContextVar("freshness", default=None)
+
+
+@contextmanager
+def track_freshness() -> Iterator[Freshness]:
+    """Coleta o frescor das respostas obtidas dentro do bloco"""
+    freshness = Freshness()
+    token = _freshness.set(freshness)
+    try:
+        yield freshness
+    finally:
+        _freshness.reset(token)
+
+
+@dataclass
+class Provenance:
+    """Entradas do cache de onde vieram as respostas de uma chamada de ferramenta
+
+    ``complete`` fica falso se alguma resposta não veio de uma entrada fresca
+    (origem sem cache, resposta antiga servida).
+    """
+
+    entries: Dict[str, CacheEntry] = field(default_factory=dict)
+    complete: bool = True
+
+    def add(self, key: str, entry: Optional[CacheEntry]) -> None:
+        """Registra a entrada usada para ``key`` (``None`` se não há uma fresca)"""
+        if entry is None:
+            self.complete = False
+        else:
+            self.entries[key] = entry
+
+
+_provenance: ContextVar[Optional[Provenance]] = ContextVar("provenance", default=None)
+
+
+@contextmanager
+def track_provenance() -> Iterator[Provenance]:
+    """Coleta as entradas do cache usadas pelas respostas obtidas dentro do bloco"""
+    provenance = Provenance()
+    token = _provenance.set(provenance)
+    try:
+        yield provenance
+    finally:
+        _provenance.reset(token)
+
+
+def _record_source(key: str, entry: Optional[CacheEntry]) -> None:
+    provenance = _provenance.get()
+    if provenance is not None:
+        provenance.add(key, entry)
+
+
+# Recebe bytes recebidos, total esperado (se conhecido) e os novos itens
+FetchObserver = Callable[[int, Optional[int], List[Any]], Awaitable[None]]
+
+_fetch_observer: ContextVar[Optional[FetchObserver]] = ContextVar("fetch_observer", default=None)
+
+
+@contextmanager
+def observe_fetch(observer: Optional[FetchObserver]) -> Iterator[None]:
+    """Acompanha o download das buscas à origem feitas dentro do bloco"""
+    token = _fetch_observer.set(observer)
+    try:
+        yield
+    finally:
+        _fetch_observer.reset(token)
+
+
+class ArrayStreamDecoder:
+    """Decodifica os itens de um array JSON à medida que os bytes chegam
+
+    Se o documento não for um array, ``failed`` fica verdadeiro e nenhum
+    item é produzido (o documento é decodificado inteiro no final).
+    """
+
+    def __init__(self) -> None:
+        self.items: List[Any] = []
+        self.complete = False
+        self.failed = False
+        self._started = False
+        self._text = ""
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Adiciona bytes e retorna os itens completados por eles"""
+        if self.failed or self.complete:
+            return []
+        text = self._text = self._text + self._utf8.decode(chunk)
+        new: List[Any] = []
+        pos = 0
+        while pos < len(text):
+            char = text[pos]
+            if char in " \t\r\n" or (char == "," and self._started):
+                pos += 1
+            elif not self._started:
+                if char != "[":
+                    self.failed = True
+                    break
+                self._started = True
+                pos += 1
+            elif char == "]":
+                self.complete = True
+                pos += 1
+                break
+            else:
+                try:
+                    item, end = self._json.raw_decode(text, pos)
+                except json.JSONDecodeError:
+                    break
+                if end >= len(text):
+                    # Pode estar incompleto (ex.: número cortado no fim do bloco)
+                    break
+                new.append(item)
+                pos = end
+        self._text = text[pos:]
+        self.items.extend(new)
+        return new
+
+
+class _StreamedBody:
+    """Lê o corpo em blocos, avisando os observadores a cada bloco"""
+
+    def __init__(self, observers: List[FetchObserver]):
+        self.observers = observers
+        self.chunks: List[bytes] = []
+        self.decoder: Optional[ArrayStreamDecoder] = None
+
+    async def read(self, response: httpx.Response) -> None:
+        length = response.headers.get("content-length")
+        total = int(length) if length and length.isdigit() else None
+        async for chunk in response.aiter_bytes():
+            self.chunks.append(chunk)
+            if not self.observers:
+                continue
+            if self.decoder is None:
+                # Primeiro observador: decodifica também o que já chegou
+                self.decoder = ArrayStreamDecoder()
+                items = self.decoder.feed(b"".join(self.chunks))
+            else:
+                items = self.decoder.feed(chunk)
+            for observer in list(self.observers):
+                try:
+                    await observer(response.num_bytes_downloaded, total, items)
+                except Exception as e:
+                    logger.debug("Falha no observador da busca: %s", e)
+
+    async def json(self) -> Any:
+        if self.decoder is not None and self.decoder.complete:
+            return self.decoder.items
+        return await offloader.loads(b"".join(self.chunks))
+
+
+# Accept-Encoding das URLs fora dos upstreams registrados
+_ACCEPT_ENCODING = accept_encoding()
+
+
+@dataclass
+class _Upstream:
+    """Configuração de um upstream dentro do APIClient"""
+
+    name: str
+    policy: Optional[CachePolicy] = None
+    scheduler: Optional[FairScheduler] = None
+    mirrors: Optional[MirrorSet] = None
+    accept_encoding: str = _ACCEPT_ENCODING
+
+
+def _can_fail_over(error: httpx.HTTPError) -> bool:
+    """Falhas em que nada da resposta foi lido e outro espelho pode atender"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
 
 
 class APIClient:
-    """Cliente HTTP para APIs públicas"""
+    """Cliente HTTP para APIs públicas
+
+    Todas as requisições passam por ``_send``, que aplica o limite de
+    concorrência do upstream (com prioridades, ver ``scheduling``) e
+    registra métricas. GETs de upstreams com
+    política de cache são servidos do cache e requisições idênticas em
+    andamento são coalescidas em uma só.
+
+    As requisições respeitam o prazo da chamada atual (``deadlines``). Uma
+    busca compartilhada roda sem prazo próprio e é cancelada quando todos
+    os que esperam por ela desistem (prazo esgotado ou cancelamento).
+    """
     
-    def __init__(self, timeout: int = 30):
+    def __init__(
+        self,
+        timeout: float = 30,
+        cache: Optional[ResponseCache] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache = cache if cache is not None else ResponseCache(budget=memory_budget)
+        self.blobs = BlobStore(budget=memory_budget)
+        self._upstreams: Dict[str, _Upstream] = {}
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        # Quantos aguardam cada busca em primeiro plano; revalidações em
+        # segundo plano não aparecem aqui e nunca são canceladas
+        self._waiters: Dict[str, int] = {}
+        # Observadores do download de cada busca em andamento
+        self._observers: Dict[str, List[FetchObserver]] = {}
     
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Cliente httpx, criado no primeiro uso
+
+        Montar o contexto SSL custa centenas de milissegundos; adiar a criação
+        evita esse custo antes da resposta ao ``initialize``.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, transport=self.transport)
+        return self._client
+
+    @client.setter
+    def client(self, client: httpx.AsyncClient) -> None:
+        self._client = client
+
+    def set_timeout(self, timeout: float) -> None:
+        """Troca o prazo das requisições, sem fechar as conexões abertas"""
+        self.timeout = timeout
+        if self._client is not None:
+            self._client.timeout = httpx.Timeout(timeout)
+
     async def close(self):
         """Fecha o cliente HTTP"""
-        await self.client.aclose()
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+
+    def configure_upstream(
+        self,
+        name: str,
+        base_url: str,
+        policy: Optional[CachePolicy] = None,
+        max_concurrency: Optional[int] = None,
+        urls: Optional[Sequence[str]] = None,
+        encodings: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Registra um upstream: nome nas métricas, cache e limite de concorrência
+
+        O limite é do processo: os clientes de todas as sessões dividem o
+        escalonador do upstream (ver ``shared_scheduler``).
+
+        ``urls`` são os endereços (espelhos) que de fato atendem ``base_url``;
+        as URLs continuam sendo montadas com ``base_url`` e são reescritas
+        em ``_send``. ``encodings`` são as compressões pedidas à origem
+        (ver ``compression.accept_encoding``).
+        """
+        mirrors = None
+        if urls and tuple(url.rstrip("/") for url in urls) != (base_url,):
+            mirrors = MirrorSet(base_url, urls)
+        self._upstreams[base_url] = _Upstream(
+            name=name,
+            policy=policy,
+            scheduler=shared_scheduler(name, max_concurrency) if max_concurrency else None,
+            mirrors=mirrors,
+            accept_encoding=accept_encoding(encodings),
+        )
+
+    def update_upstream(
+        self, base_url: str, policy: Optional[CachePolicy], max_concurrency: Optional[int]
+    ) -> None:
+        """Troca a política de cache e o limite de concorrência de um upstream
+
+        As respostas em cache ficam, com a nova política (ver
+        ``ResponseCache.apply_policy``), e quem espera vaga continua na fila.
+        """
+        upstream = self._upstreams[base_url]
+        upstream.policy = policy
+        self.cache.apply_policy(base_url, policy)
+        upstream.scheduler = (
+            shared_scheduler(upstream.name, max_concurrency) if max_concurrency else None
+        )
+
+    def scheduler_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Vagas e filas de cada upstream com limite de concorrência"""
+        return {
+            upstream.name: upstream.scheduler.stats()
+            for upstream in self._upstreams.values()
+            if upstream.scheduler is not None
+        }
+
+    def mirror_stats(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Estado dos espelhos de cada upstream que os tem"""
+        return {
+            upstream.name: upstream.mirrors.stats()
+            for upstream in self._upstreams.values()
+            if upstream.mirrors is not None
+        }
+
+    def set_cache_policy(self, url_prefix: str, policy: CachePolicy) -> None:
+        """Habilita cache para as URLs que começam com o prefixo"""
+        upstream = self._upstreams.get(url_prefix)
+        if upstream is None:
+            self._upstreams[url_prefix] = _Upstream(name=url_prefix, policy=policy)
+        else:
+            upstream.policy = policy
+
+    def _upstream_for(self, url: str) -> Optional[_Upstream]:
+        """Retorna o upstream de prefixo mais específico que casa com a URL"""
+        best: Optional[str] = None
+        for prefix in self._upstreams:
+            if url.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return self._upstreams[best] if best is not None else None
+
+    def _policy_for(self, url: str) -> Optional[CachePolicy]:
+        """Retorna a política de cache aplicável à URL"""
+        upstream = self._upstream_for(url)
+        return upstream.policy if upstream is not None else None
+
+    @staticmethod
+    def _cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+        if not params:
+            return url
+        query = "&".join(f"{k}={params[k]}" for k in sorted(params))
+        return f"{url}?{query}"
+
+    @staticmethod
+    async def _decode(entry: CacheEntry) -> Any:
+        """Valor da entrada (JSON compacto), decodificado fora do loop se for grande"""
+        return await offloader.loads(entry.data)
+
+    async def _store(self, key: str, value: Any, policy: CachePolicy) -> CacheEntry:
+        data = await offloader.run(estimate_size(value), encode_value, value)
+        return self.cache.set_encoded(key, data, policy)
+
+    def is_current(self, key: str, entry: CacheEntry) -> bool:
+        """Indica se ``entry`` ainda é a entrada de ``key`` e está fresca"""
+        return self.cache.get(key) is entry and entry.is_fresh(self.cache.clock())
+
+    async def _serve_stale(self, entry: CacheEntry, reason: str) -> Any:
+        """Marca a chamada atual como servida do cache antigo"""
+        freshness = _freshness.get()
+        if freshness is not None:
+            freshness.mark_stale(entry.age(self.cache.clock()), reason)
+        return await self._decode(entry)
+
+    async def _fetch_and_store(self, key: str, url: str, params: Optional[Dict[str, Any]],
+                               policy: CachePolicy,
+                               observers: Optional[List[FetchObserver]] = None,
+                               ) -> Tuple[Any, CacheEntry]:
+        value = await self._fetch_json(url, params, observers)
+        return value, await self._store(key, value, policy)
+
+    def _inflight_done(self, key: str, task: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._waiters.pop(key, None)
+            self._observers.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("Falha ao buscar %s: %s", key, task.exception())
+
+    def _start_fetch(self, key: str, url: str, params: Optional[Dict[str, Any]],
+                     policy: CachePolicy, background: bool = False) -> "asyncio.Future[Any]":
+        """Retorna a busca em andamento para a chave, iniciando uma se preciso"""
+        task = self._inflight.get(key)
+        if task is None:
+            # Buscas em primeiro plano são lidas em blocos para quem
+            # acompanha o download (ver observe_fetch)
+            observers: Optional[List[FetchObserver]] = None
+            if not background:
+                observers = self._observers[key] = []
+            # Sem o prazo de quem iniciou: outras chamadas podem aguardá-la.
+            # Revalidações não têm quem espere e entram como lote
+            context = detached_context()
+            if background:
+                context.run(set_caller, Caller("revalidation", BATCH))
+            task = asyncio.get_running_loop().create_task(
+                self._fetch_and_store(key, url, params, policy, observers),
+                context=context,
+            )
+            self._inflight[key] = task
+            if not background:
+                self._waiters[key] = 0
+            task.add_done_callback(partial(self._inflight_done, key))
+        elif background:
+            self._waiters.pop(key, None)
+        return task
+
+    def _leave(self, key: str, task: "asyncio.Future[Any]", upstream: str) -> None:
+        """Registra que um chamador parou de esperar; cancela a busca se era o último"""
+        count = self._waiters.get(key)
+        if count is None or self._inflight.get(key) is not task:
+            return
+        if count > 1:
+            self._waiters[key] = count - 1
+            return
+        del self._waiters[key]
+        if not task.done():
+            del self._inflight[key]
+            self._observers.pop(key, None)
+            task.cancel()
+            metrics.incr("upstream_abandoned", upstream=upstream)
+
+    def _revalidate(self, key: str, url: str, params: Optional[Dict[str, Any]],
+                    policy: CachePolicy) -> None:
+        """Agenda a revalidação em segundo plano (uma por chave)"""
+        self._start_fetch(key, url, params, policy, background=True)
     
-    async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Realiza uma requisição GET"""
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Realiza uma requisição GET (usando o cache quando há política)"""
+        upstream = self._upstream_for(url)
+        policy = upstream.policy if upstream is not None else None
+        observer = _fetch_observer.get()
+        if upstream is None or policy is None:
+            _record_source(url, None)
+            return await self._fetch_json(url, params, [observer] if observer else None)
+
+        key = self._cache_key(url, params)
+        entry = self.cache.get(key)
+        now = self.cache.clock()
+        if entry is not None:
+            if entry.is_fresh(now):
+                metrics.incr("cache_requests", upstream=upstream.name, result="hit")
+                _record_source(key, entry)
+                return await self._decode(entry)
+            if entry.can_revalidate_stale(now):
+                metrics.incr("cache_requests", upstream=upstream.name, result="stale")
+                self._revalidate(key, url, params, policy)
+                _record_source(key, None)
+                return await self._serve_stale(entry, "revalidating")
+
+        result = "coalesced" if key in self._inflight else "miss"
+        metrics.incr("cache_requests", upstream=upstream.name, result=result)
+        task = self._start_fetch(key, url, params, policy)
+        waiting = key in self._waiters
+        if waiting:
+            self._waiters[key] += 1
+        observers = self._observers.get(key) if observer else None
+        if observers is not None and observer is not None:
+            observers.append(observer)
+        try:
+            async with within_deadline(f"GET {upstream.name}"):
+                # shield: quem desiste não cancela a busca dos demais (ver _leave)
+                value, stored = await asyncio.shield(task)
+            _record_source(key, stored)
+            return value
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if entry is not None and entry.can_serve_on_error(self.cache.clock()):
+                metrics.incr("cache_requests", upstream=upstream.name, result="stale_if_error")
+                reason = "deadline" if isinstance(e, DeadlineExceeded) else "upstream_error"
+                _record_source(key, None)
+                return await self._serve_stale(entry, reason)
+            raise
+        finally:
+            if observers is not None and observer in observers:
+                observers.remove(observer)
+            if waiting:
+                self._leave(key, task, upstream.name)
+
+    async def refresh(self, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, Any]:
+        """Busca a URL ignorando o cache e atualiza a entrada
+
+        Retorna o valor anterior em cache (ou None) e o novo valor.
+        """
+        key = self._cache_key(url, params)
+        entry = self.cache.get(key)
+        value = await self._fetch_json(url, params)
+        policy = self._policy_for(url)
+        if policy is not None:
+            await self._store(key, value, policy)
+        return (await self._decode(entry) if entry is not None else None), value
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Caminho único de todas as requisições à origem
+
+        Com ``body`` (``_StreamedBody``, ``BlobReader``) a resposta é lida em
+        blocos por ``body.read`` ainda dentro do limite de concorrência e do
+        prazo. Se o upstream tem espelhos, a requisição vai para o melhor
+        deles; falhas de conexão e respostas 5xx passam para o próximo.
+        """
+        upstream = self._upstream_for(url)
+        name = upstream.name if upstream is not None else "other"
+        scheduler = upstream.scheduler if upstream is not None else None
+        mirrors = upstream.mirrors if upstream is not None else None
+        candidates: List[Optional[Mirror]] = list(mirrors.ranked()) if mirrors else [None]
+        budget = remaining()
+        if budget is not None and budget > 0:
+            kwargs["timeout"] = min(self.timeout, budget)
+        start = time.perf_counter()
+        try:
+            slot = scheduler.slot() if scheduler is not None else nullcontext()
+            async with within_deadline(f"{method} {name}"), slot:
+                for attempt, mirror in enumerate(candidates):
+                    if mirror is None or mirrors is None:
+                        return await self._request(method, url, upstream, body, kwargs)
+                    sent = time.perf_counter()
+                    try:
+                        response = await self._request(
+                            method, mirrors.url_for(mirror, url), upstream, body, kwargs
+                        )
+                    except httpx.HTTPError as e:
+                        if isinstance(e, httpx.HTTPStatusError) and not _can_fail_over(e):
+                            # Erro do cliente (4xx): o espelho respondeu
+                            mirrors.record_success(mirror, time.perf_counter() - sent)
+                            raise
+                        mirrors.record_failure(mirror)
+                        if not _can_fail_over(e) or attempt == len(candidates) - 1:
+                            raise
+                        metrics.incr("upstream_failover", upstream=name)
+                        logger.warning("Falha em %s (%s); tentando outro espelho",
+                                       mirror.base_url, e)
+                        continue
+                    mirrors.record_success(mirror, time.perf_counter() - sent)
+                    return response
+                raise AssertionError("sem espelhos")  # pragma: no cover
+        except httpx.HTTPError:
+            metrics.incr("upstream_errors", upstream=name)
+            raise
+        except DeadlineExceeded:
+            metrics.incr("upstream_deadline_exceeded", upstream=name)
+            raise
+        finally:
+            metrics.incr("upstream_requests", upstream=name)
+            metrics.observe("upstream_latency_seconds", time.perf_counter() - start,
+                            upstream=name)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        upstream: Optional[_Upstream],
+        body: Optional[Any],
+        kwargs: Dict[str, Any],
+    ) -> httpx.Response:
+        """Uma tentativa de requisição (ver ``_send``)
+
+        A resposta é lida em stream e descomprimida aqui (``compression``),
+        para medir separadamente os bytes na rede e o tempo do codec.
+        """
+        name = upstream.name if upstream is not None else "other"
+        encoding = upstream.accept_encoding if upstream is not None else _ACCEPT_ENCODING
+        request = self.client.build_request(
+            method, url, headers={"Accept-Encoding": encoding}, **kwargs
+        )
+        response = await self.client.send(request, stream=True)
         try:
-            response = await self.client.get(url, params=params)
             response.raise_for_status()
-            return response.json()
+            decoded = decoded_response(response, name)
+            if body is None:
+                await decoded.aread()
+            else:
+                await body.read(decoded)
+        finally:
+            await response.aclose()
+        return decoded
+
+    async def _fetch_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        observers: Optional[List[FetchObserver]] = None,
+    ) -> Any:
+        """Busca e decodifica o JSON diretamente da API de origem"""
+        try:
+            if observers is None:
+                response = await self._send("GET", url, params=params)
+                return await offloader.loads(response.content)
+            body = _StreamedBody(observers)
+            await self._send("GET", url, body, params=params)
+            return await body.json()
         except httpx.HTTPError as e:
             raise Exception(f"Erro HTTP: {e}")
         except json.JSONDecodeError:
@@ -32,17 +641,33 @@ class APIClient:
     async def get_bytes(self, url: str, params: Optional[Dict[str, Any]] = None) -> bytes:
         """Realiza uma requisição GET que retorna dados em bytes"""
         try:
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
+            response = await self._send("GET", url, params=params)
             return response.content
         except httpx.HTTPError as e:
             raise Exception(f"Erro HTTP: {e}")
+
+    async def get_blob(self, url: str, params: Optional[Dict[str, Any]] = None) -> Blob:
+        """GET de conteúdo binário, já em base64 (ver ``blobs``)
+
+        O corpo é codificado à medida que chega, e o resultado fica no
+        ``BlobStore``: a mesma URL não é buscada nem codificada de novo.
+        """
+        key = self._cache_key(url, params)
+        blob = self.blobs.get(key)
+        if blob is not None:
+            return blob
+        reader = BlobReader()
+        try:
+            await self._send("GET", url, reader, params=params)
+        except httpx.HTTPError as e:
+            raise Exception(f"Erro HTTP: {e}")
+        assert reader.blob is not None
+        return self.blobs.put(key, reader.blob)
     
-    async def post(self, url: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def post(self, url: str, data: Optional[Dict[str, Any]] = None) -> Any:
         """Realiza uma requisição POST"""
         try:
-            response = await self.client.post(url, json=data)
-            response.raise_for_status()
+            response = await self._send("POST", url, json=data)
             return response.json()
         except httpx.HTTPError as e:
             raise Exception(f"Erro HTTP: {e}")
@@ -50,125 +675,82 @@ class APIClient:
             raise Exception("Resposta não é um JSON válido")
 
 
-class JSONPlaceholderAPI:
-    """Cliente para JSONPlaceholder API"""
-    
-    BASE_URL = "https://jsonplaceholder.typicode.com"
-    
-    def __init__(self, client: APIClient):
-        self.client = client
-    
-    async def get_posts(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Busca posts do JSONPlaceholder"""
-        url = f"{self.BASE_URL}/posts"
-        posts = await self.client.get(url)
-        if limit:
-            posts = posts[:limit]
-        return posts
-    
-    async def get_post(self, post_id: int) -> Dict[str, Any]:
-        """Busca um post específico"""
-        url = f"{self.BASE_URL}/posts/{post_id}"
-        return await self.client.get(url)
-    
-    async def get_comments(self, post_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Busca comentários (opcionalmente de um post específico)"""
-        if post_id:
-            url = f"{self.BASE_URL}/posts/{post_id}/comments"
-        else:
-            url = f"{self.BASE_URL}/comments"
-        return await self.client.get(url)
-    
-    async def get_users(self) -> List[Dict[str, Any]]:
-        """Busca usuários"""
-        url = f"{self.BASE_URL}/users"
-        return await self.client.get(url)
-    
-    async def get_user(self, user_id: int) -> Dict[str, Any]:
-        """Busca um usuário específico"""
-        url = f"{self.BASE_URL}/users/{user_id}"
-        return await self.client.get(url)
-    
-    async def get_todos(self, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Busca todos (opcionalmente de um usuário específico)"""
-        if user_id:
-            url = f"{self.BASE_URL}/users/{user_id}/todos"
-        else:
-            url = f"{self.BASE_URL}/todos"
-        return await self.client.get(url)
-    
-    async def create_post(self, title: str, body: str, user_id: int) -> Dict[str, Any]:
-        """Cria um novo post (fake)"""
-        url = f"{self.BASE_URL}/posts"
-        data = {
-            "title": title,
-            "body": body,
-            "userId": user_id
-        }
-        return await self.client.post(url, data)
-
+# Clientes gerados a partir das descrições em upstreams.py
+API_CLASSES: Dict[str, type] = {
+    upstream.name: build_api_class(upstream) for upstream in UPSTREAMS
+}
+JSONPlaceholderAPI = API_CLASSES["jsonplaceholder"]
+CatFactsAPI = API_CLASSES["catfacts"]
+JokeAPI = API_CLASSES["jokes"]
+QRcodeAPI = API_CLASSES["qrcode"]
 
-class CatFactsAPI:
-    """Cliente para Cat Facts API"""
-    
-    BASE_URL = "https://catfact.ninja"
-    
-    def __init__(self, client: APIClient):
-        self.client = client
-    
-    async def get_random_fact(self) -> Dict[str, Any]:
-        """Busca um fato aleatório sobre gatos"""
-        url = f"{self.BASE_URL}/fact"
-        return await self.client.get(url)
-    
-    async def get_facts(self, limit: int = 10) -> Dict[str, Any]:
-        """Busca múltiplos fatos sobre gatos"""
-        url = f"{self.BASE_URL}/facts"
-        params = {"limit": limit}
-        return await self.client.get(url, params)
 
+class APIManager:
+    """Gerenciador de todas as APIs
 
-class JokeAPI:
-    """Cliente para Official Joke API"""
-    
-    BASE_URL = "https://official-joke-api.appspot.com"
-    
-    def __init__(self, client: APIClient):
-        self.client = client
-    
-    async def get_random_joke(self) -> Dict[str, Any]:
-        """Busca uma piada aleatória"""
-        url = f"{self.BASE_URL}/random_joke"
-        return await self.client.get(url)
+    Sem ``transport``, as requisições usam a rede ou o cassete indicado em
+    ``MCP_UPSTREAM_MODE``/``MCP_CASSETTE`` (ver ``replay``). Sem ``urls``
+    (endereços por nome de upstream), valem os de ``MCP_<NOME>_URLS`` ou as
+    URLs base de ``upstreams.py`` (ver ``config``). TTLs e limites de
+    concorrência vêm de ``upstreams.py`` ou do ambiente (``upstream_limits``)
+    e podem ser recarregados com ``reload``.
+    """
     
-    async def get_jokes_by_type(self, joke_type: str) -> List[Dict[str, Any]]:
-        """Busca piadas por tipo"""
-        url = f"{self.BASE_URL}/jokes/{joke_type}/random"
-        return await self.client.get(url)
+    def __init__(
+        self,
+        stale_while_revalidate: float = 300.0,
+        stale_if_error: float = 3600.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        urls: Optional[Mapping[str, Sequence[str]]] = None,
+    ):
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self.client = APIClient(
+            timeout=timeout_settings()[1],
+            transport=transport if transport is not None else transport_from_env(),
+        )
+        if urls is None:
+            urls = upstream_urls_from_env(UPSTREAMS)
+        self._apis: Dict[str, UpstreamAPI] = {}
+        for upstream in UPSTREAMS:
+            ttl, max_concurrency = upstream_limits(upstream)
+            self.client.configure_upstream(
+                upstream.name, upstream.base_url, self._policy(ttl), max_concurrency,
+                urls.get(upstream.name), upstream.accept_encoding,
+            )
 
-class QRcodeAPI:
-    """Cliente para QR Code Generator"""
+    def _policy(self, ttl: Optional[float]) -> Optional[CachePolicy]:
+        if not ttl:
+            return None
+        return CachePolicy(
+            ttl=ttl,
+            stale_while_revalidate=self.stale_while_revalidate,
+            stale_if_error=self.stale_if_error,
+        )
 
-    BASE_URL = "https://api.qrserver.com/v1"
+    def reload(self) -> None:
+        """Aplica o prazo das requisições, os TTLs e os limites do ambiente atual
 
-    def __init__(self, client: APIClient):
-        self.client = client
+        Caches e conexões são mantidos. Endereços, compressão e o modo de
+        gravação só mudam reiniciando o servidor.
+        """
+        self.client.set_timeout(timeout_settings()[1])
+        for upstream in UPSTREAMS:
+            ttl, max_concurrency = upstream_limits(upstream)
+            self.client.update_upstream(upstream.base_url, self._policy(ttl), max_concurrency)
 
-    async def generate_qrcode(self, text: str):
-        """Gera o QR code"""
-        url = f"{self.BASE_URL}/create-qr-code/?data={text}"
-        return await self.client.get_bytes(url)
+    def api(self, name: str) -> Any:
+        """Cliente de uma API pelo nome do upstream (criado sob demanda)"""
+        api = self._apis.get(name)
+        if api is None:
+            api = self._apis[name] = API_CLASSES[name](self.client)
+        return api
 
-
-class APIManager:
-    """Gerenciador de todas as APIs"""
-    
-    def __init__(self):
-        self.client = APIClient()
-        self.jsonplaceholder = JSONPlaceholderAPI(self.client)
-        self.catfacts = CatFactsAPI(self.client)
-        self.jokes = JokeAPI(self.client)
-        self.qrcode = QRcodeAPI(self.client)
+    def __getattr__(self, name: str) -> Any:
+        # jsonplaceholder, catfacts, jokes, qrcode...
+        if not name.startswith("_") and name in API_CLASSES:
+            return self.api(name)
+        raise AttributeError(name)
     
     async def close(self):
         """Fecha todas as conexões"""
@@ -0,0 +1,184 @@
+"""
+Conteúdo binário (imagens) já codificado em base64
+
+O corpo da resposta é lido em blocos e cada bloco é codificado assim que
+chega, sem montar os bytes completos em memória. O resultado fica em um
+``BlobStore`` para que imagens repetidas não sejam buscadas nem codificadas
+de novo, e pode ser referenciado pela URI ``blob://<id>``.
+"""
+import binascii
+import hashlib
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+
+from .memory import MemoryBudget
+from .metrics import metrics
+
+
+BLOB_SCHEME = "blob://"
+
+
+@dataclass(frozen=True)
+class Blob:
+    """Conteúdo binário em base64, identificado pelo hash dos bytes"""
+
+    id: str
+    data: str
+    size: int
+    mime_type: str
+
+    @property
+    def uri(self) -> str:
+        return f"{BLOB_SCHEME}{self.id}"
+
+
+class Base64Encoder:
+    """Codifica em base64 bloco a bloco
+
+    Cada bloco é codificado até o último múltiplo de 3 bytes; a sobra (no
+    máximo 2 bytes) vai para o início do próximo. Os blocos são lidos por
+    ``memoryview``, sem cópia.
+    """
+
+    def __init__(self) -> None:
+        self.size = 0
+        self._parts: List[str] = []
+        self._carry = b""
+        self._hash = hashlib.sha256()
+
+    def feed(self, chunk: bytes) -> None:
+        """Codifica os bytes recebidos"""
+        self.size += len(chunk)
+        self._hash.update(chunk)
+        view = memoryview(chunk)
+        if self._carry:
+            need = 3 - len(self._carry)
+            head = self._carry + bytes(view[:need])
+            view = view[need:]
+            if len(head) < 3:
+                self._carry = head
+                return
+            self._parts.append(binascii.b2a_base64(head, newline=False).decode("ascii"))
+        whole = len(view) - len(view) % 3
+        if whole:
+            self._parts.append(binascii.b2a_base64(view[:whole], newline=False).decode("ascii"))
+        self._carry = bytes(view[whole:])
+
+    def finish(self, mime_type: str) -> Blob:
+        """Codifica a sobra e retorna o ``Blob``"""
+        if self._carry:
+            self._parts.append(binascii.b2a_base64(self._carry, newline=False).decode("ascii"))
+            self._carry = b""
+        data = "".join(self._parts)
+        self._parts = []
+        return Blob(id=self._hash.hexdigest()[:32], data=data, size=self.size,
+                    mime_type=mime_type)
+
+
+class BlobReader:
+    """Corpo de resposta lido direto para um ``Base64Encoder`` (ver ``_send``)"""
+
+    def __init__(self, mime_type: Optional[str] = None):
+        self.mime_type = mime_type
+        self.encoder = Base64Encoder()
+        self.blob: Optional[Blob] = None
+
+    async def read(self, response: httpx.Response) -> None:
+        async for chunk in response.aiter_bytes():
+            self.encoder.feed(chunk)
+        mime_type = self.mime_type or response.headers.get(
+            "content-type", "application/octet-stream"
+        ).split(";")[0]
+        self.blob = self.encoder.finish(mime_type)
+
+
+class BlobStore:
+    """Blobs recentes, por chave de requisição e por ID, limitados em bytes
+
+    Blobs com o mesmo conteúdo são guardados uma vez só. Os menos usados
+    são removidos quando o total (em base64) passa de ``max_bytes`` ou,
+    com ``budget``, pelo orçamento de memória compartilhado.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, budget: Optional[MemoryBudget] = None):
+        self.max_bytes = max_bytes
+        self.budget = budget
+        self.bytes = 0
+        self._blobs: "OrderedDict[str, Blob]" = OrderedDict()
+        self._ticks: Dict[str, int] = {}
+        self._keys: Dict[str, str] = {}
+        self._keys_of: Dict[str, Set[str]] = {}
+        if budget is not None:
+            budget.join(self, "blobs")
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def get(self, key: str) -> Optional[Blob]:
+        """Blob da requisição ``key``, se ainda estiver guardado"""
+        blob_id = self._keys.get(key)
+        blob = self.get_by_id(blob_id) if blob_id is not None else None
+        metrics.incr("blob_requests", result="hit" if blob is not None else "miss")
+        return blob
+
+    def get_by_id(self, blob_id: str) -> Optional[Blob]:
+        """Blob pelo ID (o de ``blob://<id>``)"""
+        blob = self._blobs.get(blob_id)
+        if blob is not None:
+            self._blobs.move_to_end(blob_id)
+            self._touch(blob_id)
+        return blob
+
+    def _touch(self, blob_id: str) -> None:
+        if self.budget is not None:
+            self._ticks[blob_id] = self.budget.tick()
+
+    def put(self, key: str, blob: Blob) -> Blob:
+        """Guarda o blob da requisição ``key``; retorna o guardado (deduplicado)"""
+        existing = self._blobs.get(blob.id)
+        added = existing is None
+        if existing is not None:
+            blob = existing
+            self._blobs.move_to_end(blob.id)
+        else:
+            self._blobs[blob.id] = blob
+            self.bytes += len(blob.data)
+        self._touch(blob.id)
+        previous = self._keys.get(key)
+        if previous is not None and previous != blob.id:
+            self._keys_of[previous].discard(key)
+        self._keys[key] = blob.id
+        self._keys_of.setdefault(blob.id, set()).add(key)
+        while self.bytes > self.max_bytes and len(self._blobs) > 1:
+            self.evict_oldest()
+        if added and self.budget is not None and blob.id in self._blobs:
+            self.budget.charge(self, sys.getsizeof(blob.data))
+        metrics.set_gauge("blob_store_bytes", self.bytes)
+        return blob
+
+    def oldest_tick(self) -> Optional[int]:
+        """Contador do último acesso ao blob menos usado (ver ``MemoryBudget``)"""
+        for blob_id in self._blobs:
+            return self._ticks.get(blob_id, 0)
+        return None
+
+    def evict_oldest(self) -> None:
+        """Remove o blob menos usado e as chaves que apontam para ele"""
+        if not self._blobs:
+            return
+        _, evicted = self._blobs.popitem(last=False)
+        self._ticks.pop(evicted.id, None)
+        self.bytes -= len(evicted.data)
+        for evicted_key in self._keys_of.pop(evicted.id, ()):
+            del self._keys[evicted_key]
+        if self.budget is not None:
+            self.budget.charge(self, -sys.getsizeof(evicted.data))
+        metrics.set_gauge("blob_store_bytes", self.bytes)
+
+    def stats(self) -> Dict[str, Any]:
+        """Número de blobs e bytes ocupados"""
+        return {"blobs": len(self._blobs), "bytes": self.bytes, "max_bytes": self.max_bytes}
@@ -0,0 +1,53 @@
+"""
+Chamadas compostas: várias buscas às APIs em paralelo com um prazo comum
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Dict, Mapping
+
+
+# Prazo padrão (em segundos) para todas as partes de uma chamada composta
+DEFAULT_DEADLINE = 10.0
+
+
+@dataclass
+class BundleResult:
+    """Resultado de cada parte que terminou e o erro das que falharam"""
+
+    data: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Partes e erros em um único dicionário"""
+        return {**self.data, "errors": self.errors}
+
+
+async def gather_parts(
+    parts: Mapping[str, Awaitable[Any]], deadline: float = DEFAULT_DEADLINE
+) -> BundleResult:
+    """Executa as partes em paralelo e espera no máximo ``deadline`` segundos
+
+    Partes que falham ou não terminam no prazo são reportadas em
+    ``errors`` e não impedem o retorno das demais.
+    """
+    tasks = {name: asyncio.ensure_future(part) for name, part in parts.items()}
+    try:
+        _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    finally:
+        # Também cancela tudo se quem chamou for cancelado
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    result = BundleResult()
+    for name, task in tasks.items():
+        if task in pending:
+            result.errors[name] = f"Prazo de {deadline:g}s esgotado"
+        elif task.cancelled():
+            result.errors[name] = "Cancelada"
+        elif task.exception() is not None:
+            exc = task.exception()
+            result.errors[name] = str(exc) or type(exc).__name__
+        else:
+            result.data[name] = task.result()
+    return result
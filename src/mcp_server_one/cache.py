@@ -0,0 +1,268 @@
+"""
+Cache de respostas das APIs públicas
+
+As respostas ficam em JSON compacto (bytes) e são decodificadas a cada
+leitura: listas e dicionários do Python ocupam várias vezes o tamanho do
+JSON, e o tamanho dos bytes é o que entra no orçamento de memória.
+"""
+import json
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from .memory import MemoryBudget
+
+
+# Memória aproximada de cada entrada além dos bytes e da chave
+_ENTRY_OVERHEAD = 200
+
+
+def encode_value(value: Any) -> bytes:
+    """JSON compacto de uma resposta"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Política de cache para um conjunto de URLs
+
+    - ``ttl``: segundos em que a resposta é considerada fresca
+    - ``stale_while_revalidate``: janela (após o ttl) em que a resposta
+      antiga é servida imediatamente enquanto é revalidada em segundo plano
+    - ``stale_if_error``: janela (após o ttl) em que a resposta antiga é
+      servida caso a API de origem falhe
+    """
+
+    ttl: float
+    stale_while_revalidate: float = 0.0
+    stale_if_error: float = 0.0
+
+
+@dataclass
+class CacheEntry:
+    """Entrada do cache (JSON compacto) com o instante em que foi armazenada"""
+
+    data: bytes
+    stored_at: float
+    policy: CachePolicy
+    tick: int = 0
+    size: int = 0
+
+    @property
+    def value(self) -> Any:
+        """A resposta decodificada (um objeto novo a cada leitura)"""
+        return json.loads(self.data)
+
+    def age(self, now: float) -> float:
+        """Idade da entrada em segundos"""
+        return now - self.stored_at
+
+    def is_fresh(self, now: float) -> bool:
+        """Indica se a entrada ainda está dentro do ttl"""
+        return self.age(now) <= self.policy.ttl
+
+    def can_revalidate_stale(self, now: float) -> bool:
+        """Indica se a entrada pode ser servida enquanto é revalidada"""
+        return self.age(now) <= self.policy.ttl + self.policy.stale_while_revalidate
+
+    def can_serve_on_error(self, now: float) -> bool:
+        """Indica se a entrada pode ser servida quando a origem falha"""
+        return self.age(now) <= self.policy.ttl + self.policy.stale_if_error
+
+
+class ResponseCache:
+    """Cache LRU de respostas com entradas expiráveis
+
+    Limitado em ``max_entries`` e, com ``budget``, pelo orçamento de
+    memória compartilhado com os outros caches.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+        budget: Optional[MemoryBudget] = None,
+    ):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.budget = budget
+        self.bytes = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        if budget is not None:
+            budget.join(self, "responses")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _tick(self) -> int:
+        return self.budget.tick() if self.budget is not None else 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Retorna a entrada (fresca ou não) associada à chave"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            entry.tick = self._tick()
+        return entry
+
+    def set(self, key: str, value: Any, policy: CachePolicy) -> CacheEntry:
+        """Armazena uma resposta, removendo as menos usadas se necessário"""
+        return self.set_encoded(key, encode_value(value), policy)
+
+    def set_encoded(self, key: str, data: bytes, policy: CachePolicy) -> CacheEntry:
+        """Armazena uma resposta já em JSON compacto (ver ``encode_value``)"""
+        self.invalidate(key)
+        entry = CacheEntry(
+            data=data, stored_at=self.clock(), policy=policy, tick=self._tick(),
+            size=sys.getsizeof(data) + sys.getsizeof(key) + _ENTRY_OVERHEAD,
+        )
+        self._entries[key] = entry
+        self._charge(entry.size)
+        while len(self._entries) > self.max_entries:
+            self.evict_oldest()
+        return entry
+
+    def _charge(self, delta: int) -> None:
+        self.bytes += delta
+        if self.budget is not None:
+            self.budget.charge(self, delta)
+
+    def oldest_tick(self) -> Optional[int]:
+        """Contador do último acesso à entrada menos usada (ver ``MemoryBudget``)"""
+        for entry in self._entries.values():
+            return entry.tick
+        return None
+
+    def evict_oldest(self) -> None:
+        """Remove a entrada menos usada"""
+        if self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._charge(-entry.size)
+
+    def invalidate(self, key: str) -> None:
+        """Remove uma entrada do cache"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._charge(-entry.size)
+
+    def apply_policy(self, prefix: str, policy: Optional[CachePolicy]) -> None:
+        """Passa as entradas das URLs com o prefixo para a nova política
+
+        As entradas continuam no cache (a idade é contada de quando foram
+        guardadas); sem política, são removidas.
+        """
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            if policy is None:
+                self.invalidate(key)
+            else:
+                self._entries[key].policy = policy
+
+    def clear(self) -> None:
+        """Remove todas as entradas"""
+        self._entries.clear()
+        self._charge(-self.bytes)
+
+    def stats(self) -> Dict[str, int]:
+        """Estatísticas simples do cache"""
+        return {"entries": len(self._entries), "max_entries": self.max_entries,
+                "bytes": self.bytes}
+
+
+@dataclass
+class RenderedOutput:
+    """Resultado pronto de uma chamada e as entradas de onde ele veio"""
+
+    value: Any
+    sources: Tuple[Tuple[str, CacheEntry], ...]
+    size: int
+    tick: int = 0
+
+
+class OutputCache:
+    """Resultados prontos (já serializados) de chamadas repetidas
+
+    Cada resultado guarda as entradas do ``ResponseCache`` usadas para
+    produzi-lo e só é servido enquanto ``is_current`` aceitar todas elas
+    (a mesma entrada, ainda fresca). Uma resposta nova da origem invalida
+    os resultados sem nenhum aviso explícito. ``max_entries=0`` desativa.
+    """
+
+    def __init__(self, max_entries: int = 256, budget: Optional[MemoryBudget] = None):
+        self.max_entries = max_entries
+        self.budget = budget
+        self.bytes = 0
+        self._outputs: "OrderedDict[str, RenderedOutput]" = OrderedDict()
+        if budget is not None:
+            budget.join(self, "outputs")
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+    def _tick(self) -> int:
+        return self.budget.tick() if self.budget is not None else 0
+
+    def get(self, key: str, is_current: Callable[[str, CacheEntry], bool]) -> Optional[Any]:
+        """Resultado guardado para ``key``, se as entradas de origem não mudaram"""
+        output = self._outputs.get(key)
+        if output is None:
+            return None
+        if not all(is_current(source, entry) for source, entry in output.sources):
+            self.invalidate(key)
+            return None
+        self._outputs.move_to_end(key)
+        output.tick = self._tick()
+        return output.value
+
+    def set(self, key: str, value: Any, sources: Mapping[str, CacheEntry], size: int) -> None:
+        """Guarda o resultado de ``key``, produzido a partir de ``sources``"""
+        if self.max_entries <= 0:
+            return
+        self.invalidate(key)
+        size += sys.getsizeof(key) + _ENTRY_OVERHEAD
+        self._outputs[key] = RenderedOutput(
+            value=value, sources=tuple(sources.items()), size=size, tick=self._tick()
+        )
+        self._charge(size)
+        while len(self._outputs) > self.max_entries:
+            self.evict_oldest()
+
+    def resize(self, max_entries: int) -> None:
+        """Troca o limite de resultados, removendo os menos usados que sobrarem"""
+        self.max_entries = max_entries
+        while len(self._outputs) > max(max_entries, 0):
+            self.evict_oldest()
+
+    def _charge(self, delta: int) -> None:
+        self.bytes += delta
+        if self.budget is not None:
+            self.budget.charge(self, delta)
+
+    def oldest_tick(self) -> Optional[int]:
+        """Contador do último acesso ao resultado menos usado (ver ``MemoryBudget``)"""
+        for output in self._outputs.values():
+            return output.tick
+        return None
+
+    def evict_oldest(self) -> None:
+        """Remove o resultado menos usado"""
+        if self._outputs:
+            _, output = self._outputs.popitem(last=False)
+            self._charge(-output.size)
+
+    def invalidate(self, key: str) -> None:
+        """Remove um resultado"""
+        output = self._outputs.pop(key, None)
+        if output is not None:
+            self._charge(-output.size)
+
+    def clear(self) -> None:
+        """Remove todos os resultados"""
+        self._outputs.clear()
+        self._charge(-self.bytes)
+
+    def stats(self) -> Dict[str, int]:
+        """Estatísticas simples do cache"""
+        return {"entries": len(self._outputs), "max_entries": self.max_entries,
+                "bytes": self.bytes}
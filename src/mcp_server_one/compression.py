@@ -0,0 +1,313 @@
+"""
+Compressão: negociação com as origens e respostas do servidor HTTP
+
+Com as APIs de origem, o ``Accept-Encoding`` é explícito por upstream e a
+descompressão é feita aqui (``DecodingStream``), para medir os bytes na
+rede e o tempo gasto no codec. Nos transportes HTTP do servidor,
+``CompressionMiddleware`` comprime (zstd ou gzip) as respostas grandes.
+
+gzip e deflate usam ``zlib``; ``br`` e ``zstd`` só são oferecidos se os
+pacotes ``brotli`` e ``zstandard`` estiverem instalados.
+"""
+import time
+import zlib
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from .metrics import metrics
+
+try:  # pragma: no cover - depende do ambiente
+    import brotli  # type: ignore[import-not-found, import-untyped, unused-ignore]
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:  # pragma: no cover - depende do ambiente
+    import zstandard  # type: ignore[import-not-found, import-untyped, unused-ignore]
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+# Limites (em segundos) do histograma de tempo de codec
+CODEC_BUCKETS: Tuple[float, ...] = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1
+)
+
+# Preferência ao pedir respostas comprimidas às origens
+_PREFERENCE = ("zstd", "br", "gzip", "deflate")
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Codificações que este processo sabe descomprimir, na ordem de preferência"""
+    missing = {"br": brotli is None, "zstd": zstandard is None}
+    return tuple(name for name in _PREFERENCE if not missing.get(name, False))
+
+
+def accept_encoding(encodings: Optional[Iterable[str]] = None) -> str:
+    """Valor de ``Accept-Encoding``: as pedidas que estão disponíveis
+
+    ``None`` pede todas as disponíveis; uma lista vazia pede ``identity``.
+    """
+    available = available_encodings()
+    chosen = available if encodings is None else [e for e in encodings if e in available]
+    return ", ".join(chosen) or "identity"
+
+
+class _Decoder:
+    def __init__(self, encoding: str):
+        if encoding == "gzip":
+            self._codec: Any = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        elif encoding == "deflate":
+            self._codec = zlib.decompressobj()
+        elif encoding == "br" and brotli is not None:
+            self._codec = brotli.Decompressor()
+        elif encoding == "zstd" and zstandard is not None:
+            self._codec = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            raise httpx.DecodingError(f"Codificação não suportada: {encoding}")
+        self._brotli = encoding == "br"
+
+    def decompress(self, data: bytes) -> bytes:
+        try:
+            if self._brotli:
+                out: bytes = self._codec.process(data)
+            else:
+                out = self._codec.decompress(data)
+            return out
+        except Exception as e:
+            raise httpx.DecodingError(str(e)) from e
+
+    def flush(self) -> bytes:
+        flush = getattr(self._codec, "flush", None)
+        return flush() if flush is not None and not self._brotli else b""
+
+
+class DecodingStream(httpx.AsyncByteStream):
+    """Corpo bruto da resposta descomprimido bloco a bloco, com métricas
+
+    Lê o stream do transporte (os bytes como vieram da rede, mesmo que a
+    resposta já esteja em memória, como nos transportes de teste e de
+    reprodução). Registra ``codec_seconds{op=decode}`` e os bytes antes e
+    depois da descompressão (``upstream_bytes`` com ``stage=wire`` e
+    ``stage=decoded``). Com ``identity`` os blocos passam sem cópia.
+    """
+
+    def __init__(self, response: httpx.Response, encoding: str, upstream: str):
+        self.response = response
+        self.encoding = encoding
+        self.upstream = upstream
+        self._decoder = _Decoder(encoding) if encoding != "identity" else None
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        elapsed = 0.0
+        wire = decoded = 0
+        try:
+            async for chunk in self.response.stream:  # type: ignore[union-attr]
+                wire += len(chunk)
+                if self._decoder is None:
+                    decoded += len(chunk)
+                    yield chunk
+                    continue
+                start = time.perf_counter()
+                data = self._decoder.decompress(chunk)
+                elapsed += time.perf_counter() - start
+                decoded += len(data)
+                if data:
+                    yield data
+            if self._decoder is not None:
+                start = time.perf_counter()
+                data = self._decoder.flush()
+                elapsed += time.perf_counter() - start
+                decoded += len(data)
+                if data:
+                    yield data
+        finally:
+            if self._decoder is not None:
+                metrics.observe("codec_seconds", elapsed, buckets=CODEC_BUCKETS,
+                                op="decode", encoding=self.encoding)
+            metrics.incr("upstream_bytes", wire, upstream=self.upstream, stage="wire",
+                         encoding=self.encoding)
+            metrics.incr("upstream_bytes", decoded, upstream=self.upstream, stage="decoded")
+
+    async def aclose(self) -> None:
+        await self.response.aclose()
+
+
+def decoded_response(response: httpx.Response, upstream: str) -> httpx.Response:
+    """A resposta com o corpo lido (e descomprimido) por ``DecodingStream``"""
+    encoding = response.headers.get("content-encoding", "").strip().lower() or "identity"
+    headers = [
+        (name, value) for name, value in response.headers.multi_items()
+        if encoding == "identity" or name not in ("content-encoding", "content-length")
+    ]
+    return httpx.Response(
+        response.status_code,
+        headers=headers,
+        stream=DecodingStream(response, encoding, upstream),
+        request=response.request,
+    )
+
+
+# ==================== Servidor HTTP ====================
+
+# Codificações oferecidas nas respostas do servidor, na ordem de preferência
+SERVER_ENCODINGS = ("zstd", "gzip")
+
+
+class _Encoder:
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "zstd":
+            assert zstandard is not None
+            self._codec: Any = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            self._codec = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out: bytes = self._codec.compress(data)
+        if flush:
+            if self.encoding == "zstd":
+                out += self._codec.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            else:
+                out += self._codec.flush(zlib.Z_SYNC_FLUSH)
+        return out
+
+    def finish(self) -> bytes:
+        out: bytes = self._codec.flush()
+        return out
+
+
+def _negotiate(accept: str, offered: Iterable[str]) -> Optional[str]:
+    """Primeira codificação oferecida que o cliente aceita (q > 0)"""
+    accepted: Dict[str, float] = {}
+    for part in accept.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in offered:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+class CompressionMiddleware:
+    """Middleware ASGI que comprime as respostas grandes
+
+    Respostas comuns são comprimidas a partir de ``minimum_size`` bytes. Em
+    streams de eventos (``text/event-stream``) a decisão é tomada na
+    primeira mensagem: streams longos (GET) são sempre comprimidos, e os de
+    uma requisição (POST do streamable-http) só se a primeira mensagem
+    passar do limite. Cada mensagem do stream é enviada na hora (flush).
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        minimum_size: int = 1024,
+        encodings: Iterable[str] = SERVER_ENCODINGS,
+        level: int = 6,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = tuple(
+            e for e in encodings if e == "gzip" or (e == "zstd" and zstandard is not None)
+        )
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or ())
+        encoding = _negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"),
+                              self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingSender(send, encoding, self.minimum_size, self.level,
+                                       long_lived=scope.get("method") == "GET")
+        await self.app(scope, receive, responder)
+
+
+class _CompressingSender:
+    """Decide, comprime e repassa as mensagens de uma resposta"""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int, level: int,
+                 long_lived: bool):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.level = level
+        self.long_lived = long_lived
+        self.start: Optional[Message] = None
+        self.pending: List[bytes] = []
+        self.pending_size = 0
+        self.stream = False
+        self.encoder: Optional[_Encoder] = None
+        self.decided = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = {k.lower(): v for k, v in message.get("headers", ())}
+            self.stream = headers.get(b"content-type", b"").startswith(b"text/event-stream")
+            if b"content-encoding" in headers:
+                self.decided = True
+                await self.send(message)
+            else:
+                self.start = message
+            return
+        if message["type"] != "http.response.body" or (self.decided and self.encoder is None):
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        if not self.decided:
+            self.pending.append(body)
+            self.pending_size += len(body)
+            big = self.pending_size >= self.minimum_size
+            if not (big or not more or self.stream):
+                return
+            await self._decide(big or (self.stream and self.long_lived))
+            body = b"".join(self.pending)
+            self.pending = []
+            if self.encoder is None:
+                await self.send({"type": "http.response.body", "body": body, "more_body": more})
+                return
+
+        assert self.encoder is not None
+        start = time.perf_counter()
+        data = self.encoder.compress(body, flush=self.stream)
+        if not more:
+            data += self.encoder.finish()
+        metrics.observe("codec_seconds", time.perf_counter() - start, buckets=CODEC_BUCKETS,
+                        op="encode", encoding=self.encoding)
+        metrics.incr("server_response_bytes", len(body), stage="raw")
+        metrics.incr("server_response_bytes", len(data), stage="wire", encoding=self.encoding)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more})
+
+    async def _decide(self, compress: bool) -> None:
+        self.decided = True
+        assert self.start is not None
+        start, self.start = self.start, None
+        if compress:
+            self.encoder = _Encoder(self.encoding, self.level)
+            headers = [
+                (k, v) for k, v in start.get("headers", ())
+                if k.lower() not in (b"content-length", b"content-encoding")
+            ]
+            headers.append((b"content-encoding", self.encoding.encode()))
+            headers.append((b"vary", b"accept-encoding"))
+            start = {**start, "headers": headers}
+        await self.send(start)
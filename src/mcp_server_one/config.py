@@ -0,0 +1,271 @@
+"""
+Configuração do servidor por variáveis de ambiente
+"""
+import os
+from typing import Dict, FrozenSet, Mapping, MutableMapping, Optional, Tuple
+
+from .deadlines import DEFAULT_TOOL_TIMEOUT
+from .registry import Upstream
+
+
+# Compressão das respostas nos transportes HTTP (ver compression.CompressionMiddleware)
+COMPRESSION_ENV = "MCP_HTTP_COMPRESSION"            # ex.: "zstd,gzip"; "off" desativa
+COMPRESSION_MIN_SIZE_ENV = "MCP_HTTP_COMPRESSION_MIN_SIZE"
+DEFAULT_COMPRESSION = ("zstd", "gzip")
+DEFAULT_COMPRESSION_MIN_SIZE = 1024
+
+# Monitor do event loop (ver watchdog.LoopMonitor)
+LOOP_DEBUG_ENV = "MCP_LOOP_DEBUG"                   # "1" registra pilhas de bloqueios
+LOOP_THRESHOLD_ENV = "MCP_LOOP_BLOCK_THRESHOLD"     # em segundos
+DEFAULT_LOOP_THRESHOLD = 0.1
+
+# JSON grande fora do event loop (ver offload.Offloader)
+OFFLOAD_THRESHOLD_ENV = "MCP_OFFLOAD_THRESHOLD"     # em bytes
+OFFLOAD_WORKERS_ENV = "MCP_OFFLOAD_WORKERS"         # 0 desativa
+OFFLOAD_KIND_ENV = "MCP_OFFLOAD_KIND"               # thread ou process
+DEFAULT_OFFLOAD_THRESHOLD = 128 * 1024
+DEFAULT_OFFLOAD_WORKERS = 2
+
+# Ferramentas de administração (perfis de CPU e memória); desligadas por padrão
+ADMIN_ENV = "MCP_ADMIN_TOOLS"                       # "1" registra as ferramentas
+ADMIN_TOKEN_ENV = "MCP_ADMIN_TOKEN"                 # habilita as rotas HTTP /admin
+PROFILE_DIR_ENV = "MCP_PROFILE_DIR"                 # onde gravar os perfis
+
+# Orçamento de memória dos caches (ver memory.MemoryBudget); aceitam K, M e G
+MEMORY_BUDGET_ENV = "MCP_MEMORY_BUDGET"
+RSS_LIMIT_ENV = "MCP_RSS_LIMIT"
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+_SIZE_SUFFIXES = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+# Resultados prontos das ferramentas (ver cache.OutputCache)
+OUTPUT_CACHE_ENV = "MCP_OUTPUT_CACHE_ENTRIES"       # 0 desativa
+DEFAULT_OUTPUT_CACHE_ENTRIES = 256
+
+# Prioridades das chamadas (ver scheduling.FairScheduler)
+TOOL_CONCURRENCY_ENV = "MCP_TOOL_CONCURRENCY"       # ferramentas executando ao mesmo tempo
+MAX_WAIT_ENV = "MCP_SCHEDULER_MAX_WAIT"             # em segundos
+BATCH_TOOLS_ENV = "MCP_BATCH_TOOLS"                 # ex.: "get_todos,get_comments"
+BATCH_CLIENTS_ENV = "MCP_BATCH_CLIENTS"             # pelo clientInfo.name do initialize
+DEFAULT_TOOL_CONCURRENCY = 32
+DEFAULT_MAX_WAIT = 5.0
+
+# Prazos e encerramento (ver lifecycle)
+TOOL_TIMEOUT_ENV = "MCP_TOOL_TIMEOUT"               # em segundos, sem _meta.timeout
+UPSTREAM_TIMEOUT_ENV = "MCP_UPSTREAM_TIMEOUT"       # em segundos, por requisição
+DRAIN_TIMEOUT_ENV = "MCP_DRAIN_TIMEOUT"             # espera das chamadas no SIGTERM
+DEFAULT_UPSTREAM_TIMEOUT = 30.0
+DEFAULT_DRAIN_TIMEOUT = 25.0
+
+# Arquivo com variáveis ``CHAVE=valor``, lido na partida e a cada SIGHUP
+CONFIG_FILE_ENV = "MCP_CONFIG_FILE"
+
+# Valores do processo trocados pelo arquivo (None: a variável não existia)
+_replaced: Dict[str, Optional[str]] = {}
+
+
+def _env_name(upstream: Upstream, suffix: str = "URLS") -> str:
+    return f"MCP_{upstream.name.upper()}_{suffix}"
+
+
+def upstream_urls(
+    upstream: Upstream, environ: Optional[Mapping[str, str]] = None
+) -> Tuple[str, ...]:
+    """Endereços de um upstream, em ``MCP_<NOME>_URLS`` (separados por vírgula)
+
+    Ex.: ``MCP_JSONPLACEHOLDER_URLS=http://espelho.interno:8080,https://jsonplaceholder.typicode.com``.
+    Sem a variável, vale a URL base do upstream.
+    """
+    env = os.environ if environ is None else environ
+    value = env.get(_env_name(upstream), "")
+    urls = tuple(url.strip().rstrip("/") for url in value.split(",") if url.strip())
+    return urls or (upstream.base_url,)
+
+
+def upstream_urls_from_env(
+    upstreams: Tuple[Upstream, ...], environ: Optional[Mapping[str, str]] = None
+) -> Dict[str, Tuple[str, ...]]:
+    """Endereços de cada upstream (pelo nome), conforme o ambiente"""
+    return {upstream.name: upstream_urls(upstream, environ) for upstream in upstreams}
+
+
+def upstream_limits(
+    upstream: Upstream, environ: Optional[Mapping[str, str]] = None
+) -> Tuple[Optional[float], Optional[int]]:
+    """TTL do cache e limite de concorrência de um upstream
+
+    ``MCP_<NOME>_CACHE_TTL`` e ``MCP_<NOME>_MAX_CONCURRENCY`` substituem os
+    valores de ``upstreams.py``; ``0`` desativa o cache ou o limite.
+    """
+    env = os.environ if environ is None else environ
+    ttl = env.get(_env_name(upstream, "CACHE_TTL"))
+    concurrency = env.get(_env_name(upstream, "MAX_CONCURRENCY"))
+    return (
+        (float(ttl) or None) if ttl else upstream.cache_ttl,
+        (int(concurrency) or None) if concurrency else upstream.max_concurrency,
+    )
+
+
+def http_compression(
+    environ: Optional[Mapping[str, str]] = None,
+) -> Tuple[Tuple[str, ...], int]:
+    """Codificações oferecidas e tamanho mínimo das respostas comprimidas"""
+    env = os.environ if environ is None else environ
+    value = env.get(COMPRESSION_ENV)
+    encodings: Tuple[str, ...]
+    if value is None:
+        encodings = DEFAULT_COMPRESSION
+    elif value.strip().lower() in ("", "off", "identity"):
+        encodings = ()
+    else:
+        encodings = tuple(e.strip().lower() for e in value.split(",") if e.strip())
+    minimum = int(env.get(COMPRESSION_MIN_SIZE_ENV, DEFAULT_COMPRESSION_MIN_SIZE))
+    return encodings, minimum
+
+
+def loop_monitor_settings(
+    environ: Optional[Mapping[str, str]] = None,
+) -> Tuple[bool, float]:
+    """Modo de depuração e limite (s) a partir do qual o loop conta como bloqueado"""
+    env = os.environ if environ is None else environ
+    debug = env.get(LOOP_DEBUG_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+    return debug, float(env.get(LOOP_THRESHOLD_ENV, DEFAULT_LOOP_THRESHOLD))
+
+
+def offload_settings(
+    environ: Optional[Mapping[str, str]] = None,
+) -> Tuple[int, int, str]:
+    """Limite (bytes), número de workers e tipo do pool de JSON grande"""
+    env = os.environ if environ is None else environ
+    return (
+        int(env.get(OFFLOAD_THRESHOLD_ENV, DEFAULT_OFFLOAD_THRESHOLD)),
+        int(env.get(OFFLOAD_WORKERS_ENV, DEFAULT_OFFLOAD_WORKERS)),
+        env.get(OFFLOAD_KIND_ENV, "thread").strip().lower(),
+    )
+
+
+def admin_settings(
+    environ: Optional[Mapping[str, str]] = None,
+) -> Tuple[bool, Optional[str], Optional[str]]:
+    """Ferramentas de administração ligadas, token das rotas HTTP e pasta dos perfis"""
+    env = os.environ if environ is None else environ
+    enabled = env.get(ADMIN_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+    return enabled, env.get(ADMIN_TOKEN_ENV) or None, env.get(PROFILE_DIR_ENV) or None
+
+
+def parse_size(value: str) -> int:
+    """Tamanho em bytes, com sufixo opcional K, M ou G (ex.: ``"256M"``)"""
+    value = value.strip().upper().removesuffix("B")
+    factor = _SIZE_SUFFIXES.get(value[-1:], 1)
+    return int(float(value[:-1] if factor != 1 else value) * factor)
+
+
+def memory_settings(
+    environ: Optional[Mapping[str, str]] = None,
+) -> Tuple[int, Optional[int]]:
+    """Orçamento somado dos caches e limite de RSS (``None`` sem limite)"""
+    env = os.environ if environ is None else environ
+    budget = env.get(MEMORY_BUDGET_ENV)
+    rss_limit = env.get(RSS_LIMIT_ENV)
+    return (
+        parse_size(budget) if budget else DEFAULT_MEMORY_BUDGET,
+        parse_size(rss_limit) if rss_limit else None,
+    )
+
+
+def output_cache_entries(environ: Optional[Mapping[str, str]] = None) -> int:
+    """Número máximo de resultados prontos guardados (0 desativa)"""
+    env = os.environ if environ is None else environ
+    return int(env.get(OUTPUT_CACHE_ENV, DEFAULT_OUTPUT_CACHE_ENTRIES))
+
+
+def _names(value: str) -> FrozenSet[str]:
+    return frozenset(name.strip() for name in value.split(",") if name.strip())
+
+
+def scheduling_settings(
+    environ: Optional[Mapping[str, str]] = None,
+) -> Tuple[int, float, FrozenSet[str], FrozenSet[str]]:
+    """Vagas de ferramentas, espera máxima (s) e ferramentas e clientes em lote"""
+    env = os.environ if environ is None else environ
+    return (
+        int(env.get(TOOL_CONCURRENCY_ENV, DEFAULT_TOOL_CONCURRENCY)),
+        float(env.get(MAX_WAIT_ENV, DEFAULT_MAX_WAIT)),
+        _names(env.get(BATCH_TOOLS_ENV, "")),
+        _names(env.get(BATCH_CLIENTS_ENV, "")),
+    )
+
+
+def timeout_settings(
+    environ: Optional[Mapping[str, str]] = None,
+) -> Tuple[float, float]:
+    """Prazo (s) das ferramentas sem timeout do cliente e das requisições à origem"""
+    env = os.environ if environ is None else environ
+    return (
+        float(env.get(TOOL_TIMEOUT_ENV, DEFAULT_TOOL_TIMEOUT)),
+        float(env.get(UPSTREAM_TIMEOUT_ENV, DEFAULT_UPSTREAM_TIMEOUT)),
+    )
+
+
+def drain_timeout(environ: Optional[Mapping[str, str]] = None) -> float:
+    """Quanto (s) esperar as chamadas em andamento ao encerrar"""
+    env = os.environ if environ is None else environ
+    return float(env.get(DRAIN_TIMEOUT_ENV, DEFAULT_DRAIN_TIMEOUT))
+
+
+def read_config_file(path: str) -> Dict[str, str]:
+    """Variáveis de um arquivo ``CHAVE=valor`` (linhas vazias e ``#`` ignoradas)"""
+    values: Dict[str, str] = {}
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, sep, value = line.removeprefix("export ").partition("=")
+            if not sep or not key.strip():
+                raise ValueError(f"{path}:{number}: esperado CHAVE=valor")
+            values[key.strip()] = value.strip().strip("'\"")
+    return values
+
+
+def environ_with_config_file(
+    environ: Optional[Mapping[str, str]] = None,
+) -> Dict[str, str]:
+    """Ambiente do processo com o arquivo de ``MCP_CONFIG_FILE`` aplicado por cima
+
+    Não altera o ambiente: serve para validar a configuração antes de
+    aplicá-la com ``load_config_file``.
+    """
+    env = dict(os.environ if environ is None else environ)
+    for key, original in _replaced.items():
+        if original is None:
+            env.pop(key, None)
+        else:
+            env[key] = original
+    path = env.get(CONFIG_FILE_ENV)
+    if path:
+        env.update(read_config_file(path))
+    return env
+
+
+def load_config_file(environ: Optional[MutableMapping[str, str]] = None) -> Dict[str, str]:
+    """Aplica ao ambiente o arquivo de ``MCP_CONFIG_FILE`` e devolve suas variáveis
+
+    Chamada na partida e a cada SIGHUP; as funções acima passam a ver os
+    valores do arquivo. Uma variável retirada do arquivo volta ao valor que
+    o processo recebeu.
+    """
+    env = os.environ if environ is None else environ
+    path = env.get(CONFIG_FILE_ENV)
+    values = read_config_file(path) if path else {}
+    for key in [key for key in _replaced if key not in values]:
+        original = _replaced.pop(key)
+        if original is None:
+            env.pop(key, None)
+        else:
+            env[key] = original
+    for key, value in values.items():
+        if key not in _replaced:
+            _replaced[key] = env.get(key)
+        env[key] = value
+    return values
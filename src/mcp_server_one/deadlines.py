@@ -0,0 +1,87 @@
+"""
+Prazos das chamadas de ferramentas, propagados até as requisições à origem
+"""
+import asyncio
+import contextvars
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator, Optional
+
+
+# Prazo (em segundos) de uma chamada de ferramenta sem timeout do cliente
+DEFAULT_TOOL_TIMEOUT = 30.0
+
+# Instante limite (relógio do loop) das operações da tarefa atual
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """O prazo da chamada acabou antes da resposta da origem"""
+
+
+def _now() -> float:
+    return asyncio.get_running_loop().time()
+
+
+def remaining() -> Optional[float]:
+    """Segundos restantes do prazo atual (None se não há prazo)"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - _now()
+
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]) -> Iterator[Optional[float]]:
+    """Limita as operações do bloco a ``timeout`` segundos a partir de agora
+
+    Um prazo interno nunca estende o prazo externo. Com ``timeout=None`` o
+    bloco roda sem prazo (usado pelas buscas compartilhadas entre chamadas).
+    """
+    if timeout is None:
+        deadline = None
+    else:
+        deadline = _now() + timeout
+        outer = _deadline.get()
+        if outer is not None and outer < deadline:
+            deadline = outer
+    token = _deadline.set(deadline)
+    try:
+        yield None if deadline is None else deadline - _now()
+    finally:
+        _deadline.reset(token)
+
+
+@asynccontextmanager
+async def within_deadline(what: str) -> AsyncIterator[None]:
+    """Cancela o bloco quando o prazo atual acaba, com ``DeadlineExceeded``"""
+    budget = remaining()
+    if budget is None:
+        yield
+        return
+    if budget <= 0:
+        raise DeadlineExceeded(f"Prazo esgotado antes de {what}")
+    try:
+        async with asyncio.timeout(budget):
+            yield
+    except DeadlineExceeded:
+        raise
+    except TimeoutError as e:
+        raise DeadlineExceeded(f"Prazo esgotado em {what}") from e
+
+
+def requested_timeout(meta: Any) -> Optional[float]:
+    """Timeout (segundos) pedido pelo cliente em ``_meta.timeout``"""
+    value: Any = getattr(meta, "timeout", None)
+    if value is None and isinstance(meta, dict):
+        value = meta.get("timeout")
+    try:
+        timeout = float(value)
+    except (TypeError, ValueError):
+        return None
+    return timeout if timeout > 0 else None
+
+
+def detached_context() -> contextvars.Context:
+    """Cópia do contexto atual sem prazo, para tarefas compartilhadas"""
+    context = contextvars.copy_context()
+    context.run(_deadline.set, None)
+    return context
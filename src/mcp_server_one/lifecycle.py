@@ -0,0 +1,289 @@
+"""
+Encerramento gracioso e recarga da configuração por sinais
+
+SIGTERM: o servidor para de aceitar conexões e chamadas novas, espera as
+chamadas em andamento por até ``MCP_DRAIN_TIMEOUT`` segundos e só então
+encerra. Ao sair do lifespan, as conexões com a origem são fechadas e o
+cassete de gravação (o único dado que o servidor persiste) é descarregado
+e fechado.
+
+SIGHUP: relê ``MCP_CONFIG_FILE`` e aplica prazos, TTLs, limites de
+concorrência e tamanhos dos caches sem perder o que está em cache nem as
+conexões abertas (ver ``server.reload_settings``).
+"""
+import asyncio
+import logging
+import signal
+import socket
+import sys
+from contextlib import contextmanager, suppress
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+import uvicorn
+from mcp.server.stdio import stdio_server
+from sse_starlette.sse import AppStatus
+
+from .metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Espera (s) das conexões sem chamadas, como streams SSE ociosos, depois
+# da drenagem; passado esse tempo, são fechadas
+CONNECTION_GRACE = 1
+
+# Pausa (s) para as respostas das últimas chamadas chegarem aos streams HTTP
+RESPONSE_FLUSH = 0.1
+
+# Maior mensagem JSON-RPC aceita pelo stdin (uma por linha)
+STDIN_LINE_LIMIT = 64 * 1024 * 1024
+
+
+class ShuttingDown(RuntimeError):
+    """O servidor está encerrando e não aceita chamadas novas"""
+
+
+class Drain:
+    """Chamadas em andamento, para esperar por elas ao encerrar
+
+    Métricas: ``tool_calls_in_flight`` e ``tool_calls_rejected{reason}``.
+    """
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.draining = False
+        self.rejected = 0
+        self._idle: Optional[asyncio.Event] = None
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Conta a chamada do bloco; durante o encerramento, recusa com ``ShuttingDown``"""
+        if self.draining:
+            self.rejected += 1
+            metrics.incr("tool_calls_rejected", reason="shutting_down")
+            raise ShuttingDown("Servidor encerrando; tente novamente em instantes")
+        self._set_active(1)
+        try:
+            yield
+        finally:
+            self._set_active(-1)
+
+    def _set_active(self, delta: int) -> None:
+        self.active += delta
+        metrics.set_gauge("tool_calls_in_flight", self.active)
+        if not self.active and self._idle is not None:
+            self._idle.set()
+
+    async def wait(self, timeout: float) -> int:
+        """Passa a recusar chamadas novas e espera as em andamento
+
+        Retorna quantas ainda estavam em andamento ao fim de ``timeout``.
+        """
+        self.draining = True
+        if self.active:
+            logger.info("Encerrando: aguardando %d chamada(s) em andamento", self.active)
+            self._idle = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("%d chamada(s) ainda em andamento após %.0fs serão canceladas",
+                               self.active, timeout)
+            finally:
+                self._idle = None
+        return self.active
+
+    def reset(self) -> None:
+        """Volta a aceitar chamadas (para testes e para quem reaproveita o processo)"""
+        self.draining = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Chamadas em andamento e recusadas (para o recurso de status)"""
+        return {"in_flight": self.active, "draining": self.draining, "rejected": self.rejected}
+
+
+# Chamadas de ferramenta do processo (todas as sessões)
+drain = Drain()
+
+
+@contextmanager
+def signal_handlers(handlers: Mapping[int, Callable[[], Any]]) -> Iterator[List[int]]:
+    """Trata os sinais no loop atual durante o bloco
+
+    Sinais indisponíveis (SIGHUP no Windows, ou fora da thread principal)
+    são ignorados; a lista devolvida diz quais foram registrados.
+    """
+    loop = asyncio.get_running_loop()
+    installed = []
+    for signum, handler in handlers.items():
+        try:
+            loop.add_signal_handler(signum, handler)
+        except (NotImplementedError, RuntimeError, ValueError):
+            continue
+        installed.append(signum)
+    try:
+        yield installed
+    finally:
+        for signum in installed:
+            loop.remove_signal_handler(signum)
+
+
+def _reload_handlers(on_reload: Callable[[], Any]) -> Dict[int, Callable[[], Any]]:
+    sighup = getattr(signal, "SIGHUP", None)
+    return {sighup: on_reload} if sighup is not None else {}
+
+
+class _PipeLines:
+    """Linhas de um pipe lidas pelo próprio event loop (``async for``)
+
+    O stdio do SDK lê cada linha em uma thread, que não pode ser cancelada:
+    o encerramento ficaria preso até o cliente fechar o stdin.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader):
+        self.reader = reader
+
+    def __aiter__(self) -> "_PipeLines":
+        return self
+
+    async def __anext__(self) -> str:
+        line = await self.reader.readline()
+        if not line:
+            raise StopAsyncIteration
+        return line.decode("utf-8", errors="replace")
+
+
+class _TrackedSender:
+    """Stream de saída que sabe se há respostas sendo enviadas"""
+
+    def __init__(self, stream: Any):
+        self.stream = stream
+        self.sending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def send(self, item: Any) -> None:
+        self.sending += 1
+        self._idle.clear()
+        try:
+            await self.stream.send(item)
+        finally:
+            self.sending -= 1
+            if not self.sending:
+                self._idle.set()
+
+    async def sent(self) -> None:
+        """Espera os envios em andamento"""
+        await self._idle.wait()
+
+    async def __aenter__(self) -> "_TrackedSender":
+        await self.stream.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> Any:
+        return await self.stream.__aexit__(*exc_info)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+
+async def _stdin_lines() -> Optional[_PipeLines]:
+    """O stdin como ``_PipeLines`` (``None`` se não for um pipe, como um arquivo)"""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=STDIN_LINE_LIMIT)
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    except (OSError, ValueError, NotImplementedError):
+        return None
+    return _PipeLines(reader)
+
+
+async def serve_stdio(server: Any, timeout: float, on_reload: Callable[[], Any]) -> None:
+    """Roda o servidor MCP (de baixo nível) no stdio com drenagem e recarga
+
+    No SIGTERM, chamadas novas são recusadas, as em andamento terminam e
+    respondem normalmente e então o stdin é dado por encerrado, como se o
+    cliente o fechasse; o que passar do prazo é cancelado. No SIGHUP, chama
+    ``on_reload``.
+    """
+    task = asyncio.current_task()
+    assert task is not None
+    stdin = await _stdin_lines()
+    output: Optional[_TrackedSender] = None
+    stopping: List["asyncio.Task[None]"] = []
+
+    async def stop() -> None:
+        if await drain.wait(timeout) or stdin is None or output is None:
+            task.cancel()
+            return
+        # O fim do stdin encerra a sessão e o SDK cancela o que ainda não
+        # respondeu: antes, espera as últimas respostas saírem
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(output.sent(), CONNECTION_GRACE)
+        stdin.reader.feed_eof()
+        done, _ = await asyncio.wait({task}, timeout=CONNECTION_GRACE)
+        if not done:
+            task.cancel()
+
+    def on_terminate() -> None:
+        if not stopping:
+            stopping.append(asyncio.create_task(stop()))
+
+    handlers = {signal.SIGTERM: on_terminate, **_reload_handlers(on_reload)}
+    with signal_handlers(handlers):
+        try:
+            # stdio_server só itera o stdin (async for), como _PipeLines permite
+            async with stdio_server(stdin=stdin) as (read_stream, write_stream):  # type: ignore[arg-type]
+                output = _TrackedSender(write_stream)
+                await server.run(read_stream, output, server.create_initialization_options())
+        except asyncio.CancelledError:
+            if not stopping or task.uncancel():
+                raise
+        finally:
+            for stopper in stopping:
+                stopper.cancel()
+
+
+class DrainingServer(uvicorn.Server):
+    """``uvicorn.Server`` que espera as chamadas em andamento antes de encerrar
+
+    O uvicorn já trata SIGTERM e SIGINT; aqui o encerramento para de aceitar
+    conexões, espera a drenagem e só então fecha as conexões abertas. O
+    sse-starlette encerraria todos os streams SSE (inclusive os que levam
+    respostas) já no sinal; durante ``serve`` isso fica a cargo do servidor.
+    """
+
+    def __init__(self, config: uvicorn.Config, drain_timeout: float):
+        super().__init__(config)
+        self.drain_timeout = drain_timeout
+
+    async def serve(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        AppStatus.disable_automatic_graceful_drain()
+        try:
+            await super().serve(sockets)
+        finally:
+            AppStatus.enable_automatic_graceful_drain_mode()
+
+    async def shutdown(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        for server in self.servers:
+            server.close()
+        await drain.wait(self.drain_timeout)
+        await asyncio.sleep(RESPONSE_FLUSH)
+        AppStatus.should_exit = True
+        await super().shutdown(sockets)
+
+
+async def serve_http(
+    app: Any,
+    host: str,
+    port: int,
+    log_level: str,
+    timeout: float,
+    on_reload: Callable[[], Any],
+) -> None:
+    """Serve o app HTTP (SSE ou streamable-http) com drenagem e recarga no SIGHUP"""
+    config = uvicorn.Config(
+        app, host=host, port=port, log_level=log_level,
+        timeout_graceful_shutdown=CONNECTION_GRACE,
+    )
+    with signal_handlers(_reload_handlers(on_reload)):
+        await DrainingServer(config, timeout).serve()
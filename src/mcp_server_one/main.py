@@ -1,8 +1,49 @@
 """
 Ponto de entrada principal do MCP Server One
 """
+import os
+import subprocess
+import sys
+from typing import Dict, Optional
+
 import click
-from .server import main as server_main
+
+# O módulo do servidor (FastMCP, mcp.types, modelos) só é importado em main(),
+# para que --help e --profile-startup não paguem esse custo.
+
+
+def _print_startup_profile(top: int = 15) -> None:
+    """Mostra no stderr o tempo de importação do servidor por pacote
+
+    A medição roda em um subprocesso com ``-X importtime`` para partir de um
+    interpretador limpo.
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in sys.path if p)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import mcp_server_one.server"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    totals: Dict[str, int] = {}
+    server_total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        package = module.split(".")[0]
+        totals[package] = totals.get(package, 0) + int(self_us)
+        if module == "mcp_server_one.server":
+            server_total = int(cumulative_us)
+
+    click.echo("Tempo de importação por pacote (self, ms):", err=True)
+    for package, us in sorted(totals.items(), key=lambda item: -item[1])[:top]:
+        click.echo(f"  {package:<30} {us / 1000:8.1f}", err=True)
+    click.echo(
+        f"Total para importar mcp_server_one.server: {server_total / 1000:.1f} ms",
+        err=True,
+    )
 
 
 @click.command()
@@ -29,14 +70,71 @@ from .server import main as server_main
     is_flag=True,
     help="Habilita logs verbosos"
 )
-def main(transport: str, port: int, host: str, verbose: bool):
+@click.option(
+    "--profile-startup",
+    is_flag=True,
+    help="Mostra o tempo de importação por pacote e sai"
+)
+@click.option(
+    "--record",
+    type=click.Path(dir_okay=False),
+    help="Grava o tráfego com as APIs de origem neste cassete"
+)
+@click.option(
+    "--replay",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Responde com o cassete gravado, sem acessar a rede"
+)
+@click.option(
+    "--replay-latency-scale",
+    default=1.0,
+    type=float,
+    help="Multiplica a latência gravada no modo --replay (0 = sem espera)"
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Arquivo CHAVE=valor com a configuração (relido no SIGHUP)"
+)
+@click.option(
+    "--loop-debug",
+    is_flag=True,
+    help="Registra a pilha do código que bloquear o event loop"
+)
+def main(
+    transport: str,
+    port: int,
+    host: str,
+    verbose: bool,
+    profile_startup: bool,
+    record: Optional[str],
+    replay: Optional[str],
+    replay_latency_scale: float,
+    config: Optional[str],
+    loop_debug: bool,
+):
     """
     MCP Server One - Servidor MCP com APIs públicas
     
     Este servidor fornece acesso a várias APIs públicas através do
     Model Context Protocol (MCP).
     """
-    import sys
+    if profile_startup:
+        _print_startup_profile()
+        return
+    
+    if record and replay:
+        raise click.UsageError("Use --record ou --replay, não os dois")
+    # Lidas pelo APIManager (ver replay.transport_from_env)
+    cassette = record or replay
+    if cassette:
+        os.environ["MCP_UPSTREAM_MODE"] = "record" if record else "replay"
+        os.environ["MCP_CASSETTE"] = cassette
+        os.environ["MCP_REPLAY_LATENCY_SCALE"] = str(replay_latency_scale)
+    if config:
+        os.environ["MCP_CONFIG_FILE"] = config  # lido em config.load_config_file
+    if loop_debug:
+        os.environ["MCP_LOOP_DEBUG"] = "1"  # lida em config.loop_monitor_settings
     
     # Configurar argumentos para o servidor
     sys.argv = ["mcp-server-one"]
@@ -51,6 +149,7 @@ def main(transport: str, port: int, host: str, verbose: bool):
         sys.argv.append("--verbose")
     
     # Executar o servidor
+    from .server import main as server_main
     server_main()
 
 
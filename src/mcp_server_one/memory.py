@@ -0,0 +1,171 @@
+"""
+Orçamento de memória compartilhado entre os caches
+
+Cada cache (respostas, blobs, cursores de cada sessão) informa ao
+``MemoryBudget`` quantos bytes ocupa. Quando o total passa do orçamento,
+ou quando a memória residente do processo (RSS) passa do limite, entradas
+são removidas de qualquer um deles, sempre a menos usada entre todos (LRU
+global, por um contador de acessos compartilhado).
+"""
+import os
+import sys
+import time
+import weakref
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import metrics
+
+
+def current_rss() -> Optional[int]:
+    """Memória residente do processo em bytes (``None`` fora do Linux)"""
+    try:
+        with open("/proc/self/statm", "rb") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def deep_size(obj: Any) -> int:
+    """Memória de um objeto JSON (dicts, listas, strings) e de tudo que contém"""
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return total
+
+
+class MemoryBudget:
+    """Limite de bytes somado entre os caches participantes
+
+    Os participantes implementam ``oldest_tick()`` (o contador do último
+    acesso à entrada menos usada, ou ``None`` se vazio) e ``evict_oldest()``,
+    e chamam ``charge`` a cada entrada adicionada ou removida. Com
+    ``rss_limit``, o RSS é conferido a cada ``rss_interval`` segundos; acima
+    dele, os caches encolhem para ``pressure_ratio`` do tamanho atual (a
+    memória liberada nem sempre volta ao sistema na hora, então não dá para
+    esperar o RSS baixar).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        rss_limit: Optional[int] = None,
+        rss_interval: float = 1.0,
+        pressure_ratio: float = 0.75,
+        rss: Callable[[], Optional[int]] = current_rss,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.rss_limit = rss_limit
+        self.rss_interval = rss_interval
+        self.pressure_ratio = pressure_ratio
+        self.rss = rss
+        self.clock = clock
+        self.bytes = 0
+        self._ticks = 0
+        self._members: Dict[int, "weakref.ref[Any]"] = {}
+        self._names: Dict[int, str] = {}
+        self._charged: Dict[int, int] = {}
+        self._next_rss_check = 0.0
+        self._enforcing = False
+
+    def configure(self, max_bytes: int, rss_limit: Optional[int]) -> None:
+        """Troca os limites; um orçamento menor remove entradas na hora"""
+        self.max_bytes = max_bytes
+        self.rss_limit = rss_limit
+        self._next_rss_check = 0.0
+        if self.bytes > max_bytes:
+            self._enforce()
+
+    def join(self, member: Any, name: str) -> None:
+        """Inclui um cache no orçamento (até ele ser coletado)"""
+        key = id(member)
+        self._members[key] = weakref.ref(member)
+        self._names[key] = name
+        self._charged[key] = 0
+        weakref.finalize(member, self._forget, key)
+
+    def _forget(self, key: int) -> None:
+        self.bytes -= self._charged.pop(key, 0)
+        self._members.pop(key, None)
+        self._names.pop(key, None)
+
+    def tick(self) -> int:
+        """Próximo valor do contador de acessos"""
+        self._ticks += 1
+        return self._ticks
+
+    def charge(self, member: Any, delta: int) -> None:
+        """Registra bytes adicionados (ou removidos, se negativo) por um cache"""
+        key = id(member)
+        if key not in self._charged:
+            return
+        self._charged[key] += delta
+        self.bytes += delta
+        if delta > 0 and not self._enforcing:
+            self._enforce()
+        metrics.set_gauge("memory_budget_bytes", self.bytes)
+
+    def _under_pressure(self) -> bool:
+        if self.rss_limit is None:
+            return False
+        now = self.clock()
+        if now < self._next_rss_check:
+            return False
+        self._next_rss_check = now + self.rss_interval
+        rss = self.rss()
+        if rss is not None:
+            metrics.set_gauge("process_rss_bytes", rss)
+        return rss is not None and rss > self.rss_limit
+
+    def _enforce(self) -> None:
+        target, reason = self.max_bytes, "budget"
+        if self._under_pressure():
+            target, reason = min(target, int(self.bytes * self.pressure_ratio)), "pressure"
+        self._enforcing = True
+        try:
+            while self.bytes > target:
+                victim = self._least_recently_used()
+                if victim is None:
+                    break
+                key = id(victim)
+                victim.evict_oldest()
+                metrics.incr("cache_evictions", cache=self._names[key], reason=reason)
+        finally:
+            self._enforcing = False
+
+    def _least_recently_used(self) -> Any:
+        best, best_tick = None, None
+        for ref in self._members.values():
+            member = ref()
+            tick = member.oldest_tick() if member is not None else None
+            if tick is not None and (best_tick is None or tick < best_tick):
+                best, best_tick = member, tick
+        return best
+
+    def stats(self) -> Dict[str, Any]:
+        """Total, limites e bytes por tipo de cache (para o recurso de status)"""
+        by_name: Dict[str, int] = {}
+        for key, charged in self._charged.items():
+            by_name[self._names[key]] = by_name.get(self._names[key], 0) + charged
+        return {
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "rss_limit": self.rss_limit,
+            "rss": self.rss(),
+            "caches": by_name,
+        }
+
+
+# Orçamento compartilhado pelos caches do processo
+memory_budget = MemoryBudget()
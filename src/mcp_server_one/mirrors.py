@@ -0,0 +1,91 @@
+"""
+Escolha entre espelhos (mirrors) de uma API de origem
+
+Cada upstream tem uma URL base canônica (``Upstream.base_url``), usada nas
+chaves de cache e nas métricas. Com espelhos configurados, o ``APIClient``
+troca essa base pela do espelho saudável com menor latência média (EWMA) e,
+se ele falhar, tenta o próximo.
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class Mirror:
+    """Um endereço de uma API de origem e sua saúde"""
+
+    base_url: str
+    ewma: Optional[float] = None
+    failures: int = 0
+    down_until: float = 0.0
+
+    def as_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "latency_ewma": round(self.ewma, 6) if self.ewma is not None else None,
+            "healthy": self.down_until <= now,
+            "failures": self.failures,
+        }
+
+
+class MirrorSet:
+    """Espelhos de um upstream, escolhidos pela latência
+
+    ``alpha`` é o peso de cada nova medida na média. Espelhos ainda não
+    medidos vêm primeiro (na ordem configurada), para serem medidos. Um
+    espelho que falha fica de fora por ``cooldown`` segundos, dobrando a
+    cada falha seguida (até ``max_cooldown``). Se todos estiverem fora,
+    vale o que volta primeiro.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        urls: Sequence[str],
+        alpha: float = 0.3,
+        cooldown: float = 5.0,
+        max_cooldown: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not urls:
+            raise ValueError(f"Nenhum endereço configurado para {base_url}")
+        self.base_url = base_url
+        self.mirrors = [Mirror(url.rstrip("/")) for url in urls]
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.clock = clock
+
+    def ranked(self) -> List[Mirror]:
+        """Espelhos na ordem em que devem ser tentados"""
+        now = self.clock()
+        healthy = [m for m in self.mirrors if m.down_until <= now]
+        down = sorted((m for m in self.mirrors if m.down_until > now), key=lambda m: m.down_until)
+        # sorted é estável: sem medida (-1) primeiro, empates na ordem configurada
+        healthy.sort(key=lambda m: m.ewma if m.ewma is not None else -1.0)
+        return healthy + down
+
+    def url_for(self, mirror: Mirror, url: str) -> str:
+        """A URL canônica reescrita para o espelho"""
+        return mirror.base_url + url[len(self.base_url):]
+
+    def record_success(self, mirror: Mirror, latency: float) -> None:
+        """Atualiza a média de latência e a saúde após uma resposta"""
+        if mirror.ewma is None:
+            mirror.ewma = latency
+        else:
+            mirror.ewma += self.alpha * (latency - mirror.ewma)
+        mirror.failures = 0
+        mirror.down_until = 0.0
+
+    def record_failure(self, mirror: Mirror) -> None:
+        """Tira o espelho de uso por um tempo"""
+        mirror.failures += 1
+        backoff = min(self.cooldown * 2 ** (mirror.failures - 1), self.max_cooldown)
+        mirror.down_until = self.clock() + backoff
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Estado de cada espelho (para o recurso de status)"""
+        now = self.clock()
+        return [mirror.as_dict(now) for mirror in self.mirrors]
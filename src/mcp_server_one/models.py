@@ -0,0 +1,177 @@
+"""
+Modelos tipados dos dados retornados pelas APIs públicas
+"""
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict
+from pydantic.alias_generators import to_camel
+
+
+class APIModel(BaseModel):
+    """Modelo base: campos em snake_case, serializados em camelCase como nas APIs"""
+
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        frozen=True,
+    )
+
+
+class ProjectableModel(APIModel):
+    """Modelo cujos campos podem ser omitidos pela projeção (parâmetro ``fields``)"""
+
+
+class Post(ProjectableModel):
+    """Post do JSONPlaceholder"""
+
+    user_id: Optional[int] = None
+    id: Optional[int] = None
+    title: Optional[str] = None
+    body: Optional[str] = None
+
+
+class Comment(ProjectableModel):
+    """Comentário de um post do JSONPlaceholder"""
+
+    post_id: Optional[int] = None
+    id: Optional[int] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+    body: Optional[str] = None
+
+
+class Todo(ProjectableModel):
+    """Tarefa (todo) do JSONPlaceholder"""
+
+    user_id: Optional[int] = None
+    id: Optional[int] = None
+    title: Optional[str] = None
+    completed: Optional[bool] = None
+
+
+class Geo(ProjectableModel):
+    """Coordenadas do endereço de um usuário"""
+
+    lat: Optional[str] = None
+    lng: Optional[str] = None
+
+
+class Address(ProjectableModel):
+    """Endereço de um usuário"""
+
+    street: Optional[str] = None
+    suite: Optional[str] = None
+    city: Optional[str] = None
+    zipcode: Optional[str] = None
+    geo: Optional[Geo] = None
+
+
+class Company(ProjectableModel):
+    """Empresa de um usuário"""
+
+    name: Optional[str] = None
+    catch_phrase: Optional[str] = None
+    bs: Optional[str] = None
+
+
+class User(ProjectableModel):
+    """Usuário do JSONPlaceholder"""
+
+    id: Optional[int] = None
+    name: Optional[str] = None
+    username: Optional[str] = None
+    email: Optional[str] = None
+    address: Optional[Address] = None
+    phone: Optional[str] = None
+    website: Optional[str] = None
+    company: Optional[Company] = None
+
+
+class CatFact(APIModel):
+    """Fato sobre gatos"""
+
+    fact: str
+    length: int
+
+
+class CatFactPage(BaseModel):
+    """Página de fatos sobre gatos (a API usa snake_case na paginação)"""
+
+    model_config = ConfigDict(frozen=True)
+
+    current_page: int
+    data: List[CatFact]
+    last_page: int
+    per_page: int
+    total: int
+
+
+class Joke(APIModel):
+    """Piada da Official Joke API"""
+
+    id: int
+    type: str
+    setup: str
+    punchline: str
+
+
+class TodoStats(BaseModel):
+    """Todos completados e pendentes de um usuário"""
+
+    model_config = ConfigDict(frozen=True)
+
+    user_id: int
+    total: int
+    completed: int
+    pending: int
+    completion_rate: float
+
+
+class UserActivity(BaseModel):
+    """Posts de um usuário e comentários recebidos neles"""
+
+    model_config = ConfigDict(frozen=True)
+
+    user_id: int
+    posts: int
+    comments: int
+
+
+class DomainCount(BaseModel):
+    """Número de comentários de um domínio de e-mail"""
+
+    model_config = ConfigDict(frozen=True)
+
+    domain: str
+    comments: int
+
+
+class SearchHit(BaseModel):
+    """Resultado de uma busca textual"""
+
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    score: float
+    snippet: str
+
+
+class UserProfileBundle(BaseModel):
+    """Usuário, estatísticas dos todos e (opcionalmente) os todos, buscados em paralelo"""
+
+    model_config = ConfigDict(frozen=True)
+
+    user: Optional[User] = None
+    todo_stats: Optional[TodoStats] = None
+    todos: Optional[List[Todo]] = None
+    errors: Dict[str, str] = {}
+
+
+class DailyInspirationBundle(BaseModel):
+    """Fato sobre gatos e piada, buscados em paralelo"""
+
+    model_config = ConfigDict(frozen=True)
+
+    cat_fact: Optional[CatFact] = None
+    joke: Optional[Joke] = None
+    errors: Dict[str, str] = {}
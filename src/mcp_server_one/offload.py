@@ -0,0 +1,138 @@
+"""
+Codificação e decodificação de JSON grande fora do event loop
+
+Decodificar a resposta de uma API grande ou serializar um resultado grande
+segura o event loop (e todas as sessões) pelo tempo da operação. Acima de
+``threshold`` bytes (estimados) o ``Offloader`` executa a função em um pool
+de workers; abaixo disso ela roda na hora, onde a troca de thread custaria
+mais que o próprio trabalho.
+
+O pool padrão é de threads: ``json.dumps`` com ``indent`` roda em Python e
+libera o GIL periodicamente, mas ``json.loads`` é C e só alivia parte do
+atraso. Com ``kind="process"`` as funções rodam em outro processo; o custo
+passa a ser o pickle dos argumentos e do resultado no loop.
+"""
+import asyncio
+import functools
+import json
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import metrics
+
+
+# Itens amostrados por lista em ``estimate_size``
+_SAMPLES = 3
+
+
+def estimate_size(data: Any) -> int:
+    """Tamanho aproximado de ``data`` em JSON, sem serializar tudo
+
+    Listas são estimadas pela média de alguns itens (primeiro, meio e
+    último) multiplicada pelo comprimento.
+    """
+    if isinstance(data, list):
+        if not data:
+            return 2
+        step = max(1, len(data) // _SAMPLES)
+        sample = data[::step][:_SAMPLES]
+        return len(data) * sum(estimate_size(item) + 1 for item in sample) // len(sample)
+    if isinstance(data, dict):
+        return sum(len(str(key)) + 4 + estimate_size(value) for key, value in data.items()) + 2
+    if isinstance(data, str):
+        return len(data) + 2
+    return 8
+
+
+class Offloader:
+    """Executa funções caras em um pool, conforme o tamanho da entrada
+
+    No máximo ``max_workers`` execuções ao mesmo tempo e ``max_pending``
+    na fila; além disso, quem chama espera a vez (sem bloquear o loop).
+    Métricas: ``offload_calls{mode=inline|pool}`` e ``offload_wait_seconds``.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 128 * 1024,
+        max_workers: int = 2,
+        max_pending: int = 32,
+        kind: str = "thread",
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Tipo de pool inválido: {kind}")
+        self.threshold = threshold
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def configure(self, threshold: int, max_workers: int, kind: str) -> None:
+        """Troca os parâmetros; o pool atual (se houver) termina o que já recebeu"""
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Tipo de pool inválido: {kind}")
+        # Na recarga há chamadas em andamento esperando pelo pool atual
+        self.shutdown(cancel_pending=False)
+        self.threshold = threshold
+        self.max_workers = max_workers
+        self.kind = kind
+
+    async def run(self, size: int, func: Callable[..., Any], *args: Any) -> Any:
+        """``func(*args)``: na hora abaixo do limite, no pool a partir dele"""
+        if size < self.threshold or self.max_workers <= 0:
+            metrics.incr("offload_calls", mode="inline")
+            return func(*args)
+        metrics.incr("offload_calls", mode="pool")
+        loop = asyncio.get_running_loop()
+        slots = self._slots
+        if slots is None or self._loop is not loop:
+            slots = self._slots = asyncio.Semaphore(self.max_workers + self.max_pending)
+            self._loop = loop
+        start = loop.time()
+        async with slots:
+            metrics.observe("offload_wait_seconds", loop.time() - start)
+            return await loop.run_in_executor(self._pool(), func, *args)
+
+    async def loads(self, raw: bytes) -> Any:
+        """``json.loads`` do corpo de uma resposta"""
+        return await self.run(len(raw), json.loads, raw)
+
+    async def dumps(self, data: Any, size: Optional[int] = None, **kwargs: Any) -> str:
+        """``json.dumps``; ``size`` evita estimar o tamanho de novo"""
+        if size is None:
+            size = estimate_size(data)
+        text: str = await self.run(size, functools.partial(json.dumps, **kwargs), data)
+        return text
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="offload")
+        return self._executor
+
+    def shutdown(self, cancel_pending: bool = True) -> None:
+        """Encerra o pool; um novo é criado no próximo uso
+
+        Com ``cancel_pending=False`` o que já está na fila ainda roda.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=cancel_pending)
+            self._executor = None
+        self._slots = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Parâmetros atuais (para o recurso de status)"""
+        return {
+            "threshold": self.threshold,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "kind": self.kind,
+        }
+
+
+# Instância compartilhada pelo cliente das APIs e pelas ferramentas
+offloader = Offloader()
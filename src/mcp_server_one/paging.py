@@ -0,0 +1,209 @@
+"""
+Paginação de respostas grandes com cursores mantidos no servidor
+"""
+import json
+import secrets
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .memory import MemoryBudget
+
+
+# Estimativa usual: ~4 bytes de JSON por token
+BYTES_PER_TOKEN = 4
+DEFAULT_MAX_TOKENS = 8000
+
+
+def estimate_tokens(nbytes: int) -> int:
+    """Estima o número de tokens de um texto com ``nbytes`` bytes"""
+    return (nbytes + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+
+
+def page_bytes(max_tokens: Optional[int] = None) -> int:
+    """Tamanho máximo (JSON compacto) de uma página com ``max_tokens``"""
+    budget = max_tokens if max_tokens and max_tokens > 0 else DEFAULT_MAX_TOKENS
+    return budget * BYTES_PER_TOKEN
+
+
+def encode_items(items: Sequence[Any]) -> List[str]:
+    """JSON compacto de cada item (o tamanho de cada um define as páginas)"""
+    return [json.dumps(item, separators=(",", ":"), ensure_ascii=False) for item in items]
+
+
+@dataclass
+class Page:
+    """Uma página de itens e o cursor para a próxima (se houver)"""
+
+    items: List[Any]
+    offset: int
+    total: int
+    next_cursor: Optional[str] = None
+    size: Optional[int] = None  # bytes dos itens em JSON compacto
+
+    def as_meta(self) -> Dict[str, Any]:
+        """Metadados de paginação para anexar ao resultado"""
+        return {
+            "offset": self.offset,
+            "returned": len(self.items),
+            "total": self.total,
+            "next_cursor": self.next_cursor,
+        }
+
+
+@dataclass
+class _Result:
+    """Lista completa (um JSON compacto por item) compartilhada pelos cursores
+
+    Guardar o texto em vez dos objetos ocupa uma fração da memória; só os
+    itens da página pedida são decodificados.
+    """
+
+    encoded: List[str]
+    max_bytes: int
+    memory: int
+    refs: int = 0
+
+    def decode(self, start: int, end: int) -> List[Any]:
+        items: List[Any] = json.loads("[" + ",".join(self.encoded[start:end]) + "]")
+        return items
+
+
+@dataclass
+class _Cursor:
+    result: _Result
+    offset: int
+    expires_at: float
+    tick: int = 0
+
+
+class CursorStore:
+    """Cursores opacos com expiração e remoção LRU
+
+    A lista completa fica em memória (sem nova busca na origem) enquanto
+    houver cursores apontando para ela. Com ``max_bytes``, os cursores mais
+    antigos são removidos quando as listas mantidas passam desse tamanho;
+    com ``budget``, também pelo orçamento de memória compartilhado.
+    """
+
+    def __init__(
+        self,
+        max_cursors: int = 256,
+        ttl: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: Optional[int] = None,
+        budget: Optional[MemoryBudget] = None,
+    ):
+        self.max_cursors = max_cursors
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.budget = budget
+        self.bytes = 0
+        self._cursors: "OrderedDict[str, _Cursor]" = OrderedDict()
+        if budget is not None:
+            budget.join(self, "cursors")
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def _tick(self) -> int:
+        return self.budget.tick() if self.budget is not None else 0
+
+    def paginate(
+        self,
+        items: Sequence[Any],
+        max_tokens: Optional[int] = None,
+        encoded: Optional[List[str]] = None,
+    ) -> Page:
+        """Retorna a primeira página de ``items`` que cabe no orçamento
+
+        ``encoded`` (de ``encode_items``) pode vir calculado de antemão.
+        """
+        if encoded is None:
+            encoded = encode_items(items)
+        result = _Result(
+            encoded=encoded,
+            max_bytes=page_bytes(max_tokens),
+            memory=sys.getsizeof(encoded) + sum(sys.getsizeof(text) for text in encoded),
+        )
+        return self._page(result, 0, items)
+
+    def next_page(self, cursor: str) -> Page:
+        """Retorna a página apontada pelo cursor
+
+        Levanta ``KeyError`` se o cursor não existe ou expirou.
+        """
+        state = self._cursors.get(cursor)
+        if state is None or state.expires_at < self.clock():
+            if state is not None:
+                self._drop(cursor)
+            raise KeyError(cursor)
+        self._cursors.move_to_end(cursor)
+        state.tick = self._tick()
+        return self._page(state.result, state.offset)
+
+    def _page(self, result: _Result, offset: int, items: Optional[Sequence[Any]] = None) -> Page:
+        end = offset
+        used = 0
+        total = len(result.encoded)
+        while end < total:
+            size = len(result.encoded[end])
+            # Sempre retorna ao menos um item, mesmo que maior que o orçamento
+            if end > offset and used + size > result.max_bytes:
+                break
+            used += size
+            end += 1
+
+        next_cursor = self._add(result, end) if end < total else None
+        return Page(
+            items=list(items[offset:end]) if items is not None else result.decode(offset, end),
+            offset=offset,
+            total=total,
+            next_cursor=next_cursor,
+            size=used,
+        )
+
+    def _add(self, result: _Result, offset: int) -> str:
+        cursor = secrets.token_urlsafe(12)
+        self._cursors[cursor] = _Cursor(
+            result=result, offset=offset, expires_at=self.clock() + self.ttl, tick=self._tick()
+        )
+        result.refs += 1
+        if result.refs == 1:
+            self._charge(result.memory)
+        while len(self._cursors) > self.max_cursors or (
+            self.max_bytes is not None
+            and len(self._cursors) > 1
+            and self.bytes > self.max_bytes
+        ):
+            self.evict_oldest()
+        return cursor
+
+    def _drop(self, cursor: str) -> None:
+        state = self._cursors.pop(cursor)
+        state.result.refs -= 1
+        if state.result.refs == 0:
+            self._charge(-state.result.memory)
+
+    def _charge(self, delta: int) -> None:
+        self.bytes += delta
+        if self.budget is not None:
+            self.budget.charge(self, delta)
+
+    def oldest_tick(self) -> Optional[int]:
+        """Contador do último acesso ao cursor menos usado (ver ``MemoryBudget``)"""
+        for state in self._cursors.values():
+            return state.tick
+        return None
+
+    def evict_oldest(self) -> None:
+        """Remove o cursor menos usado"""
+        if self._cursors:
+            self._drop(next(iter(self._cursors)))
+
+    def memory_bytes(self) -> int:
+        """Memória ocupada pelas listas mantidas pelos cursores"""
+        return self.bytes
@@ -0,0 +1,151 @@
+"""
+Pré-busca em lote para APIs de conteúdo aleatório (fatos, piadas)
+"""
+import asyncio
+import logging
+import random
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set
+
+from .api_client import APIManager
+from .deadlines import detached_context, within_deadline
+from .metrics import metrics
+from .scheduling import BATCH, Caller, set_caller
+
+
+logger = logging.getLogger(__name__)
+
+# Tentativas de reabastecer antes de repetir itens já vistos pela sessão
+MAX_REFILLS_PER_TAKE = 3
+
+
+class PrefetchPool:
+    """Buffer de itens buscados em lote e servidos um a um
+
+    Quando o buffer fica abaixo de ``low_watermark`` um novo lote é buscado
+    em segundo plano (um por vez). Itens repetidos não entram no buffer, e
+    quem passa o conjunto ``seen`` (por sessão) não recebe o mesmo item duas
+    vezes enquanto houver outros.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch_batch: Callable[[], Awaitable[List[Any]]],
+        key: Callable[[Any], Hashable],
+        capacity: int = 50,
+        low_watermark: int = 10,
+    ):
+        self.name = name
+        self.fetch_batch = fetch_batch
+        self.key = key
+        self.capacity = capacity
+        self.low_watermark = low_watermark
+        self._buffer: Deque[Any] = deque()
+        self._keys: Set[Hashable] = set()
+        self._refill: Optional["asyncio.Future[int]"] = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def take(self, seen: Optional[Set[Hashable]] = None) -> Any:
+        """Retorna um item cuja chave não está em ``seen`` (e a adiciona)"""
+        if seen is None:
+            seen = set()
+        waited = False
+        for _ in range(MAX_REFILLS_PER_TAKE):
+            item = self._pop_unseen(seen)
+            if item is not None:
+                break
+            waited = True
+            # shield: quem desiste (ou estoura o prazo) não cancela o lote
+            # que outras chamadas aguardam
+            async with within_deadline(f"lote de {self.name}"):
+                await asyncio.shield(self._start_refill())
+        else:
+            # A sessão já viu tudo o que a origem tem oferecido: recomeça
+            seen.clear()
+            item = self._pop_unseen(seen)
+            if item is None:
+                raise LookupError(f"Nenhum item disponível em {self.name}")
+
+        if len(self._buffer) < self.low_watermark:
+            self._start_refill()
+        metrics.incr("pool_requests", pool=self.name, result="wait" if waited else "hit")
+        return item
+
+    def _pop_unseen(self, seen: Set[Hashable]) -> Any:
+        for item in self._buffer:
+            key = self.key(item)
+            if key not in seen:
+                self._buffer.remove(item)
+                self._keys.discard(key)
+                seen.add(key)
+                metrics.set_gauge("pool_size", len(self._buffer), pool=self.name)
+                return item
+        return None
+
+    def _start_refill(self) -> "asyncio.Future[int]":
+        """Busca um lote, se não houver uma busca em andamento"""
+        if self._refill is None or self._refill.done():
+            # Sem o prazo nem a prioridade de quem pediu: o lote serve a
+            # todas as chamadas e entra como trabalho de fundo
+            context = detached_context()
+            context.run(set_caller, Caller("prefetch", BATCH))
+            self._refill = asyncio.get_running_loop().create_task(self._fill(), context=context)
+            self._refill.add_done_callback(self._refill_done)
+        return self._refill
+
+    def _refill_done(self, task: "asyncio.Future[int]") -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Falha ao reabastecer %s: %s", self.name, task.exception())
+
+    async def _fill(self) -> int:
+        items = await self.fetch_batch()
+        metrics.incr("pool_batches", pool=self.name)
+        added = 0
+        for item in items:
+            key = self.key(item)
+            if key in self._keys or len(self._buffer) >= self.capacity:
+                continue
+            self._buffer.append(item)
+            self._keys.add(key)
+            added += 1
+        metrics.set_gauge("pool_size", len(self._buffer), pool=self.name)
+        return added
+
+    async def close(self) -> None:
+        """Cancela o reabastecimento em andamento"""
+        if self._refill is not None and not self._refill.done():
+            self._refill.cancel()
+            try:
+                await self._refill
+            except asyncio.CancelledError:
+                pass
+
+
+def _cat_fact_batches(api_manager: APIManager, size: int = 25) -> Callable[[], Awaitable[List[Any]]]:
+    """Lotes de fatos de páginas aleatórias de /facts"""
+    last_page = 1
+
+    async def fetch() -> List[Any]:
+        nonlocal last_page
+        page = await api_manager.catfacts.get_facts(
+            limit=size, page=random.randint(1, last_page)
+        )
+        last_page = page.get("last_page") or 1
+        return page.get("data") or []
+
+    return fetch
+
+
+def build_pools(api_manager: APIManager) -> Dict[str, PrefetchPool]:
+    """Pools das ferramentas com ``pooled``, pelo nome do endpoint"""
+    return {
+        "get_random_fact": PrefetchPool(
+            "catfacts", _cat_fact_batches(api_manager), key=lambda fact: fact.get("fact")
+        ),
+        "get_random_joke": PrefetchPool(
+            "jokes", lambda: api_manager.jokes.get_random_jokes(), key=lambda joke: joke.get("id")
+        ),
+    }
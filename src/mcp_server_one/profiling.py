@@ -0,0 +1,185 @@
+"""
+Perfis do servidor em execução: CPU por amostragem e crescimento de memória
+
+``SamplingProfiler`` amostra as pilhas de todas as threads a cada
+``interval`` segundos, a partir de uma thread própria, por uma janela
+limitada. O resultado é gravado no formato "folded" (uma pilha por linha,
+seguida da contagem), aceito por ``flamegraph.pl`` e pelo speedscope.
+``MemoryTracker`` compara snapshots do ``tracemalloc`` entre chamadas.
+
+Nada roda até ser pedido pelas ferramentas de administração (ver
+``config.admin_settings``).
+"""
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+
+# Limites que valem mesmo para pedidos maiores
+MAX_DURATION = 300.0
+MIN_INTERVAL = 0.001
+MAX_DEPTH = 128
+
+# Funções mostradas no resumo
+_TOP = 10
+
+# Número de cada perfil no processo (dois no mesmo segundo não se sobrescrevem)
+_profile_numbers = itertools.count(1)
+
+
+def _label(code: Any, lineno: int) -> str:
+    path = code.co_filename.replace(os.sep, "/").split("/")
+    # ';' separa quadros no formato folded
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{lineno})".replace(";", ",")
+
+
+def _folded(frame: Any) -> List[str]:
+    stack: List[str] = []
+    while frame is not None and len(stack) < MAX_DEPTH:
+        stack.append(_label(frame.f_code, frame.f_lineno))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class SamplingProfiler:
+    """Profiler de CPU por amostragem, um por vez, com janela limitada
+
+    O custo é o de ler as pilhas (``sys._current_frames``) a cada amostra,
+    fora do event loop; o código medido não é instrumentado.
+    """
+
+    def __init__(self, output_dir: Optional[str] = None):
+        self.output_dir = output_dir or tempfile.gettempdir()
+        self.last_result: Optional[Dict[str, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float = 30.0, interval: float = 0.01) -> Dict[str, Any]:
+        """Inicia a amostragem; termina sozinha após ``duration`` segundos
+
+        Levanta ``RuntimeError`` se já houver um perfil em andamento.
+        """
+        if self.running:
+            raise RuntimeError("Já existe um perfil em andamento")
+        duration = min(max(duration, 0.0), MAX_DURATION)
+        interval = max(interval, MIN_INTERVAL)
+        name = (
+            f"mcp-profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+            f"-{next(_profile_numbers)}.folded"
+        )
+        path = os.path.join(self.output_dir, name)
+        self._stop.clear()
+        self.last_result = None
+        self._thread = threading.Thread(
+            target=self._run, args=(duration, interval, path), name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+        return {"path": path, "duration": duration, "interval": interval}
+
+    def stop(self) -> Dict[str, Any]:
+        """Interrompe a amostragem (se ainda ativa) e retorna o resumo
+
+        Levanta ``RuntimeError`` se nenhum perfil foi iniciado.
+        """
+        if self._thread is None:
+            raise RuntimeError("Nenhum perfil em andamento")
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self.last_result is None:
+            raise RuntimeError("O perfil não pôde ser gravado")
+        return self.last_result
+
+    def _run(self, duration: float, interval: float, path: str) -> None:
+        me = threading.get_ident()
+        stacks: Counter = Counter()
+        samples = 0
+        start = time.perf_counter()
+        deadline = start + duration
+        while not self._stop.is_set() and time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    thread = names.get(ident, str(ident)).replace(";", ",")
+                    stacks[";".join([thread] + _folded(frame))] += 1
+            samples += 1
+            self._stop.wait(interval)
+        elapsed = time.perf_counter() - start
+
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in stacks.most_common():
+                file.write(f"{stack} {count}\n")
+        leaves: Counter = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(stacks.values()) or 1
+        self.last_result = {
+            "path": path,
+            "samples": samples,
+            "elapsed": round(elapsed, 3),
+            "top": [
+                {"frame": frame, "samples": count, "share": round(count / total, 4)}
+                for frame, count in leaves.most_common(_TOP)
+            ],
+        }
+
+
+class MemoryTracker:
+    """Diferença de memória alocada entre snapshots do ``tracemalloc``
+
+    A primeira chamada de ``diff`` liga o ``tracemalloc`` (que custa CPU e
+    memória enquanto ativo) e guarda a base; as seguintes comparam com o
+    snapshot anterior. ``stop`` desliga o rastreamento.
+    """
+
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return self._snapshot is not None
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+
+    def diff(self, limit: int = 10) -> Dict[str, Any]:
+        """Maiores crescimentos (por linha) desde a chamada anterior"""
+        if self._snapshot is None:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            self._snapshot = self._take()
+            return {"started": True, "traced_bytes": tracemalloc.get_traced_memory()[0]}
+        snapshot = self._take()
+        stats = snapshot.compare_to(self._snapshot, "lineno")
+        self._snapshot = snapshot
+        return {
+            "started": False,
+            "traced_bytes": tracemalloc.get_traced_memory()[0],
+            "top": [
+                {"location": str(stat.traceback[0]), "size_diff": stat.size_diff,
+                 "count_diff": stat.count_diff, "size": stat.size}
+                for stat in stats[:limit]
+            ],
+        }
+
+    def stop(self) -> None:
+        """Desliga o ``tracemalloc`` e descarta a base"""
+        self._snapshot = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
@@ -0,0 +1,120 @@
+"""
+Notificações de progresso e resultados parciais das ferramentas
+"""
+import logging
+import time
+from typing import Any, Callable, List, Optional
+
+from mcp.server.fastmcp import Context
+
+from .paging import encode_items
+
+
+logger = logging.getLogger(__name__)
+
+# Logger das notificações com resultados parciais (notifications/message)
+PARTIAL_RESULTS_LOGGER = "partial_results"
+
+
+class ProgressReporter:
+    """Envia o progresso de uma chamada de ferramenta ao cliente
+
+    O progresso só é enviado se a requisição trouxe ``_meta.progressToken``,
+    e no máximo a cada ``min_interval`` segundos (a notificação final sempre
+    sai). Se o cliente pediu ``_meta.partialResults``, os itens recebidos
+    também são enviados em lotes, antes do resultado final.
+
+    Os itens parciais passam por ``transform`` (a projeção de ``fields``) e,
+    com ``max_bytes``, param quando a primeira página do resultado estaria
+    cheia: o cliente não recebe antes o que a ferramenta não entregaria.
+    """
+
+    def __init__(
+        self,
+        ctx: Optional[Context],
+        min_interval: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+        transform: Optional[Callable[[List[Any]], List[Any]]] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        meta = ctx.request_context.meta if ctx is not None else None
+        self.ctx = ctx
+        self.token = getattr(meta, "progressToken", None)
+        self.partial = self.token is not None and bool(getattr(meta, "partialResults", False))
+        self.min_interval = min_interval
+        self.clock = clock
+        self.transform = transform
+        self.max_bytes = max_bytes
+        self.sent_items = 0
+        self.partial_bytes = 0
+        self.progress = 0.0
+        self._pending: List[Any] = []
+        self._last = float("-inf")
+
+    @property
+    def active(self) -> bool:
+        """Indica se há para quem enviar o progresso"""
+        return self.token is not None
+
+    async def update(
+        self,
+        progress: float,
+        total: Optional[float] = None,
+        message: Optional[str] = None,
+        final: bool = False,
+    ) -> None:
+        """Envia o progresso (respeitando o intervalo mínimo)"""
+        if not self.active or self.ctx is None:
+            return
+        self.progress = progress
+        now = self.clock()
+        if not final and now - self._last < self.min_interval:
+            return
+        self._last = now
+        try:
+            if self._pending:
+                await self._send_partial()
+            await self.ctx.report_progress(progress, total, message)
+        except Exception as e:
+            # O cliente pode ter desistido; o progresso não deve derrubar a chamada
+            logger.debug("Falha ao enviar progresso: %s", e)
+
+    async def on_fetch(self, received: int, total: Optional[int], items: List[Any]) -> None:
+        """Observador de ``APIClient``: bytes recebidos e itens já decodificados"""
+        if self.partial and items:
+            self._add_partial(items)
+        count = self.sent_items + len(self._pending)
+        message = f"{count} itens recebidos" if count else None
+        await self.update(received, total, message, final=total is not None and received >= total)
+
+    def _add_partial(self, items: List[Any]) -> None:
+        if self.transform is not None:
+            items = self.transform(items)
+        if self.max_bytes is not None:
+            # Mesmo corte da paginação: ao menos um item, depois até o limite
+            fits = 0
+            for size in map(len, encode_items(items)):
+                if (self.sent_items + len(self._pending) + fits
+                        and self.partial_bytes + size > self.max_bytes):
+                    self.partial = False
+                    break
+                self.partial_bytes += size
+                fits += 1
+            items = items[:fits]
+        self._pending.extend(items)
+
+    async def finish(self, message: Optional[str] = None) -> None:
+        """Envia os itens pendentes e o progresso final (100%)"""
+        done = self.progress or 1
+        await self.update(done, done, message, final=True)
+
+    async def _send_partial(self) -> None:
+        assert self.ctx is not None
+        items, self._pending = self._pending, []
+        await self.ctx.request_context.session.send_log_message(
+            level="info",
+            data={"progressToken": self.token, "offset": self.sent_items, "items": items},
+            logger=PARTIAL_RESULTS_LOGGER,
+            related_request_id=self.ctx.request_id,
+        )
+        self.sent_items += len(items)
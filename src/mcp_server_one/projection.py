@@ -0,0 +1,67 @@
+"""
+Projeção de campos nas respostas das ferramentas
+"""
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+# Árvore de campos: {"id": None, "address": {"city": None}}.
+# None indica que o valor inteiro do campo é mantido.
+FieldTree = Dict[str, Optional["FieldTree"]]
+
+
+@lru_cache(maxsize=256)
+def _compile(fields: Tuple[str, ...]) -> FieldTree:
+    tree: FieldTree = {}
+    for field in fields:
+        node = tree
+        parts = [part for part in field.strip().split(".") if part]
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            if part in node and node[part] is None:
+                # Um campo inteiro já foi pedido; subcampos são redundantes
+                break
+            if last:
+                node[part] = None
+            else:
+                child = node.get(part)
+                if child is None:
+                    child = node[part] = {}
+                node = child
+    return tree
+
+
+def parse_fields(fields: Optional[Sequence[str]]) -> Optional[FieldTree]:
+    """Converte a lista de campos (com caminhos "a.b") em uma árvore
+
+    Retorna None quando não há projeção a aplicar.
+    """
+    if not fields:
+        return None
+    tree = _compile(tuple(fields))
+    return tree or None
+
+
+def _project_item(item: Any, tree: FieldTree) -> Any:
+    if isinstance(item, list):
+        return [_project_item(value, tree) for value in item]
+    if not isinstance(item, dict):
+        return item
+    projected = {}
+    for key, subtree in tree.items():
+        if key not in item:
+            continue
+        value = item[key]
+        projected[key] = value if subtree is None else _project_item(value, subtree)
+    return projected
+
+
+def project(data: Any, tree: Optional[FieldTree]) -> Any:
+    """Projeta um objeto (ou lista de objetos) nos campos da árvore
+
+    Os objetos originais (em geral vindos do cache) não são copiados nem
+    alterados: apenas os campos pedidos são referenciados em novos dicts.
+    Campos inexistentes são ignorados.
+    """
+    if tree is None:
+        return data
+    return _project_item(data, tree)
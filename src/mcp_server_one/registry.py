@@ -0,0 +1,217 @@
+"""
+Registro declarativo das APIs de origem (upstreams)
+
+Cada upstream descreve sua URL base, política de cache, limite de
+concorrência e endpoints. A partir dessa descrição são gerados os métodos
+dos clientes (``JSONPlaceholderAPI.get_posts`` etc.) e as ferramentas MCP.
+"""
+import inspect
+import string
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+
+REQUIRED = inspect.Parameter.empty
+
+# Onde cada parâmetro é usado na requisição
+PATH = "path"      # substituído no caminho: /posts/{post_id}
+QUERY = "query"    # query string: /facts?limit=10
+BODY = "body"      # corpo JSON do POST
+SLICE = "slice"    # aplicado no resultado: resultado[:limit]
+
+# Tipos de requisição
+GET = "GET"
+POST = "POST"
+BYTES = "BYTES"    # GET que retorna bytes (ex.: imagens)
+
+
+@dataclass(frozen=True)
+class Param:
+    """Parâmetro de um endpoint"""
+
+    name: str
+    type: Any
+    default: Any = REQUIRED
+    description: str = ""
+    location: str = PATH
+    wire_name: Optional[str] = None
+
+    @property
+    def wire(self) -> str:
+        """Nome usado na API de origem"""
+        return self.wire_name or self.name
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """Ferramenta MCP gerada para um endpoint
+
+    ``log`` e ``error`` são modelos de mensagem formatados com os argumentos
+    da chamada (e ``count``, o número de itens retornados, em ``log``).
+    Com ``pooled`` a ferramenta é servida pelo pool de pré-busca registrado
+    com o nome do endpoint, em vez de uma requisição por chamada.
+    """
+
+    name: str
+    description: str
+    output: Any = None
+    defaults: Mapping[str, Any] = field(default_factory=dict)
+    projection: bool = False
+    paging: bool = False
+    pooled: bool = False
+    log: str = ""
+    error: str = ""
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """Endpoint de uma API de origem
+
+    ``paths`` lista caminhos alternativos; é usado o primeiro cujos
+    parâmetros de caminho têm todos valor verdadeiro (como o ``if post_id:``
+    dos clientes escritos à mão: ``post_id=0`` cai no caminho seguinte). O
+    último só exige os parâmetros diferentes de ``None``.
+    """
+
+    name: str
+    paths: Tuple[str, ...]
+    description: str
+    params: Tuple[Param, ...] = ()
+    method: str = GET
+    tool: Optional[ToolSpec] = None
+
+
+@dataclass(frozen=True)
+class Upstream:
+    """API de origem
+
+    ``accept_encoding`` lista as compressões pedidas à origem (``None``:
+    todas as disponíveis; vazio: nenhuma, para conteúdo já comprimido).
+    """
+
+    name: str
+    class_name: str
+    title: str
+    base_url: str
+    description: str
+    endpoints: Tuple[Endpoint, ...]
+    cache_ttl: Optional[float] = None
+    max_concurrency: Optional[int] = None
+    accept_encoding: Optional[Tuple[str, ...]] = None
+
+    def endpoint_paths(self) -> List[str]:
+        """Caminhos de todos os endpoints (para documentação)"""
+        return [path for endpoint in self.endpoints for path in endpoint.paths]
+
+
+class UpstreamAPI:
+    """Base dos clientes gerados a partir de um ``Upstream``"""
+
+    BASE_URL = ""
+    SPEC: Upstream
+
+    def __init__(self, client: Any):
+        self.client = client
+
+
+def _placeholders(path: str) -> Tuple[str, ...]:
+    return tuple(name for _, name, _, _ in string.Formatter().parse(path) if name)
+
+
+def _signature(params: Tuple[Param, ...], defaults: Mapping[str, Any]) -> List[inspect.Parameter]:
+    return [
+        inspect.Parameter(
+            param.name,
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            default=defaults.get(param.name, param.default),
+            annotation=param.type,
+        )
+        for param in params
+    ]
+
+
+def _make_method(endpoint: Endpoint, blob: bool = False) -> Callable[..., Any]:
+    """Gera o método assíncrono do cliente para o endpoint
+
+    Tudo o que não depende dos argumentos (nomes, padrões, caminhos) é
+    calculado aqui, uma vez, e não a cada chamada. Com ``blob`` (endpoints
+    ``BYTES``) o método retorna um ``Blob`` já em base64 em vez dos bytes.
+    """
+    names = tuple(param.name for param in endpoint.params)
+    defaults = {p.name: p.default for p in endpoint.params if p.default is not REQUIRED}
+    last = len(endpoint.paths) - 1
+    paths = tuple(
+        (path, _placeholders(path), index == last) for index, path in enumerate(endpoint.paths)
+    )
+    query = tuple((p.name, p.wire) for p in endpoint.params if p.location == QUERY)
+    body = tuple((p.name, p.wire) for p in endpoint.params if p.location == BODY)
+    slices = tuple(p.name for p in endpoint.params if p.location == SLICE)
+    method = endpoint.method
+
+    async def call(self: UpstreamAPI, *args: Any, **kwargs: Any) -> Any:
+        values = dict(defaults)
+        values.update(zip(names, args))
+        values.update(kwargs)
+        missing = [name for name in names if name not in values]
+        if missing:
+            raise TypeError(f"{endpoint.name}() faltando argumentos: {', '.join(missing)}")
+
+        for path, placeholders, fallback in paths:
+            if all(values[name] is not None if fallback else values[name]
+                   for name in placeholders):
+                url = self.BASE_URL + path.format(
+                    **{name: quote(str(values[name]), safe="") for name in placeholders}
+                )
+                break
+        else:
+            raise ValueError(f"Nenhum caminho de {endpoint.name} casa com os argumentos")
+
+        if method == POST:
+            return await self.client.post(url, {wire: values[name] for name, wire in body})
+
+        params = {wire: values[name] for name, wire in query if values[name] is not None}
+        if blob:
+            fetch = self.client.get_blob
+        elif method == BYTES:
+            fetch = self.client.get_bytes
+        else:
+            fetch = self.client.get
+        result = await (fetch(url, params) if params else fetch(url))
+        for name in slices:
+            if values[name]:
+                result = result[:values[name]]
+        return result
+
+    name = f"{endpoint.name}_blob" if blob else endpoint.name
+    call.__name__ = name
+    call.__qualname__ = name
+    call.__doc__ = endpoint.description
+    call.__signature__ = inspect.Signature(  # type: ignore[attr-defined]
+        [inspect.Parameter("self", inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+        + _signature(endpoint.params, {})
+    )
+    return call
+
+
+def build_api_class(upstream: Upstream) -> type:
+    """Gera a classe cliente de um upstream
+
+    Endpoints ``BYTES`` ganham também ``<nome>_blob`` (ver ``_make_method``).
+    """
+    namespace: Dict[str, Any] = {
+        "__doc__": f"Cliente para {upstream.title}",
+        "BASE_URL": upstream.base_url,
+        "SPEC": upstream,
+    }
+    for endpoint in upstream.endpoints:
+        namespace[endpoint.name] = _make_method(endpoint)
+        if endpoint.method == BYTES:
+            namespace[f"{endpoint.name}_blob"] = _make_method(endpoint, blob=True)
+    return type(upstream.class_name, (UpstreamAPI,), namespace)
+
+
+def tool_signature(endpoint: Endpoint) -> List[inspect.Parameter]:
+    """Parâmetros (sem ``ctx`` e extras) da ferramenta gerada para o endpoint"""
+    assert endpoint.tool is not None
+    return _signature(endpoint.params, endpoint.tool.defaults)
@@ -0,0 +1,179 @@
+"""
+Gravação e reprodução do tráfego com as APIs de origem
+
+Em modo ``record`` cada requisição à origem e sua resposta (com o tempo
+que levou) são gravadas em um cassete JSON Lines (``.gz`` para comprimir).
+Em modo ``replay`` o cassete é servido por um transporte httpx, sem rede,
+com a latência original multiplicada por ``latency_scale``. Assim testes de
+desempenho são reproduzíveis e o servidor pode ser testado em taxas que as
+APIs públicas não permitiriam.
+"""
+import asyncio
+import base64
+import gzip
+import json
+import os
+import time
+from typing import IO, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+
+# Variáveis de ambiente lidas por ``transport_from_env``
+MODE_ENV = "MCP_UPSTREAM_MODE"            # live (padrão), record ou replay
+CASSETTE_ENV = "MCP_CASSETTE"             # caminho do cassete
+LATENCY_SCALE_ENV = "MCP_REPLAY_LATENCY_SCALE"
+
+# Cabeçalhos de resposta mantidos no cassete
+_KEPT_HEADERS = ("content-type", "content-encoding")
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+
+def _key(method: str, url: str, body: bytes) -> Tuple[str, str, str]:
+    return method, url, body.decode("utf-8", "replace")
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Repassa as requisições ao transporte real e grava cada troca
+
+    O corpo é gravado como chegou (ainda comprimido, se for o caso); texto
+    vai como ``body`` e o restante em base64, como ``body_b64``.
+    """
+
+    def __init__(self, path: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.path = path
+        self.inner = inner if inner is not None else httpx.AsyncHTTPTransport()
+        self._file: Optional[IO[str]] = None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        try:
+            # O stream do transporte: bytes como vieram da rede
+            raw = b"".join([chunk async for chunk in response.stream])  # type: ignore[union-attr]
+        finally:
+            await response.aclose()
+        elapsed = time.perf_counter() - start
+
+        headers = {
+            name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers
+        }
+        entry: Dict[str, Any] = {
+            "method": request.method,
+            "url": str(request.url),
+            "request_body": request.content.decode("utf-8", "replace"),
+            "status": response.status_code,
+            "headers": headers,
+            "elapsed": round(elapsed, 6),
+        }
+        if "content-encoding" in headers:
+            entry["body_b64"] = base64.b64encode(raw).decode("ascii")
+        else:
+            try:
+                entry["body"] = raw.decode("utf-8")
+            except UnicodeDecodeError:
+                entry["body_b64"] = base64.b64encode(raw).decode("ascii")
+        self._write(entry)
+
+        return httpx.Response(
+            response.status_code, headers=headers, content=raw, request=request,
+        )
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        if self._file is None:
+            self._file = _open(self.path, "a")
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    async def aclose(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve as respostas de um cassete, sem rede
+
+    A requisição casa pelo método, URL completa e corpo; se não houver
+    gravação exata, vale qualquer uma do mesmo método e caminho (útil para
+    parâmetros aleatórios, como a página do pool de fatos). Várias gravações
+    para a mesma requisição são servidas em rodízio. Sem nenhuma, levanta
+    ``httpx.ConnectError``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        latency_scale: float = 1.0,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self.latency_scale = latency_scale
+        self.sleep = sleep
+        self._exact: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        self._by_path: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._served: Dict[Any, int] = {}
+        with _open(path, "r") as file:
+            for line in file:
+                if line.strip():
+                    self.add(json.loads(line))
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._exact.values())
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Adiciona uma gravação"""
+        url = httpx.URL(entry["url"])
+        body = entry.get("request_body", "").encode()
+        self._exact.setdefault(_key(entry["method"], str(url), body), []).append(entry)
+        self._by_path.setdefault((entry["method"], url.path), []).append(entry)
+
+    def _next(self, key: Any, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        served = self._served.get(key, 0)
+        self._served[key] = served + 1
+        return entries[served % len(entries)]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key: Any = _key(request.method, str(request.url), request.content)
+        entries = self._exact.get(key)
+        if entries is None:
+            key = (request.method, request.url.path)
+            entries = self._by_path.get(key)
+        if not entries:
+            raise httpx.ConnectError(
+                f"Sem resposta gravada para {request.method} {request.url}", request=request
+            )
+        entry = self._next(key, entries)
+
+        if self.latency_scale > 0 and entry.get("elapsed"):
+            await self.sleep(entry["elapsed"] * self.latency_scale)
+        if "body_b64" in entry:
+            content = base64.b64decode(entry["body_b64"])
+        else:
+            content = entry.get("body", "").encode("utf-8")
+        return httpx.Response(
+            entry["status"], headers=entry.get("headers", {}), content=content, request=request,
+        )
+
+
+def transport_from_env() -> Optional[httpx.AsyncBaseTransport]:
+    """Transporte de gravação ou reprodução conforme ``MCP_UPSTREAM_MODE``
+
+    Retorna ``None`` no modo ``live`` (rede, padrão).
+    """
+    mode = os.environ.get(MODE_ENV, "live").lower()
+    if mode == "live":
+        return None
+    path = os.environ.get(CASSETTE_ENV)
+    if mode not in ("record", "replay") or not path:
+        raise ValueError(
+            f"{MODE_ENV} deve ser live, record ou replay, com {CASSETTE_ENV} definido"
+        )
+    if mode == "record":
+        return RecordingTransport(path)
+    return ReplayTransport(path, float(os.environ.get(LATENCY_SCALE_ENV, "1.0")))
@@ -0,0 +1,292 @@
+"""
+Escalonamento das chamadas por prioridade, com justiça entre sessões
+
+Todas as chamadas de ferramenta dividem o event loop e os limites de
+concorrência das APIs de origem. Um job em lote chamando ``get_todos`` em
+sequência não deve atrasar um agente interativo: ``FairScheduler`` limita a
+concorrência e, quando há fila, escolhe quem entra por classe de prioridade
+(com pesos), por sessão (em rodízio) e, acima de tudo, pelo tempo de espera
+(ninguém espera mais que ``max_wait`` enquanto outros passam à frente).
+
+A classe e a sessão de quem chama seguem pelo contexto (``as_caller``) da
+ferramenta até as requisições à origem.
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import (
+    Any, AsyncIterator, Callable, Deque, Dict, FrozenSet, Iterator, Mapping, Optional, Tuple,
+)
+
+from .metrics import metrics
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Parcela de vagas de cada classe quando as duas têm fila
+DEFAULT_WEIGHTS: Mapping[str, int] = {INTERACTIVE: 8, BATCH: 1}
+
+# Espera máxima (s) antes de passar à frente das prioridades
+DEFAULT_MAX_WAIT = 5.0
+
+# Limites (em segundos) do histograma de espera na fila
+WAIT_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+@dataclass(frozen=True)
+class Caller:
+    """Quem faz a chamada: sessão e classe de prioridade"""
+
+    session: str
+    priority: str = INTERACTIVE
+
+
+# Chamadas fora de uma ferramenta (recursos, testes)
+ANONYMOUS = Caller("-")
+
+_caller: ContextVar[Optional[Caller]] = ContextVar("caller", default=None)
+
+
+def current_caller() -> Caller:
+    """Quem faz a chamada atual (``ANONYMOUS`` fora de ``as_caller``)"""
+    return _caller.get() or ANONYMOUS
+
+
+def set_caller(caller: Caller) -> "Token[Optional[Caller]]":
+    """Define quem faz as chamadas do contexto atual (ver ``Context.run``)"""
+    return _caller.set(caller)
+
+
+@contextmanager
+def as_caller(caller: Caller) -> Iterator[Caller]:
+    """Atribui as operações do bloco a ``caller``"""
+    token = _caller.set(caller)
+    try:
+        yield caller
+    finally:
+        _caller.reset(token)
+
+
+def requested_priority(meta: Any) -> Optional[str]:
+    """Classe pedida pelo cliente em ``_meta.priority`` (se válida)"""
+    value = getattr(meta, "priority", None)
+    if value is None and isinstance(meta, dict):
+        value = meta.get("priority")
+    return value if value in (INTERACTIVE, BATCH) else None
+
+
+@dataclass(frozen=True)
+class PriorityRules:
+    """Ferramentas e clientes (``clientInfo.name``) tratados como lote"""
+
+    batch_tools: FrozenSet[str] = frozenset()
+    batch_clients: FrozenSet[str] = frozenset()
+
+    def classify(self, tool: str, client: Optional[str], requested: Optional[str]) -> str:
+        """Classe da chamada: lote se a ferramenta, o cliente ou o pedido disserem"""
+        if requested == BATCH or tool in self.batch_tools or client in self.batch_clients:
+            return BATCH
+        return INTERACTIVE
+
+
+class _Waiter:
+    __slots__ = ("future", "caller", "enqueued")
+
+    def __init__(self, future: "asyncio.Future[None]", caller: Caller, enqueued: float):
+        self.future = future
+        self.caller = caller
+        self.enqueued = enqueued
+
+
+class FairScheduler:
+    """Limite de concorrência com filas por prioridade e por sessão
+
+    Abaixo de ``capacity`` as chamadas entram na hora. Com fila, a próxima
+    vaga vai para:
+
+    1. quem espera há ``max_wait`` segundos ou mais (a mais antiga);
+    2. senão, a classe com menos vagas recebidas em proporção ao seu peso
+       (``weights``; com fila nas duas, ``interactive`` recebe 8 de cada 9);
+    3. dentro da classe, as sessões com fila se revezam, uma vaga por vez.
+
+    Métricas: ``scheduler_queue_depth{scheduler,priority}``,
+    ``scheduler_wait_seconds{scheduler,priority}`` e
+    ``scheduler_starved{scheduler}``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        weights: Optional[Mapping[str, int]] = None,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.capacity = capacity
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.max_wait = max_wait
+        self.clock = clock
+        self.in_use = 0
+        self.starved = 0
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in self.weights
+        }
+        self._depth: Dict[str, int] = dict.fromkeys(self.weights, 0)
+        # Vagas recebidas por classe, divididas pelo peso; passa antes a que
+        # terminaria a próxima vaga mais cedo (tempo virtual, como no WFQ)
+        self._pass: Dict[str, float] = dict.fromkeys(self.weights, 0.0)
+        self._virtual_time = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(self._depth.values())
+
+    @asynccontextmanager
+    async def slot(self, caller: Optional[Caller] = None) -> AsyncIterator[None]:
+        """Ocupa uma vaga durante o bloco"""
+        await self.acquire(caller)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, caller: Optional[Caller] = None) -> None:
+        """Espera uma vaga (por padrão, para ``current_caller()``)"""
+        caller = caller or current_caller()
+        if caller.priority not in self._queues:
+            caller = Caller(caller.session, INTERACTIVE)
+        if self.in_use < self.capacity and not self.queued:
+            self.in_use += 1
+            metrics.observe("scheduler_wait_seconds", 0.0, buckets=WAIT_BUCKETS,
+                            scheduler=self.name, priority=caller.priority)
+            return
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), caller, self.clock())
+        self._enqueue(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.cancelled():
+                self._remove(waiter)
+            else:
+                # A vaga chegou junto com o cancelamento: devolve
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Libera uma vaga e a entrega ao próximo da fila"""
+        self.in_use -= 1
+        self._wake()
+
+    def resize(self, capacity: int) -> None:
+        """Troca o número de vagas; com mais vagas, a fila anda na hora
+
+        Com menos, quem já entrou termina normalmente e as novas entradas
+        esperam até ``in_use`` ficar abaixo do novo limite.
+        """
+        self.capacity = capacity
+        self._wake()
+
+    def _wake(self) -> None:
+        while self.in_use < self.capacity and self.queued:
+            waiter = self._next()
+            if waiter.future.done():
+                continue  # cancelada, mas a tarefa ainda não retomou
+            self.in_use += 1
+            metrics.observe("scheduler_wait_seconds", self.clock() - waiter.enqueued,
+                            buckets=WAIT_BUCKETS, scheduler=self.name,
+                            priority=waiter.caller.priority)
+            waiter.future.set_result(None)
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        priority = waiter.caller.priority
+        sessions = self._queues[priority]
+        if not sessions:
+            # Uma classe que estava sem fila não acumula crédito do período
+            self._pass[priority] = max(self._pass[priority], self._virtual_time)
+        sessions.setdefault(waiter.caller.session, deque()).append(waiter)
+        self._set_depth(priority, 1)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        priority, session = waiter.caller.priority, waiter.caller.session
+        queue = self._queues[priority].get(session)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[priority][session]
+            self._set_depth(priority, -1)
+
+    def _set_depth(self, priority: str, delta: int) -> None:
+        self._depth[priority] += delta
+        metrics.set_gauge("scheduler_queue_depth", self._depth[priority],
+                          scheduler=self.name, priority=priority)
+
+    def _next(self) -> _Waiter:
+        oldest: Optional[Tuple[str, str]] = None
+        oldest_at = self.clock() - self.max_wait
+        for priority, sessions in self._queues.items():
+            for session, queue in sessions.items():
+                if queue[0].enqueued <= oldest_at:
+                    oldest, oldest_at = (priority, session), queue[0].enqueued
+        if oldest is not None:
+            self.starved += 1
+            metrics.incr("scheduler_starved", scheduler=self.name)
+            priority, session = oldest
+        else:
+            priority = min(
+                (p for p, sessions in self._queues.items() if sessions),
+                key=lambda p: self._pass[p] + 1 / self.weights[p],
+            )
+            session = next(iter(self._queues[priority]))
+        self._virtual_time = self._pass[priority]
+        self._pass[priority] += 1 / self.weights[priority]
+
+        sessions = self._queues[priority]
+        queue = sessions[session]
+        waiter = queue.popleft()
+        if queue:
+            sessions.move_to_end(session)
+        else:
+            del sessions[session]
+        self._set_depth(priority, -1)
+        return waiter
+
+    def stats(self) -> Dict[str, Any]:
+        """Vagas, filas por classe e passagens por espera longa (para o status)"""
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "queued": dict(self._depth),
+            "sessions_waiting": {p: len(sessions) for p, sessions in self._queues.items()},
+            "starved": self.starved,
+        }
+
+
+# Escalonadores do processo, por nome
+_shared: Dict[str, FairScheduler] = {}
+
+
+def shared_scheduler(
+    name: str, capacity: int, max_wait: Optional[float] = None
+) -> FairScheduler:
+    """O escalonador ``name`` do processo, criado no primeiro uso
+
+    Nos transportes HTTP o lifespan roda uma vez por sessão: a fila (e a
+    justiça entre sessões) só vale se todas usarem a mesma instância. As
+    chamadas seguintes aplicam ``capacity`` e ``max_wait`` à existente.
+    """
+    scheduler = _shared.get(name)
+    if scheduler is None:
+        scheduler = _shared[name] = FairScheduler(
+            name, capacity, max_wait=DEFAULT_MAX_WAIT if max_wait is None else max_wait
+        )
+        return scheduler
+    if max_wait is not None:
+        scheduler.max_wait = max_wait
+    if scheduler.capacity != capacity:
+        scheduler.resize(capacity)
+    return scheduler
@@ -0,0 +1,191 @@
+"""
+Busca textual com índice invertido e ranking BM25
+"""
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+_WORD = re.compile(r"\w+")
+
+# Parâmetros usuais do BM25
+K1 = 1.2
+B = 0.75
+
+# Máximo de termos do índice expandidos por um prefixo
+MAX_PREFIX_TERMS = 64
+
+
+def _fold(text: str) -> str:
+    """Minúsculas e sem acentos"""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Quebra o texto em termos normalizados"""
+    return _WORD.findall(_fold(text))
+
+
+def _words(text: str) -> Iterator[Tuple[int, int, str]]:
+    """Posição e termo normalizado de cada palavra do texto original"""
+    for match in _WORD.finditer(text):
+        yield match.start(), match.end(), _fold(match.group())
+
+
+class SearchIndex:
+    """Índice invertido sobre campos de texto de uma lista de documentos
+
+    ``sync`` recebe a lista mais recente: se for a mesma (ou a mesma
+    ``version``) da última vez nada é feito; caso contrário, só os
+    documentos adicionados, removidos ou alterados (comparados pelo ``id``)
+    são reindexados.
+    """
+
+    def __init__(self, fields: Sequence[str], snippet_words: int = 12):
+        self.fields = tuple(fields)
+        self.snippet_words = snippet_words
+        self._source: Optional[Sequence[Dict[str, Any]]] = None
+        # Versão da última lista sincronizada (ver ``sync``)
+        self.version: Any = None
+        self._docs: Dict[Any, Dict[str, Any]] = {}
+        self._texts: Dict[Any, str] = {}
+        self._words: Dict[Any, List[Tuple[int, int, str]]] = {}
+        self._total_length = 0
+        self._postings: Dict[str, Dict[Any, int]] = {}
+        self._sorted_terms: Optional[List[str]] = None
+        # Peso BM25 de cada termo por documento; depende do tamanho médio,
+        # então é descartado a cada alteração do índice
+        self._weights: Dict[str, List[Tuple[Any, float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def sync(self, items: Sequence[Dict[str, Any]], version: Any = None) -> int:
+        """Atualiza o índice com a lista; retorna quantos documentos mudaram
+
+        ``version`` identifica o conteúdo de ``items`` (por exemplo, a entrada
+        do cache de onde a lista foi decodificada, um objeto novo a cada
+        leitura): com a mesma versão da última vez, nada é comparado.
+        """
+        if version is not None:
+            if self.version == version:
+                return 0
+        elif self._source is items:
+            return 0
+        latest = {item.get("id"): item for item in items}
+        changed = 0
+        for doc_id in self._docs.keys() - latest.keys():
+            self._remove(doc_id)
+            changed += 1
+        for doc_id, item in latest.items():
+            if self._docs.get(doc_id) != item:
+                if doc_id in self._docs:
+                    self._remove(doc_id)
+                self._add(doc_id, item)
+                changed += 1
+        self._source = items
+        self.version = version
+        if changed:
+            self._weights.clear()
+        return changed
+
+    def _add(self, doc_id: Any, item: Dict[str, Any]) -> None:
+        text = "\n".join(str(item.get(name) or "") for name in self.fields)
+        words = list(_words(text))
+        self._docs[doc_id] = item
+        self._texts[doc_id] = text
+        self._words[doc_id] = words
+        self._total_length += len(words)
+        for _, _, term in words:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._sorted_terms = None
+            postings[doc_id] = postings.get(doc_id, 0) + 1
+
+    def _remove(self, doc_id: Any) -> None:
+        words = self._words.pop(doc_id)
+        for term in {term for _, _, term in words}:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                self._sorted_terms = None
+        self._total_length -= len(words)
+        del self._docs[doc_id]
+        del self._texts[doc_id]
+
+    def _expand(self, term: str, prefix: bool) -> List[str]:
+        """Termos do índice que casam com o termo da consulta"""
+        if not prefix:
+            return [term] if term in self._postings else []
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        start = bisect.bisect_left(terms, term)
+        matches = []
+        for candidate in terms[start:start + MAX_PREFIX_TERMS]:
+            if not candidate.startswith(term):
+                break
+            matches.append(candidate)
+        return matches
+
+    def search(self, query: str, limit: int = 10, prefix: bool = True) -> List[Dict[str, Any]]:
+        """Documentos mais relevantes para a consulta, com trecho do texto
+
+        Com ``prefix`` cada termo também casa com palavras que começam por
+        ele (``"volup"`` encontra ``"voluptate"``).
+        """
+        if not self._docs:
+            return []
+        scores: Dict[Any, float] = {}
+        matched = set()
+        for query_term in set(tokenize(query)):
+            for term in self._expand(query_term, prefix):
+                matched.add(term)
+                for doc_id, weight in self._term_weights(term):
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda hit: hit[1])
+        return [
+            {"id": doc_id, "score": round(score, 4), "snippet": self._snippet(doc_id, matched)}
+            for doc_id, score in best
+        ]
+
+    def _term_weights(self, term: str) -> List[Tuple[Any, float]]:
+        """Contribuição BM25 do termo para cada documento que o contém"""
+        weights = self._weights.get(term)
+        if weights is None:
+            count = len(self._docs)
+            average_length = self._total_length / count or 1.0
+            postings = self._postings[term]
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            weights = self._weights[term] = [
+                (
+                    doc_id,
+                    idf * tf * (K1 + 1)
+                    / (tf + K1 * (1 - B + B * len(self._words[doc_id]) / average_length)),
+                )
+                for doc_id, tf in postings.items()
+            ]
+        return weights
+
+    def _snippet(self, doc_id: Any, matched: set) -> str:
+        """Trecho do texto em volta da primeira palavra encontrada"""
+        text = self._texts[doc_id]
+        words = self._words[doc_id]
+        hit = next((i for i, (_, _, term) in enumerate(words) if term in matched), 0)
+        first = max(0, hit - self.snippet_words // 3)
+        last = min(len(words), first + self.snippet_words) - 1
+        if last < first:
+            return ""
+        snippet = " ".join(text[words[first][0]:words[last][1]].split())
+        prefix = "…" if first > 0 else ""
+        suffix = "…" if last < len(words) - 1 else ""
+        return f"{prefix}{snippet}{suffix}"
@@ -2,34 +2,200 @@
 Servidor MCP principal com FastMCP
 """
 import asyncio
+import functools
+import inspect
 import json
+import logging
+import secrets
+import sys
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
-from mcp.server.fastmcp.utilities.types import Image
+import anyio
+from mcp import types
 from mcp.server.fastmcp import FastMCP, Context
-from mcp.types import TextContent, Resource, Tool
+from mcp.server.fastmcp.exceptions import ResourceError, ToolError
+from mcp.types import CallToolResult, ImageContent, ResourceLink, TextContent
+from pydantic import AnyUrl, Field
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from .analytics import AnalyticsIndex
+from .api_client import (
+    APIManager, Freshness, observe_fetch, track_freshness, track_provenance,
+)
+from .blobs import BLOB_SCHEME, Blob
+from .cache import OutputCache
+from .bundles import DEFAULT_DEADLINE, gather_parts
+from .compression import CompressionMiddleware
+from .config import (
+    admin_settings, drain_timeout, environ_with_config_file, http_compression,
+    load_config_file, loop_monitor_settings, memory_settings, offload_settings,
+    output_cache_entries, scheduling_settings, timeout_settings, upstream_limits,
+)
+from .deadlines import deadline_scope, requested_timeout, within_deadline
+from .lifecycle import drain, serve_http, serve_stdio
+from .memory import deep_size, memory_budget
+from .metrics import metrics
+from .models import (
+    DailyInspirationBundle, DomainCount, SearchHit, TodoStats, UserActivity,
+    UserProfileBundle,
+)
+from .offload import estimate_size, offloader
+from .paging import Page, encode_items, page_bytes
+from .pool import build_pools
+from .profiling import MemoryTracker, SamplingProfiler
+from .progress import ProgressReporter
+from .projection import parse_fields, project
+from .registry import BYTES, GET, Endpoint, Upstream, tool_signature
+from .scheduling import (
+    Caller, PriorityRules, as_caller, requested_priority, shared_scheduler,
+)
+from .search import SearchIndex
+from .sessions import SessionState, SessionStore, session_store
+from .subscriptions import ResourceRefresher, SubscriptionManager
+from .upstreams import UPSTREAMS
+from .watchdog import loop_monitor
+
+
+logger = logging.getLogger(__name__)
+
+
+class SharedResources:
+    """Cliente da origem e caches do processo, usados por todas as sessões
+
+    O ``APIManager`` traz o cache de respostas e o de blobs; aqui ficam
+    também os resultados serializados, os índices derivados das listas,
+    os pools de itens aleatórios (um lote da origem serve a todos) e o
+    refresher, que revalida uma vez os recursos e avisa todas as sessões
+    inscritas. A fila de ferramentas, as regras de prioridade e o prazo
+    padrão também valem para o processo, e a recarga os troca aqui.
+    """
+
+    def __init__(self, api_manager: APIManager):
+        self.api_manager = api_manager
+        self.outputs = OutputCache(output_cache_entries(), budget=memory_budget)
+        self.pools = build_pools(api_manager)
+        self.subscriptions = SubscriptionManager()
+        self.refresher = ResourceRefresher(api_manager, self.subscriptions)
+        self.analytics = AnalyticsIndex()
+        self.search = {
+            "posts": SearchIndex(("title", "body")),
+            "comments": SearchIndex(("name", "body")),
+        }
+        concurrency, max_wait, batch_tools, batch_clients = scheduling_settings()
+        self.scheduler = shared_scheduler("tools", concurrency, max_wait)
+        self.priorities = PriorityRules(batch_tools, batch_clients)
+        self.tool_timeout = timeout_settings()[0]
+
+    def reload(self) -> None:
+        """Aplica a configuração recarregável do ambiente atual (ver ``reload_settings``)"""
+        self.api_manager.reload()
+        self.tool_timeout = timeout_settings()[0]
+        concurrency, max_wait, batch_tools, batch_clients = scheduling_settings()
+        self.scheduler.max_wait = max_wait
+        self.scheduler.resize(concurrency)
+        self.priorities = PriorityRules(batch_tools, batch_clients)
+        self.outputs.resize(output_cache_entries())
+
+    async def close(self) -> None:
+        await self.refresher.stop()
+        for pool in self.pools.values():
+            await pool.close()
+        await self.api_manager.close()
+
+
+# Recursos compartilhados e quantos blocos os usam (ver shared_resources)
+_shared: Optional[SharedResources] = None
+_shared_users = 0
 
-from .api_client import APIManager
+
+@asynccontextmanager
+async def shared_resources() -> AsyncIterator[SharedResources]:
+    """Os recursos compartilhados enquanto durar o bloco
+
+    São criados na primeira entrada e fechados na saída do último bloco.
+    ``process_lifespan`` os mantém pelo processo inteiro; sem ele (servidor
+    embutido em outro programa, testes) duram enquanto houver sessões.
+    """
+    global _shared, _shared_users
+    if _shared is None:
+        _shared = SharedResources(APIManager())
+        _shared.refresher.start()
+    shared = _shared
+    _shared_users += 1
+    try:
+        yield shared
+    finally:
+        _shared_users -= 1
+        if not _shared_users:
+            _shared = None
+            await shared.close()
 
 
 # Contexto da aplicação
 class AppContext:
-    """Contexto da aplicação com APIs"""
+    """Contexto da aplicação de uma sessão
+
+    Nos transportes HTTP o lifespan roda uma vez por sessão; o cliente da
+    origem e os caches são os de ``SharedResources``, para que uma sessão
+    nova já os encontre quentes e o orçamento de memória não se divida
+    entre cópias.
+    """
     
-    def __init__(self, api_manager: APIManager):
-        self.api_manager = api_manager
+    def __init__(self, shared: SharedResources, sessions: Optional[SessionStore] = None):
+        self.shared = shared
+        self.api_manager = shared.api_manager
+        self.outputs = shared.outputs
+        self.analytics = shared.analytics
+        self.search = shared.search
+        self.pools = shared.pools
+        self.subscriptions = shared.subscriptions
+        self.refresher = shared.refresher
+        self.scheduler = shared.scheduler
+        self.sessions = sessions if sessions is not None else session_store
+
+    @property
+    def priorities(self) -> PriorityRules:
+        return self.shared.priorities
+
+    @property
+    def tool_timeout(self) -> float:
+        return self.shared.tool_timeout
 
 
 @asynccontextmanager
-async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
-    """Gerencia o ciclo de vida da aplicação"""
-    api_manager = APIManager()
+async def process_lifespan() -> AsyncIterator[None]:
+    """Recursos do processo inteiro, do início ao fim de ``main``
+
+    O pool de JSON grande, o orçamento de memória, o monitor do loop e os
+    recursos compartilhados são de todas as sessões: configurá-los (ou
+    encerrá-los) a cada sessão cancelaria o trabalho das outras. Depois
+    disso, só a recarga (``reload_settings``) os troca.
+    """
+    offloader.configure(*offload_settings())
+    memory_budget.configure(*memory_settings())
+    loop_monitor.configure(*loop_monitor_settings())
+    loop_monitor.start()
     try:
-        yield AppContext(api_manager=api_manager)
+        async with shared_resources():
+            yield
     finally:
-        await api_manager.close()
+        await loop_monitor.stop()
+        offloader.shutdown()
+
+
+async def _serve(serve: Callable[[], Awaitable[None]]) -> None:
+    async with process_lifespan():
+        await serve()
+
+
+@asynccontextmanager
+async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
+    """Gerencia o ciclo de vida da aplicação (nos transportes HTTP, de cada sessão)"""
+    async with shared_resources() as shared:
+        yield AppContext(shared)
 
 
 # Criar servidor MCP
@@ -41,251 +207,816 @@ mcp = FastMCP(
 
 # ==================== RESOURCES ====================
 
-@mcp.resource("posts://all")
-def get_all_posts_resource() -> str:
-    """Recurso com todos os posts do JSONPlaceholder"""
-    return json.dumps({
-        "description": "Todos os posts do JSONPlaceholder",
-        "endpoint": "https://jsonplaceholder.typicode.com/posts",
-        "type": "posts_collection"
-    }, indent=2)
+@mcp.resource("posts://all", mime_type="application/json")
+async def get_all_posts_resource() -> str:
+    """Todos os posts do JSONPlaceholder"""
+    app_ctx = mcp.get_context().request_context.lifespan_context
+    posts = await app_ctx.api_manager.jsonplaceholder.get_posts()
+    return await offloader.dumps(posts, indent=2)
 
 
-@mcp.resource("posts://{post_id}")
-def get_post_resource(post_id: str) -> str:
-    """Recurso com informações de um post específico"""
-    return json.dumps({
-        "description": f"Post {post_id} do JSONPlaceholder",
-        "endpoint": f"https://jsonplaceholder.typicode.com/posts/{post_id}",
-        "type": "single_post"
-    }, indent=2)
+@mcp.resource("posts://{post_id}", mime_type="application/json")
+async def get_post_resource(post_id: str) -> str:
+    """Um post específico do JSONPlaceholder"""
+    app_ctx = mcp.get_context().request_context.lifespan_context
+    post = await app_ctx.api_manager.jsonplaceholder.get_post(int(post_id))
+    return json.dumps(post, indent=2)
 
 
-@mcp.resource("users://all")
-def get_users_resource() -> str:
-    """Recurso com todos os usuários"""
-    return json.dumps({
-        "description": "Todos os usuários do JSONPlaceholder",
-        "endpoint": "https://jsonplaceholder.typicode.com/users",
-        "type": "users_collection"
-    }, indent=2)
+@mcp.resource("users://all", mime_type="application/json")
+async def get_users_resource() -> str:
+    """Todos os usuários do JSONPlaceholder"""
+    app_ctx = mcp.get_context().request_context.lifespan_context
+    users = await app_ctx.api_manager.jsonplaceholder.get_users()
+    return await offloader.dumps(users, indent=2)
+
+
+# Assinaturas: o refresher notifica resources/updated quando os dados mudam
+@mcp._mcp_server.subscribe_resource()
+async def subscribe_resource(uri: AnyUrl) -> None:
+    """Inscreve a sessão atual nas atualizações do recurso"""
+    ctx = mcp.get_context()
+    ctx.request_context.lifespan_context.subscriptions.subscribe(str(uri), ctx.session)
+
+
+@mcp._mcp_server.unsubscribe_resource()
+async def unsubscribe_resource(uri: AnyUrl) -> None:
+    """Cancela a inscrição da sessão atual no recurso"""
+    ctx = mcp.get_context()
+    ctx.request_context.lifespan_context.subscriptions.unsubscribe(str(uri), ctx.session)
+
+
+_get_capabilities = mcp._mcp_server.get_capabilities
+
+
+def _get_capabilities_with_subscribe(*args: Any, **kwargs: Any) -> Any:
+    """Anuncia suporte a assinaturas (o FastMCP sempre anuncia subscribe=False)"""
+    capabilities = _get_capabilities(*args, **kwargs)
+    if capabilities.resources is not None:
+        capabilities.resources.subscribe = True
+    return capabilities
+
+
+mcp._mcp_server.get_capabilities = _get_capabilities_with_subscribe  # type: ignore[method-assign]
+
+
+# Ferramentas cujo resultado depende só dos argumentos e das respostas em
+# cache (preenchido ao gerar as ferramentas; ver _call_tool_with_deadline)
+_OUTPUT_CACHED: Set[str] = set()
+
+
+def _output_key(name: str, arguments: Dict[str, Any]) -> str:
+    return f"{name}:{json.dumps(arguments, sort_keys=True, separators=(',', ':'))}"
+
+
+def _output_size(result: CallToolResult) -> int:
+    text = sum(sys.getsizeof(block.text) for block in result.content
+               if isinstance(block, TextContent))
+    return text + deep_size(result.structuredContent)
+
+
+def _caller_for(tool: str, request_context: Any) -> Caller:
+    """Sessão e classe de prioridade da chamada (ver ``PriorityRules``)"""
+    app_ctx = request_context.lifespan_context
+    client_params = getattr(request_context.session, "client_params", None)
+    client = client_params.clientInfo.name if client_params is not None else None
+    requested = requested_priority(request_context.meta)
+    priority = app_ctx.priorities.classify(tool, client, requested)
+    return Caller(app_ctx.sessions.for_request(request_context).session_id, priority)
+
+
+async def _call_tool_with_deadline(name: str, arguments: Dict[str, Any]) -> Any:
+    """Executa a ferramenta com o prazo pedido pelo cliente em ``_meta.timeout``
+
+    Sem timeout do cliente vale ``MCP_TOOL_TIMEOUT``. O prazo chega até
+    as requisições à origem, e o cancelamento da chamada pelo cliente
+    (notifications/cancelled) cancela as requisições que só ela aguardava.
+
+    A execução ocupa uma vaga do escalonador de ferramentas, conforme a
+    prioridade da chamada; a espera na fila conta no prazo. A prioridade
+    segue até as requisições à origem.
+
+    Nas ferramentas de ``_OUTPUT_CACHED``, uma chamada repetida (mesmos
+    argumentos) recebe o mesmo ``CallToolResult``, com o texto já
+    serializado, enquanto as respostas em cache de onde ele veio não mudam.
+    Só resultados completos e frescos (sem ``_meta``) são guardados.
+    """
+    request_context = mcp.get_context().request_context
+    app_ctx = request_context.lifespan_context
+    outputs = app_ctx.outputs
+    key = _output_key(name, arguments) if name in _OUTPUT_CACHED else None
+    if key is not None:
+        cached = outputs.get(key, app_ctx.api_manager.client.is_current)
+        metrics.incr("output_cache_requests", tool=name,
+                     result="hit" if cached is not None else "miss")
+        if cached is not None:
+            return cached
+    with (
+        deadline_scope(requested_timeout(request_context.meta) or app_ctx.tool_timeout),
+        track_provenance() as provenance,
+        as_caller(_caller_for(name, request_context)) as caller,
+    ):
+        async with within_deadline(f"fila de {name}"):
+            await app_ctx.scheduler.acquire(caller)
+        try:
+            result = await mcp.call_tool(name, arguments)
+        finally:
+            app_ctx.scheduler.release()
+    if (
+        key is not None and provenance.complete and provenance.entries
+        and isinstance(result, CallToolResult) and not result.isError and not result.meta
+    ):
+        outputs.set(key, result, provenance.entries, _output_size(result))
+    return result
+
+
+mcp._mcp_server.call_tool(validate_input=False)(_call_tool_with_deadline)
+
+_call_tool_request = mcp._mcp_server.request_handlers[types.CallToolRequest]
+
+
+async def _call_tool_draining(req: types.CallToolRequest) -> types.ServerResult:
+    """Conta a chamada até o resultado ficar pronto para envio (ver ``lifecycle``)
+
+    Durante o encerramento, chamadas novas são recusadas. A contagem fica
+    em volta do handler inteiro (validação da saída incluída) para que,
+    ao fim da drenagem, só falte enviar as respostas.
+    """
+    with drain.track():
+        return await _call_tool_request(req)
+
+
+mcp._mcp_server.request_handlers[types.CallToolRequest] = _call_tool_draining
+
+
+def _with_compression(make_app: Callable[..., Any]) -> Callable[..., Any]:
+    """Aplica ``CompressionMiddleware`` aos apps HTTP (SSE e streamable-http)"""
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        app = make_app(*args, **kwargs)
+        encodings, minimum_size = http_compression()
+        if encodings:
+            app.add_middleware(
+                CompressionMiddleware, minimum_size=minimum_size, encodings=encodings
+            )
+        return app
+
+    return wrapper
+
+
+mcp.sse_app = _with_compression(mcp.sse_app)  # type: ignore[method-assign]
+mcp.streamable_http_app = _with_compression(mcp.streamable_http_app)  # type: ignore[method-assign]
+
+
+_read_resource = mcp._mcp_server.request_handlers[types.ReadResourceRequest]
+
+
+async def _read_resource_with_blobs(req: types.ReadResourceRequest) -> types.ServerResult:
+    """Serve ``blob://<id>`` com o base64 guardado, sem decodificar e recodificar
+
+    O FastMCP codifica de novo em base64 todo recurso binário a cada
+    leitura; os blobs já estão codificados. As demais URIs seguem o fluxo
+    normal.
+    """
+    uri = str(req.params.uri)
+    if not uri.startswith(BLOB_SCHEME):
+        return await _read_resource(req)
+    app_ctx = mcp.get_context().request_context.lifespan_context
+    blob = app_ctx.api_manager.client.blobs.get_by_id(uri[len(BLOB_SCHEME):])
+    if blob is None:
+        raise ResourceError(f"Blob não encontrado ou expirado: {uri}")
+    return types.ServerResult(types.ReadResourceResult(contents=[
+        types.BlobResourceContents(uri=req.params.uri, blob=blob.data, mimeType=blob.mime_type)
+    ]))
+
+
+mcp._mcp_server.request_handlers[types.ReadResourceRequest] = _read_resource_with_blobs
 
 
 @mcp.resource("api://status")
 def get_api_status() -> str:
     """Status das APIs disponíveis"""
+    app_ctx = mcp.get_context().request_context.lifespan_context
     return json.dumps({
         "apis": {
-            "jsonplaceholder": {
-                "name": "JSONPlaceholder",
-                "base_url": "https://jsonplaceholder.typicode.com",
-                "description": "API fake para posts, usuários, comentários e todos",
-                "endpoints": ["/posts", "/users", "/comments", "/todos"]
-            },
-            "catfacts": {
-                "name": "Cat Facts",
-                "base_url": "https://catfact.ninja",
-                "description": "API de fatos sobre gatos",
-                "endpoints": ["/fact", "/facts"]
-            },
-            "jokes": {
-                "name": "Official Joke API",
-                "base_url": "https://official-joke-api.appspot.com",
-                "description": "API de piadas",
-                "endpoints": ["/random_joke", "/jokes/{type}/random"]
+            upstream.name: {
+                "name": upstream.title,
+                "base_url": upstream.base_url,
+                "description": upstream.description,
+                "endpoints": upstream.endpoint_paths(),
             }
-        }
+            for upstream in UPSTREAMS
+        },
+        "cache": app_ctx.api_manager.client.cache.stats(),
+        "outputs": app_ctx.outputs.stats(),
+        "blobs": app_ctx.api_manager.client.blobs.stats(),
+        "mirrors": app_ctx.api_manager.client.mirror_stats(),
+        "sessions": app_ctx.sessions.stats(),
+        "event_loop": loop_monitor.stats(),
+        "offload": offloader.stats(),
+        "scheduling": {
+            "tools": app_ctx.scheduler.stats(),
+            "upstreams": app_ctx.api_manager.client.scheduler_stats(),
+        },
+        "memory": memory_budget.stats(),
+        "lifecycle": drain.stats(),
+        "metrics": metrics.snapshot(),
     }, indent=2)
 
 
 # ==================== TOOLS ====================
 
+def _session_state() -> SessionState:
+    """Estado da sessão da requisição atual"""
+    request_context = mcp.get_context().request_context
+    state: SessionState = request_context.lifespan_context.sessions.for_request(request_context)
+    return state
+
+
+async def _structured_result(
+    data: Any, freshness: Optional[Freshness] = None, size: Optional[int] = None
+) -> CallToolResult:
+    """Resultado com conteúdo estruturado e o JSON equivalente em texto
+
+    Listas são embrulhadas em ``{"result": [...]}``, como o FastMCP espera
+    para tipos de retorno que não são objetos. O texto de resultados grandes
+    é gerado fora do event loop (ver ``offload``).
+    """
+    structured = {"result": data} if isinstance(data, list) else data
+    text = await offloader.dumps(data, size, indent=2)
+    return CallToolResult(
+        content=[TextContent(type="text", text=text)],
+        structuredContent=structured,
+        _meta=freshness.as_meta() if freshness else None,
+    )
+
+
+async def _page_result(page: Page, freshness: Optional[Freshness] = None) -> CallToolResult:
+    """Resultado de uma página; se houver mais itens, inclui o cursor"""
+    result = await _structured_result(page.items, freshness, page.size)
+    if page.next_cursor:
+        shown = page.offset + len(page.items)
+        result.content.append(TextContent(
+            type="text",
+            text=(
+                f"Resposta truncada: itens {page.offset + 1}-{shown} de {page.total}. "
+                f'Use next_page(cursor="{page.next_cursor}") para continuar.'
+            ),
+        ))
+        result.meta = {**(result.meta or {}), "page": page.as_meta()}
+    return result
+
+
+def _blob_result(blobs: List[Blob], as_resource: bool) -> CallToolResult:
+    """Imagens já em base64, inline ou como links ``blob://``"""
+    if as_resource:
+        content: List[Any] = [
+            ResourceLink(type="resource_link", uri=AnyUrl(blob.uri), name=blob.id,
+                         mimeType=blob.mime_type, size=blob.size)
+            for blob in blobs
+        ]
+    else:
+        content = [
+            ImageContent(type="image", data=blob.data, mimeType=blob.mime_type)
+            for blob in blobs
+        ]
+    return CallToolResult(content=content)
+
+
+async def _paged_result(
+    items: List[Any], max_tokens: Optional[int], freshness: Optional[Freshness] = None
+) -> CallToolResult:
+    """Pagina uma lista grande conforme o orçamento de tokens"""
+    encoded = await offloader.run(estimate_size(items), encode_items, items)
+    page = _session_state().cursors.paginate(items, max_tokens, encoded)
+    return await _page_result(page, freshness)
+
+
+_FIELDS_DOC = (
+    "Use `fields` para retornar apenas alguns campos, com os nomes da API "
+    '(subcampos com ponto, ex.: "address.city").'
+)
+_PAGING_DOC = (
+    "Respostas acima de `max_tokens` (estimados) são paginadas; use next_page "
+    "com o cursor retornado para obter o restante."
+)
+_RESOURCE_DOC = (
+    "Com `as_resource` a imagem vem como link `blob://` (lido com "
+    "resources/read) em vez de inline."
+)
+
+
+def _make_tool(upstream: Upstream, endpoint: Endpoint) -> Callable[..., Any]:
+    """Gera a função da ferramenta MCP descrita em ``endpoint.tool``
+
+    Todas as ferramentas geradas compartilham este caminho: cliente da API
+    (com cache, coalescência e métricas), frescor, projeção e paginação.
+    """
+    spec = endpoint.tool
+    assert spec is not None
+    is_image = endpoint.method == BYTES
+
+    async def tool(**kwargs: Any) -> Any:
+        ctx: Optional[Context] = kwargs.pop("ctx", None)
+        fields = kwargs.pop("fields", None)
+        max_tokens = kwargs.pop("max_tokens", None)
+        as_resource = kwargs.pop("as_resource", False)
+        try:
+            selection = parse_fields(fields) if spec.projection else None
+            # Os itens parciais saem como sairiam no resultado: projetados e
+            # só até o fim da primeira página
+            reporter = ProgressReporter(
+                ctx,
+                transform=functools.partial(project, tree=selection) if selection else None,
+                max_bytes=page_bytes(max_tokens) if spec.paging else None,
+            )
+            app_ctx = mcp.get_context().request_context.lifespan_context
+            with track_freshness() as freshness:
+                if spec.pooled:
+                    pool = app_ctx.pools[endpoint.name]
+                    data = await pool.take(_session_state().seen_in(pool.name))
+                else:
+                    name = f"{endpoint.name}_blob" if is_image else endpoint.name
+                    call = getattr(app_ctx.api_manager.api(upstream.name), name)
+                    with observe_fetch(reporter.on_fetch if reporter.active else None):
+                        data = await call(**kwargs)
+            
+            count = len(data) if isinstance(data, list) else 1
+            await reporter.finish(f"{count} itens recebidos")
+            if ctx and spec.log:
+                await ctx.info(spec.log.format(count=count, **kwargs))
+            
+            if is_image:
+                return _blob_result([data], as_resource)
+            if spec.projection:
+                data = project(data, selection)
+            if spec.paging:
+                return await _paged_result(data, max_tokens, freshness)
+            return await _structured_result(data, freshness)
+        except Exception as e:
+            if ctx:
+                await ctx.error(f"{spec.error.format(**kwargs)}: {str(e)}")
+            raise ToolError(str(e)) from e
+
+    params = tool_signature(endpoint)
+    descriptions = {param.name: param.description for param in endpoint.params}
+    params = [
+        param.replace(annotation=Annotated[param.annotation, Field(description=descriptions[param.name])])
+        if descriptions[param.name] else param
+        for param in params
+    ]
+    doc = [spec.description]
+    if spec.projection:
+        params.append(inspect.Parameter(
+            "fields", inspect.Parameter.KEYWORD_ONLY, default=None,
+            annotation=Optional[List[str]],
+        ))
+        doc.append(_FIELDS_DOC)
+    if spec.paging:
+        params.append(inspect.Parameter(
+            "max_tokens", inspect.Parameter.KEYWORD_ONLY, default=None,
+            annotation=Optional[int],
+        ))
+        doc.append(_PAGING_DOC)
+    if is_image:
+        params.append(inspect.Parameter(
+            "as_resource", inspect.Parameter.KEYWORD_ONLY, default=False, annotation=bool,
+        ))
+        doc.append(_RESOURCE_DOC)
+    params.append(inspect.Parameter(
+        "ctx", inspect.Parameter.KEYWORD_ONLY, default=None, annotation=Context,
+    ))
+
+    return_annotation: Any
+    if spec.output is not None:
+        return_annotation = Annotated[CallToolResult, spec.output]
+    else:
+        return_annotation = CallToolResult
+
+    tool.__name__ = spec.name
+    tool.__qualname__ = spec.name
+    tool.__doc__ = "\n\n".join(doc)
+    tool.__signature__ = inspect.Signature(  # type: ignore[attr-defined]
+        params, return_annotation=return_annotation
+    )
+    tool.__annotations__ = {
+        **{param.name: param.annotation for param in params},
+        "return": return_annotation,
+    }
+    return tool
+
+
+for _upstream in UPSTREAMS:
+    for _endpoint in _upstream.endpoints:
+        if _endpoint.tool is not None:
+            mcp.add_tool(_make_tool(_upstream, _endpoint), name=_endpoint.tool.name)
+            # Só GETs: o resultado de uma mutação (POST) nunca é reaproveitado
+            if not _endpoint.tool.pooled and _endpoint.method == GET:
+                _OUTPUT_CACHED.add(_endpoint.tool.name)
+
+
+# Limite de textos por chamada de generate_qrcodes
+MAX_QRCODE_BATCH = 20
+
+
 @mcp.tool()
-async def get_posts(limit: Optional[int] = None, ctx: Context = None) -> str:
-    """Busca posts do JSONPlaceholder"""
+async def generate_qrcodes(
+    texts: Annotated[List[str], Field(description="Textos codificados nos QR codes")],
+    as_resource: bool = False,
+    ctx: Optional[Context] = None,
+) -> CallToolResult:
+    """Gera vários QR codes em paralelo, na ordem dos textos
+
+    O progresso é enviado a cada imagem gerada. Com `as_resource` as imagens
+    vêm como links `blob://` (lidos com resources/read) em vez de inline.
+    """
+    if not texts:
+        raise ToolError("Informe ao menos um texto")
+    if len(texts) > MAX_QRCODE_BATCH:
+        raise ToolError(f"No máximo {MAX_QRCODE_BATCH} textos por chamada")
+    api = mcp.get_context().request_context.lifespan_context.api_manager.qrcode
+    reporter = ProgressReporter(ctx)
+    done = 0
+
+    async def generate(text: str) -> Blob:
+        nonlocal done
+        # O limite de concorrência do upstream regula quantas saem de uma vez
+        blob: Blob = await api.generate_qrcode_blob(text)
+        done += 1
+        await reporter.update(done, len(texts), f"{done} de {len(texts)} QR codes",
+                              final=done == len(texts))
+        return blob
+
     try:
-        app_ctx = mcp.get_context().request_context.lifespan_context
-        posts = await app_ctx.api_manager.jsonplaceholder.get_posts(limit)
-        
-        if ctx:
-            await ctx.info(f"Buscando {len(posts)} posts")
-        
-        return json.dumps(posts, indent=2)
+        blobs = await asyncio.gather(*(generate(text) for text in texts))
     except Exception as e:
         if ctx:
-            await ctx.error(f"Erro ao buscar posts: {str(e)}")
-        return f"Erro: {str(e)}"
+            await ctx.error(f"Erro ao gerar QR codes: {str(e)}")
+        raise ToolError(str(e)) from e
+    if ctx:
+        await ctx.info(f"{len(blobs)} QR codes gerados")
+    return _blob_result(list(blobs), as_resource)
 
 
 @mcp.tool()
-async def get_post_by_id(post_id: int, ctx: Context = None) -> str:
-    """Busca um post específico pelo ID"""
+async def next_page(cursor: str, ctx: Optional[Context] = None) -> CallToolResult:
+    """Busca a próxima página de uma resposta paginada pelo cursor"""
     try:
-        app_ctx = mcp.get_context().request_context.lifespan_context
-        post = await app_ctx.api_manager.jsonplaceholder.get_post(post_id)
+        page = _session_state().cursors.next_page(cursor)
         
         if ctx:
-            await ctx.info(f"Buscando post {post_id}")
+            await ctx.info(f"Página com {len(page.items)} de {page.total} itens")
         
-        return json.dumps(post, indent=2)
-    except Exception as e:
+        return await _page_result(page)
+    except KeyError:
         if ctx:
-            await ctx.error(f"Erro ao buscar post {post_id}: {str(e)}")
-        return f"Erro: {str(e)}"
+            await ctx.error(f"Cursor inválido ou expirado: {cursor}")
+        raise ToolError("Cursor inválido ou expirado")
 
 
-@mcp.tool()
-async def get_users(ctx: Context = None) -> str:
-    """Busca todos os usuários"""
-    try:
-        app_ctx = mcp.get_context().request_context.lifespan_context
-        users = await app_ctx.api_manager.jsonplaceholder.get_users()
-        
-        if ctx:
-            await ctx.info(f"Buscando {len(users)} usuários")
-        
-        return json.dumps(users, indent=2)
-    except Exception as e:
+async def _bundle_result(
+    parts: Dict[str, Awaitable[Any]], deadline: Optional[float], ctx: Optional[Context]
+) -> CallToolResult:
+    """Busca as partes em paralelo e monta o resultado composto
+
+    Só é erro se nenhuma parte for obtida; falhas parciais ficam em ``errors``.
+    """
+    with track_freshness() as freshness, deadline_scope(deadline or DEFAULT_DEADLINE) as budget:
+        assert budget is not None
+        bundle = await gather_parts(parts, budget)
+
+    if not bundle.data:
+        detail = "; ".join(f"{name}: {error}" for name, error in bundle.errors.items())
         if ctx:
-            await ctx.error(f"Erro ao buscar usuários: {str(e)}")
-        return f"Erro: {str(e)}"
+            await ctx.error(f"Nenhuma parte obtida: {detail}")
+        raise ToolError(f"Nenhuma parte obtida: {detail}")
+    if ctx and bundle.errors:
+        await ctx.warning(f"Partes com falha: {', '.join(bundle.errors)}")
+    return await _structured_result(bundle.as_dict(), freshness)
 
 
 @mcp.tool()
-async def get_user_by_id(user_id: int, ctx: Context = None) -> str:
-    """Busca um usuário específico pelo ID"""
-    try:
-        app_ctx = mcp.get_context().request_context.lifespan_context
-        user = await app_ctx.api_manager.jsonplaceholder.get_user(user_id)
-        
-        if ctx:
-            await ctx.info(f"Buscando usuário {user_id}")
-        
-        return json.dumps(user, indent=2)
-    except Exception as e:
-        if ctx:
-            await ctx.error(f"Erro ao buscar usuário {user_id}: {str(e)}")
-        return f"Erro: {str(e)}"
+async def get_user_profile_bundle(
+    user_id: int,
+    include_todos: bool = False,
+    deadline: Optional[float] = None,
+    ctx: Optional[Context] = None,
+) -> Annotated[CallToolResult, UserProfileBundle]:
+    """Busca o usuário e as estatísticas dos seus todos em uma só chamada
+
+    Com `include_todos` a lista completa de todos também é retornada. As
+    buscas são feitas em paralelo com prazo comum de `deadline` segundos
+    (padrão 10). Partes que falharem aparecem em `errors`.
+    """
+    api = mcp.get_context().request_context.lifespan_context.api_manager.jsonplaceholder
+    if ctx:
+        await ctx.info(f"Buscando perfil do usuário {user_id}")
+    parts: Dict[str, Awaitable[Any]] = {
+        "user": api.get_user(user_id),
+        "todo_stats": _user_todo_stats(user_id),
+    }
+    if include_todos:
+        parts["todos"] = api.get_todos(user_id)
+    return await _bundle_result(parts, deadline, ctx)
 
 
 @mcp.tool()
-async def get_todos(user_id: Optional[int] = None, ctx: Context = None) -> str:
-    """Busca todos os todos (opcionalmente de um usuário específico)"""
-    try:
-        app_ctx = mcp.get_context().request_context.lifespan_context
-        todos = await app_ctx.api_manager.jsonplaceholder.get_todos(user_id)
-        
-        if ctx:
-            if user_id:
-                await ctx.info(f"Buscando todos do usuário {user_id}")
-            else:
-                await ctx.info(f"Buscando todos os todos ({len(todos)} encontrados)")
-        
-        return json.dumps(todos, indent=2)
-    except Exception as e:
-        if ctx:
-            await ctx.error(f"Erro ao buscar todos: {str(e)}")
-        return f"Erro: {str(e)}"
+async def get_daily_inspiration_bundle(
+    deadline: Optional[float] = None, ctx: Optional[Context] = None
+) -> Annotated[CallToolResult, DailyInspirationBundle]:
+    """Busca um fato sobre gatos e uma piada em uma só chamada
+
+    As buscas são feitas em paralelo com prazo comum de `deadline` segundos
+    (padrão 10). Partes que falharem aparecem em `errors`.
+    """
+    pools = mcp.get_context().request_context.lifespan_context.pools
+    state = _session_state()
+    if ctx:
+        await ctx.info("Buscando inspiração diária")
+    fact_pool, joke_pool = pools["get_random_fact"], pools["get_random_joke"]
+    return await _bundle_result(
+        {
+            "cat_fact": fact_pool.take(state.seen_in(fact_pool.name)),
+            "joke": joke_pool.take(state.seen_in(joke_pool.name)),
+        },
+        deadline,
+        ctx,
+    )
+
+
+# Listas do JSONPlaceholder usadas pelas agregações
+_DATASETS = {"todos": "get_todos", "posts": "get_posts", "comments": "get_comments"}
+
+
+async def _fetch_dataset(
+    name: str, version: Any
+) -> Tuple[Optional[List[Dict[str, Any]]], Any]:
+    """Lista ``name`` do JSONPlaceholder e sua versão (chave e entrada do cache)
+
+    Enquanto ``version`` for a resposta fresca em cache, devolve ``None``
+    sem buscar nem decodificar a lista de novo. Respostas que não vêm de
+    uma entrada fresca (antigas, sem cache) não têm versão.
+    """
+    app_ctx = mcp.get_context().request_context.lifespan_context
+    if version is not None and app_ctx.api_manager.client.is_current(*version):
+        return None, version
+    with track_provenance() as provenance:
+        items = await getattr(app_ctx.api_manager.jsonplaceholder, _DATASETS[name])()
+    sources = list(provenance.entries.items())
+    return items, sources[0] if provenance.complete and len(sources) == 1 else None
+
+
+async def _synced_analytics(*names: str) -> AnalyticsIndex:
+    """Índice de agregações sincronizado com as listas (em cache) pedidas"""
+    analytics: AnalyticsIndex = mcp.get_context().request_context.lifespan_context.analytics
+    fetched = await asyncio.gather(
+        *(_fetch_dataset(name, analytics.version(name)) for name in names)
+    )
+    for name, (items, version) in zip(names, fetched):
+        if items is not None:
+            analytics.sync(name, items, version)
+    return analytics
+
+
+async def _user_todo_stats(user_id: int) -> Dict[str, Any]:
+    return (await _synced_analytics("todos")).todo_stats(user_id)[0]
 
 
 @mcp.tool()
-async def create_post(title: str, body: str, user_id: int, ctx: Context = None) -> str:
-    """Cria um novo post (simulado)"""
+async def get_todo_stats(
+    user_id: Optional[int] = None, ctx: Optional[Context] = None
+) -> Annotated[CallToolResult, List[TodoStats]]:
+    """Conta os todos completados e pendentes por usuário (ou de um usuário)"""
     try:
-        app_ctx = mcp.get_context().request_context.lifespan_context
-        post = await app_ctx.api_manager.jsonplaceholder.create_post(title, body, user_id)
+        with track_freshness() as freshness:
+            analytics = await _synced_analytics("todos")
+        stats = analytics.todo_stats(user_id)
         
         if ctx:
-            await ctx.info(f"Post criado com sucesso (simulado)")
+            await ctx.info(f"Estatísticas de todos de {len(stats)} usuários")
         
-        return json.dumps(post, indent=2)
+        return await _structured_result(stats, freshness)
     except Exception as e:
         if ctx:
-            await ctx.error(f"Erro ao criar post: {str(e)}")
-        return f"Erro: {str(e)}"
+            await ctx.error(f"Erro ao calcular estatísticas de todos: {str(e)}")
+        raise ToolError(str(e)) from e
 
 
 @mcp.tool()
-async def get_cat_fact(ctx: Context = None) -> str:
-    """Busca um fato aleatório sobre gatos"""
+async def get_user_activity(
+    user_id: Optional[int] = None, ctx: Optional[Context] = None
+) -> Annotated[CallToolResult, List[UserActivity]]:
+    """Conta os posts e os comentários recebidos por usuário (ou de um usuário)"""
     try:
-        app_ctx = mcp.get_context().request_context.lifespan_context
-        fact = await app_ctx.api_manager.catfacts.get_random_fact()
+        with track_freshness() as freshness:
+            analytics = await _synced_analytics("posts", "comments")
+        activity = analytics.user_activity(user_id)
         
         if ctx:
-            await ctx.info("Buscando fato sobre gatos")
+            await ctx.info(f"Atividade de {len(activity)} usuários")
         
-        return json.dumps(fact, indent=2)
+        return await _structured_result(activity, freshness)
     except Exception as e:
         if ctx:
-            await ctx.error(f"Erro ao buscar fato sobre gatos: {str(e)}")
-        return f"Erro: {str(e)}"
+            await ctx.error(f"Erro ao calcular atividade dos usuários: {str(e)}")
+        raise ToolError(str(e)) from e
 
 
 @mcp.tool()
-async def get_multiple_cat_facts(limit: int = 5, ctx: Context = None) -> str:
-    """Busca múltiplos fatos sobre gatos"""
+async def get_top_comment_domains(
+    limit: int = 5, ctx: Optional[Context] = None
+) -> Annotated[CallToolResult, List[DomainCount]]:
+    """Domínios de e-mail dos autores com mais comentários"""
     try:
-        app_ctx = mcp.get_context().request_context.lifespan_context
-        facts = await app_ctx.api_manager.catfacts.get_facts(limit)
+        with track_freshness() as freshness:
+            analytics = await _synced_analytics("comments")
+        domains = analytics.top_comment_domains(limit)
         
         if ctx:
-            await ctx.info(f"Buscando {limit} fatos sobre gatos")
+            await ctx.info(f"Top {limit} domínios de comentaristas")
         
-        return json.dumps(facts, indent=2)
+        return await _structured_result(domains, freshness)
     except Exception as e:
         if ctx:
-            await ctx.error(f"Erro ao buscar fatos sobre gatos: {str(e)}")
-        return f"Erro: {str(e)}"
+            await ctx.error(f"Erro ao calcular domínios de comentaristas: {str(e)}")
+        raise ToolError(str(e)) from e
+
+
+async def _search(name: str, query: str, limit: int) -> CallToolResult:
+    """Busca na lista ``name`` do JSONPlaceholder, reindexando o que mudou"""
+    app_ctx = mcp.get_context().request_context.lifespan_context
+    index = app_ctx.search[name]
+    with track_freshness() as freshness:
+        items, version = await _fetch_dataset(name, index.version)
+    if items is not None:
+        index.sync(items, version)
+    return await _structured_result(index.search(query, limit), freshness)
 
 
 @mcp.tool()
-async def get_random_joke(ctx: Context = None) -> str:
-    """Busca uma piada aleatória"""
+async def search_posts(
+    query: str, limit: int = 10, ctx: Optional[Context] = None
+) -> Annotated[CallToolResult, List[SearchHit]]:
+    """Busca posts pelo título e conteúdo
+
+    Retorna os IDs ordenados por relevância (BM25) com um trecho do texto.
+    Palavras incompletas casam por prefixo.
+    """
     try:
-        app_ctx = mcp.get_context().request_context.lifespan_context
-        joke = await app_ctx.api_manager.jokes.get_random_joke()
+        result = await _search("posts", query, limit)
         
         if ctx:
-            await ctx.info("Buscando piada aleatória")
+            await ctx.info(f"Busca em posts: {query}")
         
-        return json.dumps(joke, indent=2)
+        return result
     except Exception as e:
         if ctx:
-            await ctx.error(f"Erro ao buscar piada: {str(e)}")
-        return f"Erro: {str(e)}"
+            await ctx.error(f"Erro ao buscar posts por '{query}': {str(e)}")
+        raise ToolError(str(e)) from e
 
 
 @mcp.tool()
-async def get_jokes_by_type(joke_type: str, ctx: Context = None) -> str:
-    """Busca piadas por tipo (programming, general, knock-knock, etc.)"""
+async def search_comments(
+    query: str, limit: int = 10, ctx: Optional[Context] = None
+) -> Annotated[CallToolResult, List[SearchHit]]:
+    """Busca comentários pelo nome e conteúdo
+
+    Retorna os IDs ordenados por relevância (BM25) com um trecho do texto.
+    Palavras incompletas casam por prefixo.
+    """
     try:
-        app_ctx = mcp.get_context().request_context.lifespan_context
-        jokes = await app_ctx.api_manager.jokes.get_jokes_by_type(joke_type)
+        result = await _search("comments", query, limit)
         
         if ctx:
-            await ctx.info(f"Buscando piadas do tipo: {joke_type}")
+            await ctx.info(f"Busca em comentários: {query}")
         
-        return json.dumps(jokes, indent=2)
+        return result
     except Exception as e:
         if ctx:
-            await ctx.error(f"Erro ao buscar piadas do tipo {joke_type}: {str(e)}")
-        return f"Erro: {str(e)}"
+            await ctx.error(f"Erro ao buscar comentários por '{query}': {str(e)}")
+        raise ToolError(str(e)) from e
 
-@mcp.tool()
-async def generate_qrcode(text: str, ctx: Context = None) -> Image:
-    """Gera um QR code"""
-    try:
-        app_ctx = mcp.get_context().request_context.lifespan_context
-        img = await app_ctx.api_manager.qrcode.generate_qrcode(text)
 
-        return Image(data=img, format="png")
+# ==================== ADMIN ====================
 
+# Parâmetros aceitos na query string das rotas /admin
+_QUERY_TYPES: Dict[str, Callable[[str], Any]] = {
+    "duration": float,
+    "interval_ms": float,
+    "limit": int,
+    "stop": lambda value: value.lower() in ("1", "true"),
+}
 
-    except Exception as e:
-        if ctx:
-            await ctx.error(f"Erro ao gerar QR code: {str(e)}")
-        return f"Erro: {str(e)}"
+
+def register_admin(
+    server: FastMCP, token: Optional[str] = None, output_dir: Optional[str] = None
+) -> None:
+    """Registra as ferramentas de perfil de CPU e memória
+
+    No stdio, as ferramentas só são alcançáveis por quem iniciou o processo.
+    Nos transportes HTTP (SSE e streamable-http) exigem
+    ``Authorization: Bearer <token>`` na conexão MCP; sem ``token``, ficam
+    recusadas. Com ``token``, as mesmas operações também ficam em rotas
+    HTTP ``/admin/...``.
+    """
+    profiler = SamplingProfiler(output_dir)
+    memory = MemoryTracker()
+
+    def authorized(request: Optional[Request]) -> bool:
+        if request is None:
+            return True
+        supplied = request.headers.get("authorization", "")
+        return bool(token) and secrets.compare_digest(
+            supplied.encode(), f"Bearer {token}".encode()
+        )
+
+    def require_admin() -> None:
+        if not authorized(server.get_context().request_context.request):
+            raise ToolError("Não autorizado: use Authorization: Bearer com MCP_ADMIN_TOKEN")
+
+    async def start(duration: float = 30.0, interval_ms: float = 10.0) -> Dict[str, Any]:
+        return profiler.start(duration, interval_ms / 1000)
+
+    async def stop() -> Dict[str, Any]:
+        # join() espera no máximo um intervalo de amostragem
+        return await asyncio.to_thread(profiler.stop)
+
+    async def memory_diff(limit: int = 10, stop: bool = False) -> Dict[str, Any]:
+        if stop:
+            memory.stop()
+            return {"stopped": True}
+        return await asyncio.to_thread(memory.diff, limit)
+
+    operations: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
+        "profile_start": start, "profile_stop": stop, "memory_diff": memory_diff,
+    }
+
+    @server.tool()
+    async def profile_start(duration: float = 30.0, interval_ms: float = 10.0) -> CallToolResult:
+        """[admin] Inicia um perfil de CPU por amostragem do servidor
+
+        Termina sozinho após `duration` segundos (máx. 300); o arquivo gerado
+        (formato folded, para flamegraph.pl ou speedscope) vem no resultado.
+        """
+        require_admin()
+        try:
+            return await _structured_result(await start(duration, interval_ms))
+        except RuntimeError as e:
+            raise ToolError(str(e)) from e
+
+    @server.tool()
+    async def profile_stop() -> CallToolResult:
+        """[admin] Encerra o perfil de CPU e retorna o arquivo e as funções mais amostradas"""
+        require_admin()
+        try:
+            return await _structured_result(await stop())
+        except RuntimeError as e:
+            raise ToolError(str(e)) from e
+
+    @server.tool()
+    async def memory_snapshot_diff(limit: int = 10, stop: bool = False) -> CallToolResult:
+        """[admin] Crescimento de memória por linha desde a chamada anterior
+
+        A primeira chamada liga o tracemalloc e guarda a base; `stop` desliga.
+        """
+        require_admin()
+        return await _structured_result(await memory_diff(limit, stop))
+
+    if not token:
+        return
+
+    def route(name: str) -> Callable[[Request], Awaitable[JSONResponse]]:
+        operation = operations[name]
+
+        async def handler(request: Request) -> JSONResponse:
+            if not authorized(request):
+                return JSONResponse({"error": "Não autorizado"}, status_code=401)
+            try:
+                kwargs = {
+                    key: _QUERY_TYPES[key](value)
+                    for key, value in request.query_params.items() if key in _QUERY_TYPES
+                }
+                return JSONResponse(await operation(**kwargs))
+            except (RuntimeError, TypeError, ValueError) as e:
+                return JSONResponse({"error": str(e)}, status_code=400)
+
+        return handler
+
+    server.custom_route("/admin/profile/start", methods=["POST"])(route("profile_start"))
+    server.custom_route("/admin/profile/stop", methods=["POST"])(route("profile_stop"))
+    server.custom_route("/admin/memory", methods=["POST"])(route("memory_diff"))
+
+
+def enable_admin(server: FastMCP) -> bool:
+    """Registra as ferramentas de administração se ``MCP_ADMIN_TOOLS`` as liga
+
+    Chamada por ``main`` depois de ``load_config_file``, para que
+    ``MCP_ADMIN_*`` também valha vindo do arquivo de configuração.
+    """
+    enabled, token, output_dir = admin_settings()
+    if enabled:
+        register_admin(server, token, output_dir)
+    return enabled
 
 
 # ==================== PROMPTS ====================
@@ -314,9 +1045,9 @@ def user_profile_analysis(user_id: int) -> str:
     return f"""
 Analise o perfil do usuário {user_id} do JSONPlaceholder.
 
-Use estas ferramentas em sequência:
-1. get_user_by_id para buscar informações do usuário
-2. get_todos para buscar os todos do usuário (user_id={user_id})
+Use a ferramenta get_user_profile_bundle (user_id={user_id}) para buscar, em
+uma só chamada, as informações do usuário e as estatísticas dos seus todos
+(já contadas no servidor).
 
 Baseado nas informações obtidas, forneça:
 1. Resumo do perfil pessoal
@@ -334,9 +1065,8 @@ def daily_inspiration() -> str:
     return """
 Crie uma mensagem de inspiração diária usando nossos recursos.
 
-Execute estas etapas:
-1. Use get_cat_fact para adicionar um fato interessante sobre gatos
-2. Use get_random_joke para adicionar um toque de humor
+Use a ferramenta get_daily_inspiration_bundle para buscar, em uma só chamada,
+um fato interessante sobre gatos e uma piada para um toque de humor.
 
 Combine tudo em uma mensagem motivacional que inclua:
 - Um fato curioso sobre gatos para despertar interesse
@@ -347,6 +1077,39 @@ Mantenha um tom positivo e energético!
 """
 
 
+def reload_settings() -> bool:
+    """Relê ``MCP_CONFIG_FILE`` e aplica a configuração recarregável (SIGHUP)
+
+    Prazos, TTLs e limites de concorrência dos upstreams, vagas e
+    prioridades das ferramentas, tamanhos dos caches, orçamento de memória e
+    o pool de JSON grande. Caches, sessões e conexões abertas são mantidos.
+    Uma configuração inválida é recusada inteira e a anterior continua.
+    """
+    try:
+        env = environ_with_config_file()
+        for settings in (offload_settings, memory_settings, output_cache_entries,
+                         scheduling_settings, timeout_settings, loop_monitor_settings):
+            settings(env)
+        for upstream in UPSTREAMS:
+            upstream_limits(upstream, env)
+        if offload_settings(env)[2] not in ("thread", "process"):
+            raise ValueError(f"Tipo de pool inválido: {offload_settings(env)[2]}")
+    except (OSError, ValueError) as e:
+        logger.error("Configuração não recarregada: %s", e)
+        metrics.incr("config_reloads", result="error")
+        return False
+    load_config_file()
+    if offload_settings() != (offloader.threshold, offloader.max_workers, offloader.kind):
+        offloader.configure(*offload_settings())
+    memory_budget.configure(*memory_settings())
+    loop_monitor.threshold = loop_monitor_settings()[1]
+    if _shared is not None:
+        _shared.reload()
+    metrics.incr("config_reloads", result="ok")
+    logger.info("Configuração recarregada")
+    return True
+
+
 def main():
     """Função principal para executar o servidor"""
     import sys
@@ -360,8 +1123,19 @@ def main():
     else:
         transport = "stdio"
     
-    # Executar servidor
-    mcp.run(transport=transport)
+    # Executar servidor: drenagem no SIGTERM e recarga no SIGHUP (ver lifecycle)
+    load_config_file()
+    enable_admin(mcp)
+    timeout = drain_timeout()
+    if transport == "stdio":
+        serve = functools.partial(serve_stdio, mcp._mcp_server, timeout, reload_settings)
+    elif transport in ("sse", "streamable-http"):
+        app = mcp.sse_app() if transport == "sse" else mcp.streamable_http_app()
+        serve = functools.partial(serve_http, app, mcp.settings.host, mcp.settings.port,
+                                  mcp.settings.log_level.lower(), timeout, reload_settings)
+    else:
+        raise ValueError(f"Transporte desconhecido: {transport}")
+    anyio.run(_serve, serve)
 
 
 if __name__ == "__main__":
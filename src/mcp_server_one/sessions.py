@@ -0,0 +1,146 @@
+"""
+Estado por sessão MCP com limites de memória
+"""
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from .memory import MemoryBudget, memory_budget
+from .paging import CursorStore
+
+
+# Estimativa de memória de cada item registrado como já visto
+SEEN_ITEM_BYTES = 64
+
+
+@dataclass
+class SessionState:
+    """Estado de uma sessão: cursores de paginação e itens já vistos"""
+
+    session_id: str
+    cursors: CursorStore
+    created_at: float
+    last_seen: float
+    seen: Dict[str, Set[Hashable]] = field(default_factory=dict)
+
+    def seen_in(self, pool: str, max_items: int = 1000) -> Set[Hashable]:
+        """Chaves dos itens do pool já entregues a esta sessão"""
+        seen = self.seen.get(pool)
+        if seen is None or len(seen) >= max_items:
+            seen = self.seen[pool] = set()
+        return seen
+
+    def memory_bytes(self) -> int:
+        """Estimativa da memória mantida pela sessão"""
+        seen = sum(len(keys) for keys in self.seen.values())
+        return self.cursors.memory_bytes() + seen * SEEN_ITEM_BYTES
+
+
+def _request_session_id(request: Any) -> Optional[str]:
+    """ID da sessão nos transportes HTTP (streamable HTTP ou SSE)"""
+    if request is None:
+        return None
+    headers = getattr(request, "headers", None)
+    if headers is not None and headers.get("mcp-session-id"):
+        return str(headers["mcp-session-id"])
+    query = getattr(request, "query_params", None)
+    if query is not None and query.get("session_id"):
+        return str(query["session_id"])
+    return None
+
+
+class SessionStore:
+    """Estados das sessões, com limite de sessões e remoção por inatividade
+
+    Os dados compartilhados (cache de respostas, índices) não são copiados:
+    os cursores apenas referenciam as listas já em cache. Sessões sem ID de
+    transporte (stdio, memória) são removidas quando o objeto da sessão é
+    coletado. Com ``budget``, os cursores de todas as sessões entram no
+    orçamento de memória compartilhado.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        idle_timeout: float = 1800.0,
+        max_cursors_per_session: int = 32,
+        max_bytes_per_session: int = 4 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+        budget: Optional[MemoryBudget] = None,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_cursors_per_session = max_cursors_per_session
+        self.max_bytes_per_session = max_bytes_per_session
+        self.clock = clock
+        self.budget = budget
+        self.evicted = 0
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> SessionState:
+        """Estado da sessão, criado no primeiro acesso"""
+        now = self.clock()
+        self._evict_idle(now)
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = SessionState(
+                session_id=session_id,
+                cursors=CursorStore(
+                    max_cursors=self.max_cursors_per_session,
+                    clock=self.clock,
+                    max_bytes=self.max_bytes_per_session,
+                    budget=self.budget,
+                ),
+                created_at=now,
+                last_seen=now,
+            )
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._sessions.move_to_end(session_id)
+            state.last_seen = now
+        return state
+
+    def for_request(self, request_context: Any) -> SessionState:
+        """Estado da sessão de uma requisição MCP"""
+        session_id = _request_session_id(request_context.request)
+        if session_id is None:
+            session = request_context.session
+            session_id = f"local-{id(session)}"
+            if session_id not in self._sessions:
+                weakref.finalize(session, self.drop, session_id)
+        return self.get(session_id)
+
+    def drop(self, session_id: str) -> None:
+        """Remove o estado da sessão"""
+        self._sessions.pop(session_id, None)
+
+    def _evict_idle(self, now: float) -> None:
+        # A ordem é de último acesso, então as inativas estão no início
+        while self._sessions:
+            state = next(iter(self._sessions.values()))
+            if now - state.last_seen < self.idle_timeout:
+                break
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Número de sessões e memória estimada"""
+        return {
+            "sessions": len(self._sessions),
+            "memory_bytes": sum(state.memory_bytes() for state in self._sessions.values()),
+            "evicted": self.evicted,
+            "max_sessions": self.max_sessions,
+            "idle_timeout": self.idle_timeout,
+        }
+
+
+# Estados das sessões do processo: nos transportes HTTP o lifespan roda uma
+# vez por sessão, e o limite de sessões e a inatividade valem para todas
+session_store = SessionStore(budget=memory_budget)
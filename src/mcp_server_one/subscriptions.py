@@ -0,0 +1,140 @@
+"""
+Assinaturas de recursos e atualização em segundo plano
+"""
+import asyncio
+import logging
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from mcp.server.session import ServerSession
+from pydantic import AnyUrl
+
+from .api_client import APIManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionManager:
+    """Sessões inscritas em cada URI de recurso
+
+    As sessões são mantidas por referência fraca para que sessões
+    encerradas não fiquem presas aqui.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, "weakref.WeakSet[ServerSession]"] = {}
+
+    def subscribe(self, uri: str, session: ServerSession) -> None:
+        """Inscreve a sessão para receber atualizações da URI"""
+        self._subscribers.setdefault(uri, weakref.WeakSet()).add(session)
+
+    def unsubscribe(self, uri: str, session: ServerSession) -> None:
+        """Cancela a inscrição da sessão na URI"""
+        sessions = self._subscribers.get(uri)
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._subscribers[uri]
+
+    def subscribers(self, uri: str) -> List[ServerSession]:
+        """Sessões inscritas na URI"""
+        return list(self._subscribers.get(uri, ()))
+
+    def has_subscribers(self, prefix: str = "") -> bool:
+        """Indica se há alguma inscrição em URIs com o prefixo"""
+        return any(
+            uri.startswith(prefix) and len(sessions) > 0
+            for uri, sessions in self._subscribers.items()
+        )
+
+    async def notify(self, uris: Iterable[str]) -> int:
+        """Envia resources/updated às sessões inscritas; retorna o total enviado"""
+        sent = 0
+        for uri in uris:
+            for session in self.subscribers(uri):
+                try:
+                    await session.send_resource_updated(AnyUrl(uri))
+                    sent += 1
+                except Exception as e:
+                    logger.debug("Falha ao notificar %s: %s", uri, e)
+                    self.unsubscribe(uri, session)
+        return sent
+
+
+def _changed_ids(old: Optional[List[Dict[str, Any]]], new: List[Dict[str, Any]]) -> Set[Any]:
+    """IDs dos itens adicionados, removidos ou alterados entre duas listas"""
+    before = {item.get("id"): item for item in old or ()}
+    after = {item.get("id"): item for item in new}
+    return {
+        item_id
+        for item_id in before.keys() | after.keys()
+        if before.get(item_id) != after.get(item_id)
+    }
+
+
+class ResourceRefresher:
+    """Revalida periodicamente os dados dos recursos com inscrições
+
+    Só consulta a origem quando alguém está inscrito, e notifica apenas as
+    URIs cujos dados mudaram.
+    """
+
+    def __init__(
+        self,
+        api_manager: APIManager,
+        subscriptions: SubscriptionManager,
+        interval: float = 60.0,
+    ):
+        self.api_manager = api_manager
+        self.subscriptions = subscriptions
+        self.interval = interval
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        """Inicia o laço de atualização"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Interrompe o laço de atualização"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh_once()
+            except Exception as e:
+                logger.warning("Falha ao atualizar recursos: %s", e)
+
+    async def refresh_once(self) -> List[str]:
+        """Revalida os recursos inscritos e retorna as URIs alteradas"""
+        api = self.api_manager.jsonplaceholder
+        client = self.api_manager.client
+        changed: List[str] = []
+
+        # Sem valor anterior em cache não há com o que comparar
+        if self.subscriptions.has_subscribers("posts://"):
+            old, new = await client.refresh(f"{api.BASE_URL}/posts")
+            ids = _changed_ids(old, new) if old is not None else set()
+            if ids:
+                changed.append("posts://all")
+                for post_id in sorted(ids):
+                    client.cache.invalidate(f"{api.BASE_URL}/posts/{post_id}")
+                    changed.append(f"posts://{post_id}")
+
+        if self.subscriptions.has_subscribers("users://"):
+            old, new = await client.refresh(f"{api.BASE_URL}/users")
+            if old is not None and old != new:
+                changed.append("users://all")
+
+        if changed:
+            await self.subscriptions.notify(changed)
+        return changed
@@ -0,0 +1,245 @@
+"""
+Descrição das APIs públicas usadas pelo servidor
+
+Para adicionar uma API, descreva-a aqui como um ``Upstream``: o cliente
+(com cache, coalescência de requisições e métricas) e as ferramentas MCP
+são gerados automaticamente.
+"""
+from typing import List, Optional
+
+from .models import CatFact, CatFactPage, Comment, Joke, Post, Todo, User
+from .registry import (
+    BODY, BYTES, POST, QUERY, SLICE, Endpoint, Param, ToolSpec, Upstream,
+)
+
+
+JSONPLACEHOLDER = Upstream(
+    name="jsonplaceholder",
+    class_name="JSONPlaceholderAPI",
+    title="JSONPlaceholder",
+    base_url="https://jsonplaceholder.typicode.com",
+    description="API fake para posts, usuários, comentários e todos",
+    cache_ttl=60.0,
+    max_concurrency=8,
+    endpoints=(
+        Endpoint(
+            name="get_posts",
+            paths=("/posts",),
+            description="Busca posts do JSONPlaceholder",
+            params=(Param("limit", Optional[int], None, "Número máximo de posts", SLICE),),
+            tool=ToolSpec(
+                name="get_posts",
+                description="Busca posts do JSONPlaceholder",
+                output=List[Post],
+                projection=True,
+                paging=True,
+                log="Buscando {count} posts",
+                error="Erro ao buscar posts",
+            ),
+        ),
+        Endpoint(
+            name="get_post",
+            paths=("/posts/{post_id}",),
+            description="Busca um post específico",
+            params=(Param("post_id", int),),
+            tool=ToolSpec(
+                name="get_post_by_id",
+                description="Busca um post específico pelo ID",
+                output=Post,
+                projection=True,
+                log="Buscando post {post_id}",
+                error="Erro ao buscar post {post_id}",
+            ),
+        ),
+        Endpoint(
+            name="get_comments",
+            paths=("/posts/{post_id}/comments", "/comments"),
+            description="Busca comentários (opcionalmente de um post específico)",
+            params=(Param("post_id", Optional[int], None),),
+            tool=ToolSpec(
+                name="get_comments",
+                description="Busca comentários (opcionalmente de um post específico)",
+                output=List[Comment],
+                projection=True,
+                paging=True,
+                log="Buscando {count} comentários",
+                error="Erro ao buscar comentários",
+            ),
+        ),
+        Endpoint(
+            name="get_users",
+            paths=("/users",),
+            description="Busca usuários",
+            tool=ToolSpec(
+                name="get_users",
+                description="Busca todos os usuários",
+                output=List[User],
+                projection=True,
+                paging=True,
+                log="Buscando {count} usuários",
+                error="Erro ao buscar usuários",
+            ),
+        ),
+        Endpoint(
+            name="get_user",
+            paths=("/users/{user_id}",),
+            description="Busca um usuário específico",
+            params=(Param("user_id", int),),
+            tool=ToolSpec(
+                name="get_user_by_id",
+                description="Busca um usuário específico pelo ID",
+                output=User,
+                projection=True,
+                log="Buscando usuário {user_id}",
+                error="Erro ao buscar usuário {user_id}",
+            ),
+        ),
+        Endpoint(
+            name="get_todos",
+            paths=("/users/{user_id}/todos", "/todos"),
+            description="Busca todos (opcionalmente de um usuário específico)",
+            params=(Param("user_id", Optional[int], None),),
+            tool=ToolSpec(
+                name="get_todos",
+                description="Busca todos os todos (opcionalmente de um usuário específico)",
+                output=List[Todo],
+                projection=True,
+                paging=True,
+                log="Buscando todos ({count} encontrados)",
+                error="Erro ao buscar todos",
+            ),
+        ),
+        Endpoint(
+            name="create_post",
+            paths=("/posts",),
+            description="Cria um novo post (fake)",
+            method=POST,
+            params=(
+                Param("title", str, location=BODY),
+                Param("body", str, location=BODY),
+                Param("user_id", int, location=BODY, wire_name="userId"),
+            ),
+            tool=ToolSpec(
+                name="create_post",
+                description="Cria um novo post (simulado)",
+                output=Post,
+                log="Post criado com sucesso (simulado)",
+                error="Erro ao criar post",
+            ),
+        ),
+    ),
+)
+
+
+CATFACTS = Upstream(
+    name="catfacts",
+    class_name="CatFactsAPI",
+    title="Cat Facts",
+    base_url="https://catfact.ninja",
+    description="API de fatos sobre gatos",
+    max_concurrency=4,
+    endpoints=(
+        Endpoint(
+            name="get_random_fact",
+            paths=("/fact",),
+            description="Busca um fato aleatório sobre gatos",
+            tool=ToolSpec(
+                name="get_cat_fact",
+                description="Busca um fato aleatório sobre gatos",
+                output=CatFact,
+                pooled=True,
+                log="Buscando fato sobre gatos",
+                error="Erro ao buscar fato sobre gatos",
+            ),
+        ),
+        Endpoint(
+            name="get_facts",
+            paths=("/facts",),
+            description="Busca múltiplos fatos sobre gatos",
+            params=(
+                Param("limit", int, 10, "Número de fatos", QUERY),
+                Param("page", Optional[int], None, "Página dos resultados", QUERY),
+            ),
+            tool=ToolSpec(
+                name="get_multiple_cat_facts",
+                description="Busca múltiplos fatos sobre gatos",
+                output=CatFactPage,
+                defaults={"limit": 5},
+                log="Buscando {limit} fatos sobre gatos",
+                error="Erro ao buscar fatos sobre gatos",
+            ),
+        ),
+    ),
+)
+
+
+JOKES = Upstream(
+    name="jokes",
+    class_name="JokeAPI",
+    title="Official Joke API",
+    base_url="https://official-joke-api.appspot.com",
+    description="API de piadas",
+    max_concurrency=4,
+    endpoints=(
+        Endpoint(
+            name="get_random_joke",
+            paths=("/random_joke",),
+            description="Busca uma piada aleatória",
+            tool=ToolSpec(
+                name="get_random_joke",
+                description="Busca uma piada aleatória",
+                output=Joke,
+                pooled=True,
+                log="Buscando piada aleatória",
+                error="Erro ao buscar piada",
+            ),
+        ),
+        Endpoint(
+            name="get_random_jokes",
+            paths=("/random_ten",),
+            description="Busca dez piadas aleatórias",
+        ),
+        Endpoint(
+            name="get_jokes_by_type",
+            paths=("/jokes/{joke_type}/random",),
+            description="Busca piadas por tipo",
+            params=(Param("joke_type", str, description="programming, general, knock-knock..."),),
+            tool=ToolSpec(
+                name="get_jokes_by_type",
+                description="Busca piadas por tipo (programming, general, knock-knock, etc.)",
+                output=List[Joke],
+                log="Buscando piadas do tipo: {joke_type}",
+                error="Erro ao buscar piadas do tipo {joke_type}",
+            ),
+        ),
+    ),
+)
+
+
+QRCODE = Upstream(
+    name="qrcode",
+    class_name="QRcodeAPI",
+    title="QR Code Generator",
+    base_url="https://api.qrserver.com/v1",
+    description="API para gerar imagens PNG de QR codes",
+    max_concurrency=4,
+    accept_encoding=(),  # PNG já é comprimido
+    endpoints=(
+        Endpoint(
+            name="generate_qrcode",
+            paths=("/create-qr-code/?data={text}",),
+            description="Gera o QR code",
+            method=BYTES,
+            params=(Param("text", str, description="Texto codificado no QR code"),),
+            tool=ToolSpec(
+                name="generate_qrcode",
+                description="Gera um QR code",
+                log="Gerando QR code",
+                error="Erro ao gerar QR code",
+            ),
+        ),
+    ),
+)
+
+
+UPSTREAMS = (JSONPLACEHOLDER, CATFACTS, JOKES, QRCODE)
@@ -0,0 +1,143 @@
+"""
+Saúde do event loop: atraso de agendamento e chamadas bloqueantes
+
+Todas as sessões dividem o mesmo event loop; uma chamada síncrona longa
+(um ``json.dumps`` grande, por exemplo) atrasa todas elas. ``LoopMonitor``
+mede esse atraso continuamente e, em modo de depuração, uma thread de
+vigia registra no log a pilha do código que está segurando o loop.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+
+from .metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) do histograma de atraso do loop
+LAG_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+# Quadros de pilha mantidos no status
+_STATUS_FRAMES = 5
+
+
+class LoopMonitor:
+    """Mede o atraso de agendamento do event loop
+
+    A cada ``interval`` segundos uma tarefa dorme e mede quanto acordou
+    atrasada (histograma ``event_loop_lag_seconds``). Atrasos a partir de
+    ``threshold`` contam em ``event_loop_blocked``. Com ``debug``, uma
+    thread confere o último batimento da tarefa e, se o loop ficar parado
+    além do limite, registra a pilha da thread do loop naquele momento.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1, debug: bool = False):
+        self.interval = interval
+        self.threshold = threshold
+        self.debug = debug
+        self.samples = 0
+        self.blocked = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_block: Optional[Dict[str, Any]] = None
+        self._beat = time.perf_counter()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def configure(self, debug: bool, threshold: float) -> None:
+        """Troca o modo de depuração (vale no próximo ``start``) e o limite"""
+        self.debug = debug
+        self.threshold = threshold
+
+    def start(self) -> None:
+        """Inicia a medição (e a vigia, em modo de depuração)"""
+        if self._task is not None:
+            return
+        self._beat = time.perf_counter()
+        self._task = asyncio.create_task(self._run())
+        if self.debug:
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._watch, args=(threading.get_ident(),),
+                name="loop-watchdog", daemon=True,
+            )
+            self._thread.start()
+
+    async def stop(self) -> None:
+        """Interrompe a medição"""
+        if self._thread is not None:
+            self._stopped.set()
+            # A vigia pode estar no meio de uma espera: não segura o loop
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self._beat = now = time.perf_counter()
+            self.record(max(0.0, now - expected))
+
+    def record(self, lag: float) -> None:
+        """Registra uma medida de atraso"""
+        self.samples += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        metrics.observe("event_loop_lag_seconds", lag, buckets=LAG_BUCKETS)
+        if lag >= self.threshold:
+            self.blocked += 1
+            metrics.incr("event_loop_blocked")
+
+    def _watch(self, loop_thread: int) -> None:
+        reported = None
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._beat
+            stalled = time.perf_counter() - beat - self.interval
+            if stalled < self.threshold or beat == reported:
+                continue
+            reported = beat
+            frame = sys._current_frames().get(loop_thread)
+            if frame is not None:
+                self._report(stalled, traceback.format_stack(frame))
+
+    def _report(self, stalled: float, stack: List[str]) -> None:
+        self.last_block = {
+            "stalled": round(stalled, 6),
+            "stack": [line.strip() for line in stack[-_STATUS_FRAMES:]],
+        }
+        logger.warning(
+            "Event loop bloqueado há %.0f ms; pilha da thread do loop:\n%s",
+            stalled * 1000, "".join(stack),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Resumo das medidas (para o recurso de status)"""
+        return {
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "debug": self.debug,
+            "samples": self.samples,
+            "last_lag": round(self.last_lag, 6),
+            "max_lag": round(self.max_lag, 6),
+            "blocked": self.blocked,
+            "last_block": self.last_block,
+        }
+
+
+# Monitor do processo: todas as sessões dividem o mesmo event loop
+loop_monitor = LoopMonitor()
@@ -0,0 +1,81 @@
+"""
+Testes para as agregações sobre os dados do JSONPlaceholder
+"""
+from mcp_server_one.analytics import AnalyticsIndex
+
+
+TODOS = [
+    {"userId": 1, "id": 1, "completed": True},
+    {"userId": 1, "id": 2, "completed": False},
+    {"userId": 2, "id": 3, "completed": True},
+]
+POSTS = [
+    {"userId": 1, "id": 1},
+    {"userId": 1, "id": 2},
+    {"userId": 2, "id": 3},
+]
+COMMENTS = [
+    {"postId": 1, "id": 1, "email": "a@Example.org"},
+    {"postId": 2, "id": 2, "email": "b@example.org"},
+    {"postId": 3, "id": 3, "email": "c@test.net"},
+]
+
+
+class TestAnalyticsIndex:
+    """Testes para o AnalyticsIndex"""
+
+    def test_todo_stats(self):
+        """Testa a contagem de todos por usuário"""
+        index = AnalyticsIndex()
+        index.sync("todos", TODOS)
+
+        assert index.todo_stats() == [
+            {"user_id": 1, "total": 2, "completed": 1, "pending": 1, "completion_rate": 0.5},
+            {"user_id": 2, "total": 1, "completed": 1, "pending": 0, "completion_rate": 1.0},
+        ]
+        assert index.todo_stats(9) == [
+            {"user_id": 9, "total": 0, "completed": 0, "pending": 0, "completion_rate": 0.0},
+        ]
+
+    def test_user_activity_and_domains(self):
+        """Testa posts/comentários por usuário e domínios de e-mail"""
+        index = AnalyticsIndex()
+        index.sync("posts", POSTS)
+        index.sync("comments", COMMENTS)
+
+        assert index.user_activity() == [
+            {"user_id": 1, "posts": 2, "comments": 2},
+            {"user_id": 2, "posts": 1, "comments": 1},
+        ]
+        assert index.top_comment_domains(1) == [{"domain": "example.org", "comments": 2}]
+
+    def test_same_list_is_not_reprocessed(self):
+        """Testa que a mesma lista (vinda do cache) não é percorrida de novo"""
+        index = AnalyticsIndex()
+
+        assert index.sync("todos", TODOS) == 3
+        assert index.sync("todos", TODOS) == 0
+
+    def test_same_version_is_not_reprocessed(self):
+        """Testa que uma nova leitura da mesma entrada do cache não é comparada"""
+        index = AnalyticsIndex()
+        index.sync("todos", [dict(todo) for todo in TODOS], version="entrada-1")
+        reread = [dict(todo, completed=True) for todo in TODOS]
+
+        assert index.sync("todos", reread, version="entrada-1") == 0
+        assert index.todo_stats(1)[0]["completed"] == 1
+        assert index.version("todos") == "entrada-1"
+
+    def test_incremental_update(self):
+        """Testa que só os itens alterados atualizam os contadores"""
+        index = AnalyticsIndex()
+        index.sync("todos", TODOS)
+        updated = [
+            {"userId": 1, "id": 1, "completed": True},
+            {"userId": 1, "id": 2, "completed": True},
+            {"userId": 3, "id": 4, "completed": False},
+        ]
+
+        assert index.sync("todos", updated) == 3
+        assert [s["user_id"] for s in index.todo_stats()] == [1, 3]
+        assert index.todo_stats(1)[0]["completed"] == 2
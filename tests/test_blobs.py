@@ -0,0 +1,91 @@
+"""
+Testes da codificação incremental e do armazenamento de blobs
+"""
+import base64
+
+import httpx
+import pytest
+
+from mcp_server_one.api_client import APIClient
+from mcp_server_one.blobs import Base64Encoder, Blob, BlobStore
+
+
+PNG = bytes(range(256)) * 40 + b"fim"
+
+
+def blob(blob_id: str, size: int) -> Blob:
+    return Blob(id=blob_id, data="A" * size, size=size, mime_type="image/png")
+
+
+class TestBase64Encoder:
+    """Testes para Base64Encoder"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 1024, len(PNG)])
+    def test_matches_base64_for_any_chunk_size(self, chunk_size):
+        """Testa que blocos de qualquer tamanho produzem o mesmo base64"""
+        encoder = Base64Encoder()
+        for i in range(0, len(PNG), chunk_size):
+            encoder.feed(PNG[i:i + chunk_size])
+        result = encoder.finish("image/png")
+
+        assert result.data == base64.b64encode(PNG).decode()
+        assert result.size == len(PNG)
+
+    def test_same_content_same_id(self):
+        """Testa que o ID depende só do conteúdo"""
+        first, second = Base64Encoder(), Base64Encoder()
+        first.feed(b"abc")
+        second.feed(b"a")
+        second.feed(b"bc")
+
+        assert first.finish("image/png").id == second.finish("image/png").id
+
+
+class TestBlobStore:
+    """Testes para BlobStore"""
+
+    def test_same_content_is_stored_once(self):
+        """Testa a deduplicação de blobs com o mesmo conteúdo"""
+        store = BlobStore()
+        store.put("a", blob("x", 10))
+        store.put("b", blob("x", 10))
+
+        assert len(store) == 1
+        assert store.bytes == 10
+        assert store.get("b").id == "x"
+
+    def test_least_recently_used_is_evicted(self):
+        """Testa a remoção do menos usado ao passar do limite"""
+        store = BlobStore(max_bytes=25)
+        store.put("a", blob("x", 10))
+        store.put("b", blob("y", 10))
+        store.get("a")
+        store.put("c", blob("z", 10))
+
+        assert store.get("a") is not None
+        assert store.get("b") is None
+        assert store.get_by_id("y") is None
+        assert store.bytes == 20
+
+
+class TestGetBlob:
+    """Testes para APIClient.get_blob"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_url_is_not_fetched_again(self):
+        """Testa que a mesma URL é servida do BlobStore"""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(200, content=PNG, headers={"content-type": "image/png"})
+
+        client = APIClient()
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        first = await client.get_blob("https://qr.test/png?data=a")
+        second = await client.get_blob("https://qr.test/png?data=a")
+
+        assert first is second
+        assert len(calls) == 1
+        assert base64.b64decode(first.data) == PNG
+        assert first.mime_type == "image/png"
@@ -0,0 +1,49 @@
+"""
+Testes para as chamadas compostas
+"""
+import asyncio
+
+import pytest
+
+from mcp_server_one.bundles import gather_parts
+
+
+async def value(result, delay=0.0):
+    await asyncio.sleep(delay)
+    return result
+
+
+async def fail(message):
+    raise RuntimeError(message)
+
+
+class TestGatherParts:
+    """Testes para gather_parts"""
+
+    @pytest.mark.asyncio
+    async def test_runs_parts_concurrently(self):
+        """Testa que as partes rodam em paralelo"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await gather_parts({"a": value(1, 0.05), "b": value(2, 0.05)})
+
+        assert result.data == {"a": 1, "b": 2}
+        assert result.errors == {}
+        assert loop.time() - start < 0.09
+
+    @pytest.mark.asyncio
+    async def test_partial_failure(self):
+        """Testa que a falha de uma parte não impede as demais"""
+        result = await gather_parts({"a": value(1), "b": fail("Erro HTTP 503")})
+
+        assert result.as_dict() == {"a": 1, "errors": {"b": "Erro HTTP 503"}}
+
+    @pytest.mark.asyncio
+    async def test_deadline_cancels_slow_parts(self):
+        """Testa que partes fora do prazo são canceladas e reportadas"""
+        slow = asyncio.ensure_future(value(2, 10))
+        result = await gather_parts({"fast": value(1), "slow": slow}, deadline=0.05)
+
+        assert result.data == {"fast": 1}
+        assert "Prazo" in result.errors["slow"]
+        assert slow.cancelled()
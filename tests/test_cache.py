@@ -0,0 +1,313 @@
+"""
+Testes para o cache de respostas do APIClient
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from mcp_server_one.api_client import APIClient, track_freshness, track_provenance
+from mcp_server_one.cache import CachePolicy, OutputCache, ResponseCache
+from mcp_server_one.deadlines import DeadlineExceeded, deadline_scope
+
+
+BASE_URL = "https://example.test"
+
+
+class FakeClock:
+    """Relógio controlado manualmente"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Upstream:
+    """Servidor fake que conta as requisições e pode falhar"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.fail:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"version": self.calls})
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def upstream():
+    return Upstream()
+
+
+@pytest.fixture
+def api_client(clock, upstream):
+    client = APIClient(cache=ResponseCache(clock=clock))
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(upstream.handler))
+    client.set_cache_policy(
+        BASE_URL,
+        CachePolicy(ttl=60, stale_while_revalidate=120, stale_if_error=600),
+    )
+    return client
+
+
+class TestResponseCache:
+    """Testes para a semântica de cache do APIClient"""
+
+    @pytest.mark.asyncio
+    async def test_fresh_hit_does_not_call_upstream(self, api_client, upstream):
+        """Testa que respostas frescas são servidas do cache"""
+        first = await api_client.get(f"{BASE_URL}/users")
+        second = await api_client.get(f"{BASE_URL}/users")
+
+        assert first == second == {"version": 1}
+        assert upstream.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self, api_client, upstream, clock):
+        """Testa que a resposta antiga é servida enquanto revalida"""
+        await api_client.get(f"{BASE_URL}/users")
+        clock.now += 90
+
+        with track_freshness() as freshness:
+            result = await api_client.get(f"{BASE_URL}/users")
+
+        assert result == {"version": 1}
+        assert freshness.as_meta() == {
+            "stale": True, "age": 90.0, "stale_reason": "revalidating"
+        }
+        await asyncio.sleep(0)
+        await asyncio.gather(*api_client._inflight.values())
+        assert await api_client.get(f"{BASE_URL}/users") == {"version": 2}
+
+    @pytest.mark.asyncio
+    async def test_stale_if_error(self, api_client, upstream, clock):
+        """Testa que a resposta antiga é servida quando a origem falha"""
+        await api_client.get(f"{BASE_URL}/users")
+        clock.now += 300
+        upstream.fail = True
+
+        with track_freshness() as freshness:
+            result = await api_client.get(f"{BASE_URL}/users")
+
+        assert result == {"version": 1}
+        assert freshness.reason == "upstream_error"
+
+    @pytest.mark.asyncio
+    async def test_error_after_max_staleness(self, api_client, upstream, clock):
+        """Testa que o erro é propagado fora da janela de stale-if-error"""
+        await api_client.get(f"{BASE_URL}/users")
+        clock.now += 1000
+        upstream.fail = True
+
+        with pytest.raises(Exception, match="Erro HTTP"):
+            await api_client.get(f"{BASE_URL}/users")
+
+    @pytest.mark.asyncio
+    async def test_urls_without_policy_are_not_cached(self, api_client, upstream):
+        """Testa que URLs sem política sempre consultam a origem"""
+        await api_client.get("https://other.test/fact")
+        await api_client.get("https://other.test/fact")
+
+        assert upstream.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_new_policy_keeps_warm_entries(self, api_client, upstream, clock):
+        """Testa que trocar o TTL mantém as respostas em cache, já na nova política"""
+        await api_client.get(f"{BASE_URL}/users")
+        clock.now += 90
+        api_client.update_upstream(BASE_URL, CachePolicy(ttl=600), max_concurrency=2)
+
+        assert await api_client.get(f"{BASE_URL}/users") == {"version": 1}
+        assert upstream.calls == 1
+        assert api_client.scheduler_stats()[BASE_URL]["capacity"] == 2
+
+        api_client.update_upstream(BASE_URL, None, None)
+        assert len(api_client.cache) == 0
+        assert api_client.scheduler_stats() == {}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self, api_client, upstream):
+        """Testa que buscas simultâneas da mesma URL geram uma só requisição"""
+        results = await asyncio.gather(
+            *(api_client.get(f"{BASE_URL}/users") for _ in range(5))
+        )
+
+        assert results == [{"version": 1}] * 5
+        assert upstream.calls == 1
+        assert not api_client._inflight
+
+    @pytest.mark.asyncio
+    async def test_max_concurrency_per_upstream(self):
+        """Testa o limite de requisições simultâneas de um upstream"""
+        active = 0
+        peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return httpx.Response(200, json={})
+
+        client = APIClient()
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client.configure_upstream("example", BASE_URL, max_concurrency=2)
+
+        await asyncio.gather(*(client.get(f"{BASE_URL}/posts/{i}") for i in range(6)))
+
+        assert peak == 2
+
+
+class TestOutputCache:
+    """Testes para OutputCache e a origem das respostas"""
+
+    @pytest.mark.asyncio
+    async def test_provenance_records_fresh_entries(self, api_client, clock):
+        """Testa que a origem registra as entradas frescas e não as antigas"""
+        with track_provenance() as first:
+            await api_client.get(f"{BASE_URL}/users")
+            await api_client.get(f"{BASE_URL}/users")
+        [(key, entry)] = first.entries.items()
+        assert first.complete
+        assert api_client.is_current(key, entry)
+
+        clock.now += 90
+        assert not api_client.is_current(key, entry)
+        with track_provenance() as stale:
+            await api_client.get(f"{BASE_URL}/users")
+        assert not stale.complete
+
+    @pytest.mark.asyncio
+    async def test_output_follows_source_entries(self, api_client):
+        """Testa que o resultado só é servido enquanto a entrada de origem não muda"""
+        outputs = OutputCache()
+        with track_provenance() as provenance:
+            await api_client.get(f"{BASE_URL}/users")
+        outputs.set("users", "pronto", provenance.entries, size=10)
+
+        assert outputs.get("users", api_client.is_current) == "pronto"
+        await api_client.refresh(f"{BASE_URL}/users")
+        assert outputs.get("users", api_client.is_current) is None
+        assert len(outputs) == 0
+        assert outputs.bytes == 0
+
+    def test_lru_and_disabled(self):
+        """Testa a remoção do menos usado e max_entries=0"""
+        outputs = OutputCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            outputs.set(key, key, {}, size=1)
+        assert outputs.get("a", lambda key, entry: True) is None
+        assert outputs.get("c", lambda key, entry: True) == "c"
+
+        disabled = OutputCache(max_entries=0)
+        disabled.set("a", "a", {}, size=1)
+        assert len(disabled) == 0
+
+    def test_resize(self):
+        """Testa que um limite menor remove os menos usados na hora"""
+        outputs = OutputCache(max_entries=3)
+        for key in ("a", "b", "c"):
+            outputs.set(key, key, {}, size=1)
+        outputs.resize(1)
+
+        assert len(outputs) == 1
+        assert outputs.get("c", lambda key, entry: True) == "c"
+
+
+class SlowUpstream:
+    """Origem lenta que registra requisições canceladas"""
+
+    def __init__(self, delay: float = 1.0):
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return httpx.Response(200, json={"version": self.calls})
+
+
+@pytest.fixture
+def slow_upstream():
+    return SlowUpstream()
+
+
+@pytest.fixture
+def slow_client(clock, slow_upstream):
+    client = APIClient(cache=ResponseCache(clock=clock))
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(slow_upstream.handler))
+    client.set_cache_policy(
+        BASE_URL,
+        CachePolicy(ttl=60, stale_while_revalidate=120, stale_if_error=600),
+    )
+    return client
+
+
+class TestDeadlinesAndCancellation:
+    """Testes da propagação de prazo e do cancelamento até a origem"""
+
+    @pytest.mark.asyncio
+    async def test_deadline_exceeded(self, slow_client, slow_upstream):
+        """Testa que a requisição é interrompida no fim do prazo"""
+        with deadline_scope(0.02):
+            with pytest.raises(DeadlineExceeded):
+                await slow_client.get(f"{BASE_URL}/users")
+        await asyncio.sleep(0)
+
+        assert slow_upstream.cancelled == 1
+        assert not slow_client._inflight
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_cancels_fetch(self, slow_client, slow_upstream):
+        """Testa que o cancelamento de quem espera libera a requisição"""
+        task = asyncio.ensure_future(slow_client.get(f"{BASE_URL}/users"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+        assert slow_upstream.cancelled == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_fetch_survives_one_caller(self, slow_client, slow_upstream):
+        """Testa que a busca continua enquanto outro chamador espera"""
+        slow_upstream.delay = 0.05
+        first = asyncio.ensure_future(slow_client.get(f"{BASE_URL}/users"))
+        second = asyncio.ensure_future(slow_client.get(f"{BASE_URL}/users"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == {"version": 1}
+        assert slow_upstream.calls == 1
+        assert slow_upstream.cancelled == 0
+
+    @pytest.mark.asyncio
+    async def test_stale_served_when_deadline_expires(self, slow_client, clock):
+        """Testa que a resposta antiga é servida quando o prazo acaba"""
+        slow_client.cache.set(
+            f"{BASE_URL}/users", {"version": 0},
+            CachePolicy(ttl=60, stale_while_revalidate=0, stale_if_error=600),
+        )
+        clock.now += 100
+
+        with track_freshness() as freshness, deadline_scope(0.02):
+            result = await slow_client.get(f"{BASE_URL}/users")
+
+        assert result == {"version": 0}
+        assert freshness.reason == "deadline"
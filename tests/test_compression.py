@@ -0,0 +1,162 @@
+"""
+Testes da compressão com as origens e nas respostas do servidor HTTP
+"""
+import gzip
+import json
+import zlib
+
+import httpx
+import pytest
+
+from mcp_server_one.api_client import APIClient
+from mcp_server_one.compression import CompressionMiddleware, _negotiate, accept_encoding
+from mcp_server_one.config import http_compression
+from mcp_server_one.metrics import metrics
+
+
+BASE_URL = "https://api.test"
+ITEMS = [{"id": i, "title": f"Item {i}"} for i in range(200)]
+
+
+class TestUpstreamCompression:
+    """Testes da negociação e descompressão das respostas das origens"""
+
+    @pytest.mark.asyncio
+    async def test_gzip_response_is_decoded_and_measured(self):
+        """Testa a descompressão própria e as métricas de bytes e codec"""
+        seen = []
+        body = gzip.compress(json.dumps(ITEMS).encode())
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.headers["accept-encoding"])
+            return httpx.Response(200, content=body, headers={"content-encoding": "gzip"})
+
+        metrics.reset()
+        client = APIClient()
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client.configure_upstream("api", BASE_URL)
+
+        assert await client.get(f"{BASE_URL}/items") == ITEMS
+        assert "gzip" in seen[0]
+        counters = metrics.snapshot()["counters"]
+        assert counters["upstream_bytes{encoding=gzip,stage=wire,upstream=api}"] == len(body)
+        assert counters["upstream_bytes{stage=decoded,upstream=api}"] == len(json.dumps(ITEMS))
+        assert metrics.snapshot()["histograms"]["codec_seconds{encoding=gzip,op=decode}"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_upstream_without_compression(self):
+        """Testa que uma lista vazia de codificações pede identity"""
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.headers["accept-encoding"])
+            return httpx.Response(200, content=b"png")
+
+        client = APIClient()
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client.configure_upstream("qr", BASE_URL, encodings=())
+
+        assert await client.get_bytes(f"{BASE_URL}/png") == b"png"
+        assert seen == ["identity"]
+
+    def test_accept_encoding_only_offers_available(self):
+        """Testa que codificações sem suporte não são pedidas"""
+        assert accept_encoding(["gzip", "inexistente"]) == "gzip"
+        assert accept_encoding([]) == "identity"
+
+
+def make_app(body: bytes, content_type: bytes, chunks: int = 1):
+    """App ASGI mínimo que responde ``body`` em ``chunks`` mensagens"""
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", content_type),
+                                (b"content-length", str(len(body)).encode())]})
+        size = -(-len(body) // chunks)
+        for i in range(chunks):
+            await send({"type": "http.response.body", "body": body[i * size:(i + 1) * size],
+                        "more_body": i < chunks - 1})
+
+    return app
+
+
+async def request(app, method="POST", accept="gzip"):
+    transport = httpx.ASGITransport(app=CompressionMiddleware(app, minimum_size=100,
+                                                              encodings=("gzip",)))
+    async with httpx.AsyncClient(transport=transport, base_url="http://server") as client:
+        return await client.request(method, "/mcp", headers={"accept-encoding": accept})
+
+
+class TestCompressionMiddleware:
+    """Testes para CompressionMiddleware"""
+
+    @pytest.mark.asyncio
+    async def test_large_response_is_compressed(self):
+        """Testa a compressão acima do limite, mesmo em várias mensagens"""
+        body = json.dumps(ITEMS).encode()
+        response = await request(make_app(body, b"application/json", chunks=3))
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == ITEMS
+        assert int(response.headers.get("content-length", 0)) != len(body)
+
+    @pytest.mark.asyncio
+    async def test_small_response_is_not_compressed(self):
+        """Testa que respostas pequenas passam sem compressão"""
+        response = await request(make_app(b'{"ok":true}', b"application/json"))
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_client_without_gzip(self):
+        """Testa que nada é comprimido sem o Accept-Encoding do cliente"""
+        body = json.dumps(ITEMS).encode()
+        response = await request(make_app(body, b"application/json"), accept="identity")
+
+        assert "content-encoding" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_event_stream_messages_are_flushed(self):
+        """Testa que cada mensagem do stream pode ser descomprimida ao chegar"""
+        events = [f"data: {json.dumps(ITEMS[:20])}\n\n".encode(), b"data: fim\n\n"]
+        sent = []
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"text/event-stream")]})
+            for i, event in enumerate(events):
+                await send({"type": "http.response.body", "body": event,
+                            "more_body": i < len(events) - 1})
+
+        async def capture(message):
+            sent.append(message)
+
+        middleware = CompressionMiddleware(app, minimum_size=100, encodings=("gzip",))
+        scope = {"type": "http", "method": "POST",
+                 "headers": [(b"accept-encoding", b"gzip")]}
+        await middleware(scope, None, capture)
+
+        decoder = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        assert (b"content-encoding", b"gzip") in sent[0]["headers"]
+        assert decoder.decompress(sent[1]["body"]) == events[0]
+        assert decoder.decompress(sent[2]["body"]) == events[1]
+
+
+class TestNegotiation:
+    """Testes da escolha da codificação do servidor"""
+
+    def test_negotiate(self):
+        """Testa a preferência do servidor e os valores q do cliente"""
+        assert _negotiate("gzip, zstd", ("zstd", "gzip")) == "zstd"
+        assert _negotiate("zstd;q=0, gzip;q=0.5", ("zstd", "gzip")) == "gzip"
+        assert _negotiate("*", ("gzip",)) == "gzip"
+        assert _negotiate("br", ("zstd", "gzip")) is None
+
+    def test_http_compression_from_env(self):
+        """Testa as variáveis MCP_HTTP_COMPRESSION e MCP_HTTP_COMPRESSION_MIN_SIZE"""
+        assert http_compression({}) == (("zstd", "gzip"), 1024)
+        assert http_compression({"MCP_HTTP_COMPRESSION": "off"})[0] == ()
+        assert http_compression({
+            "MCP_HTTP_COMPRESSION": "GZIP", "MCP_HTTP_COMPRESSION_MIN_SIZE": "10",
+        }) == (("gzip",), 10)
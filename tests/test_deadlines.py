@@ -0,0 +1,50 @@
+"""
+Testes para a propagação de prazos
+"""
+import asyncio
+
+import pytest
+
+from mcp_server_one.deadlines import (
+    DeadlineExceeded, deadline_scope, remaining, requested_timeout, within_deadline,
+)
+
+
+class TestDeadlines:
+    """Testes para deadline_scope e within_deadline"""
+
+    @pytest.mark.asyncio
+    async def test_inner_scope_cannot_extend_outer(self):
+        """Testa que um prazo interno nunca estende o externo"""
+        assert remaining() is None
+        with deadline_scope(1.0):
+            with deadline_scope(10.0) as budget:
+                assert budget <= 1.0
+            with deadline_scope(0.5) as budget:
+                assert budget <= 0.5
+            with deadline_scope(None):
+                assert remaining() is None
+        assert remaining() is None
+
+    @pytest.mark.asyncio
+    async def test_within_deadline_cancels_block(self):
+        """Testa que o bloco é interrompido quando o prazo acaba"""
+        with deadline_scope(0.02):
+            with pytest.raises(DeadlineExceeded, match="GET teste"):
+                async with within_deadline("GET teste"):
+                    await asyncio.sleep(1)
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_fails_immediately(self):
+        """Testa que nada é iniciado com o prazo já esgotado"""
+        with deadline_scope(0.0):
+            with pytest.raises(DeadlineExceeded, match="antes"):
+                async with within_deadline("GET teste"):
+                    pass
+
+    def test_requested_timeout(self):
+        """Testa a leitura do timeout enviado pelo cliente em _meta"""
+        assert requested_timeout({"timeout": 2}) == 2.0
+        assert requested_timeout({"timeout": "x"}) is None
+        assert requested_timeout({"timeout": 0}) is None
+        assert requested_timeout(None) is None
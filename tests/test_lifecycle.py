@@ -0,0 +1,115 @@
+"""
+Testes do encerramento gracioso e da recarga da configuração
+"""
+import asyncio
+import os
+
+import pytest
+
+from mcp_server_one import server
+from mcp_server_one.config import (
+    load_config_file, read_config_file, timeout_settings, upstream_limits,
+)
+from mcp_server_one.lifecycle import Drain, ShuttingDown
+from mcp_server_one.metrics import metrics
+from mcp_server_one.upstreams import UPSTREAMS
+
+
+JSONPLACEHOLDER = next(u for u in UPSTREAMS if u.name == "jsonplaceholder")
+
+
+class TestDrain:
+    """Testes para Drain"""
+
+    @pytest.mark.asyncio
+    async def test_waits_for_calls_in_flight(self):
+        """Testa que a drenagem espera as chamadas em andamento"""
+        drain = Drain()
+
+        async def call():
+            with drain.track():
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        assert drain.active == 1
+
+        assert await drain.wait(timeout=1.0) == 0
+        assert task.done()
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_timeout(self):
+        """Testa que a drenagem desiste no prazo e diz quantas sobraram"""
+        drain = Drain()
+        release = asyncio.Event()
+
+        async def call():
+            with drain.track():
+                await release.wait()
+
+        task = asyncio.create_task(call())
+        await asyncio.sleep(0)
+
+        assert await drain.wait(timeout=0.01) == 1
+        release.set()
+        await task
+        assert drain.active == 0
+
+    def test_refuses_new_calls(self):
+        """Testa que durante o encerramento as chamadas novas são recusadas"""
+        metrics.reset()
+        drain = Drain()
+        drain.draining = True
+
+        with pytest.raises(ShuttingDown):
+            with drain.track():
+                pass
+
+        assert drain.stats() == {"in_flight": 0, "draining": True, "rejected": 1}
+        assert metrics.snapshot()["counters"][
+            "tool_calls_rejected{reason=shutting_down}"
+        ] == 1
+
+
+def test_config_file(tmp_path):
+    """Testa a leitura do arquivo e a volta aos valores do processo"""
+    path = tmp_path / "mcp.env"
+    path.write_text(
+        "# prazos\nMCP_TOOL_TIMEOUT=12\n\nexport MCP_JSONPLACEHOLDER_CACHE_TTL='0'\n"
+    )
+    env = {"MCP_CONFIG_FILE": str(path), "MCP_TOOL_TIMEOUT": "5"}
+
+    assert read_config_file(str(path)) == {
+        "MCP_TOOL_TIMEOUT": "12", "MCP_JSONPLACEHOLDER_CACHE_TTL": "0",
+    }
+    load_config_file(env)
+    assert timeout_settings(env) == (12.0, 30.0)
+    assert upstream_limits(JSONPLACEHOLDER, env) == (None, 8)
+    assert upstream_limits(JSONPLACEHOLDER, {}) == (60.0, 8)
+
+    path.write_text("MCP_UPSTREAM_TIMEOUT=10\n")
+    load_config_file(env)
+    assert env == {
+        "MCP_CONFIG_FILE": str(path), "MCP_TOOL_TIMEOUT": "5", "MCP_UPSTREAM_TIMEOUT": "10",
+    }
+
+    del env["MCP_CONFIG_FILE"]
+    load_config_file(env)
+    assert env == {"MCP_TOOL_TIMEOUT": "5"}
+
+    path.write_text("MCP_TOOL_TIMEOUT\n")
+    with pytest.raises(ValueError, match="CHAVE=valor"):
+        read_config_file(str(path))
+
+
+def test_invalid_reload_keeps_configuration(tmp_path, monkeypatch):
+    """Testa que uma configuração inválida é recusada inteira"""
+    path = tmp_path / "mcp.env"
+    path.write_text("MCP_TOOL_CONCURRENCY=4\nMCP_TOOL_TIMEOUT=depressa\n")
+    monkeypatch.setenv("MCP_CONFIG_FILE", str(path))
+    monkeypatch.delenv("MCP_TOOL_CONCURRENCY", raising=False)
+    metrics.reset()
+
+    assert not server.reload_settings()
+    assert "MCP_TOOL_CONCURRENCY" not in os.environ
+    assert metrics.snapshot()["counters"]["config_reloads{result=error}"] == 1
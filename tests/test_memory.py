@@ -0,0 +1,157 @@
+"""
+Testes do orçamento de memória compartilhado entre os caches
+"""
+import gc
+
+from mcp_server_one.blobs import Blob, BlobStore
+from mcp_server_one.cache import CachePolicy, ResponseCache
+from mcp_server_one.config import memory_settings, parse_size
+from mcp_server_one.memory import MemoryBudget
+from mcp_server_one.metrics import metrics
+from mcp_server_one.paging import CursorStore
+
+
+POLICY = CachePolicy(ttl=60)
+ITEMS = [{"id": i, "title": "x" * 36} for i in range(10)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def blob(blob_id: str, size: int) -> Blob:
+    return Blob(id=blob_id, data="A" * size, size=size, mime_type="image/png")
+
+
+class TestMemoryBudget:
+    """Testes para MemoryBudget"""
+
+    def test_evicts_least_recently_used_across_caches(self):
+        """Testa que a entrada removida é a menos usada entre todos os caches"""
+        metrics.reset()
+        budget = MemoryBudget(max_bytes=10**9)
+        cache = ResponseCache(budget=budget)
+        blobs = BlobStore(budget=budget)
+        cache.set("old", {"a": 1}, POLICY)
+        blobs.put("img", blob("x", 1000))
+        cache.set("new", {"b": 2}, POLICY)
+        budget.configure(budget.bytes - 1, None)
+
+        cache.set("newest", {"c": 3}, POLICY)
+
+        # "old" era o menos usado, depois o blob
+        assert cache.get("old") is None
+        assert blobs.get("img") is None
+        assert cache.get("new") is not None
+        assert budget.bytes <= budget.max_bytes
+        assert metrics.snapshot()["counters"][
+            "cache_evictions{cache=responses,reason=budget}"
+        ] == 1
+
+    def test_access_keeps_entry(self):
+        """Testa que uma leitura torna a entrada a mais recente"""
+        budget = MemoryBudget(max_bytes=10**9)
+        cache = ResponseCache(budget=budget)
+        cache.set("a", {"a": 1}, POLICY)
+        cache.set("b", {"b": 2}, POLICY)
+        cache.get("a")
+        budget.configure(budget.bytes, None)
+
+        cache.set("c", {"c": 3}, POLICY)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+
+    def test_pressure_shrinks_caches(self):
+        """Testa que acima do limite de RSS os caches encolhem"""
+        metrics.reset()
+        rss = [100]
+        clock = FakeClock()
+        budget = MemoryBudget(max_bytes=10**9, rss_limit=1000, rss_interval=5.0,
+                              pressure_ratio=0.5, rss=lambda: rss[0], clock=clock)
+        cache = ResponseCache(budget=budget)
+        for i in range(10):
+            cache.set(str(i), {"i": i}, POLICY)
+        assert len(cache) == 10
+
+        rss[0] = 2000
+        clock.now = 10.0
+        cache.set("10", {"i": 10}, POLICY)
+        assert len(cache) < 10
+        assert cache.get("10") is not None
+
+        # O RSS só é conferido de novo depois do intervalo
+        remaining = len(cache)
+        cache.set("11", {"i": 11}, POLICY)
+        assert len(cache) == remaining + 1
+        counters = metrics.snapshot()["counters"]
+        assert counters["cache_evictions{cache=responses,reason=pressure}"] > 0
+
+    def test_collected_cache_is_released(self):
+        """Testa que os bytes de um cache coletado saem do orçamento"""
+        budget = MemoryBudget()
+        cache = ResponseCache(budget=budget)
+        cache.set("a", {"a": 1}, POLICY)
+        assert budget.stats()["caches"]["responses"] > 0
+
+        del cache
+        gc.collect()
+
+        assert budget.bytes == 0
+        assert budget.stats()["caches"] == {}
+
+    def test_cursors_join_budget(self):
+        """Testa que os cursores são contados e removidos pelo orçamento"""
+        budget = MemoryBudget(max_bytes=10**9)
+        store = CursorStore(budget=budget)
+        first = store.paginate(ITEMS, max_tokens=30).next_cursor
+        charged = budget.stats()["caches"]["cursors"]
+        assert charged == store.memory_bytes() > 0
+
+        # A página seguinte aponta para a mesma lista: nada a mais
+        second = store.next_page(first).next_cursor
+        assert budget.stats()["caches"]["cursors"] == charged
+
+        budget.configure(0, None)
+        ResponseCache(budget=budget).set("a", {"a": 1}, POLICY)
+        assert len(store) == 0
+        assert second is not None
+
+
+def test_cursor_pages_are_decoded():
+    """Testa que as páginas seguintes são decodificadas do JSON guardado"""
+    store = CursorStore()
+    first = store.paginate(ITEMS, max_tokens=30)
+    second = store.next_page(first.next_cursor)
+
+    assert first.items == ITEMS[:2]
+    assert second.items == ITEMS[2:4]
+    assert second.items[0] is not ITEMS[2]
+
+
+def test_cache_stores_compact_json():
+    """Testa que o cache guarda bytes e devolve um objeto novo a cada leitura"""
+    cache = ResponseCache()
+    value = {"a": [1, 2], "b": "ç"}
+    cache.set("k", value, POLICY)
+    entry = cache.get("k")
+
+    assert entry.data == '{"a":[1,2],"b":"ç"}'.encode()
+    assert entry.value == value
+    assert entry.value is not entry.value
+    assert cache.stats()["bytes"] > len(entry.data)
+
+
+def test_memory_settings():
+    """Testa a leitura do orçamento e do limite de RSS do ambiente"""
+    assert parse_size("512") == 512
+    assert parse_size("2k") == 2048
+    assert parse_size("1.5MB") == 1536 * 1024
+    assert memory_settings({})[1] is None
+    assert memory_settings({"MCP_MEMORY_BUDGET": "8M", "MCP_RSS_LIMIT": "1G"}) == (
+        8 * 1024 ** 2, 1024 ** 3
+    )
@@ -0,0 +1,142 @@
+"""
+Testes da escolha de espelhos e da configuração de endereços
+"""
+import httpx
+import pytest
+
+from mcp_server_one.api_client import APIClient
+from mcp_server_one.config import upstream_urls
+from mcp_server_one.mirrors import MirrorSet
+from mcp_server_one.upstreams import JSONPLACEHOLDER
+
+
+BASE_URL = "https://api.test"
+
+
+class FakeClock:
+    """Relógio controlado manualmente"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestMirrorSet:
+    """Testes para MirrorSet"""
+
+    def test_unmeasured_first_then_lowest_ewma(self):
+        """Testa que espelhos sem medida vêm primeiro e depois o mais rápido"""
+        mirrors = MirrorSet(BASE_URL, ["http://a", "http://b", "http://c"])
+        a, b, c = mirrors.mirrors
+        mirrors.record_success(a, 0.5)
+        mirrors.record_success(b, 0.1)
+
+        assert mirrors.ranked() == [c, b, a]
+
+        mirrors.record_success(c, 0.2)
+        assert mirrors.ranked() == [b, c, a]
+
+    def test_ewma_smooths_latency(self):
+        """Testa a média móvel exponencial"""
+        mirrors = MirrorSet(BASE_URL, ["http://a"], alpha=0.5)
+        mirror = mirrors.mirrors[0]
+        mirrors.record_success(mirror, 1.0)
+        mirrors.record_success(mirror, 0.0)
+
+        assert mirror.ewma == 0.5
+
+    def test_failed_mirror_waits_with_backoff(self):
+        """Testa que o espelho com falha sai da frente e volta depois"""
+        clock = FakeClock()
+        mirrors = MirrorSet(BASE_URL, ["http://a", "http://b"], cooldown=1.0, clock=clock)
+        a, b = mirrors.mirrors
+        mirrors.record_success(a, 0.01)
+        mirrors.record_success(b, 1.0)
+        mirrors.record_failure(a)
+        mirrors.record_failure(a)
+
+        assert mirrors.ranked() == [b, a]
+        clock.now = 1.5
+        assert mirrors.ranked() == [b, a]
+        clock.now = 2.0
+        assert mirrors.ranked() == [a, b]
+
+    def test_url_rewrite(self):
+        """Testa a troca da URL base canônica pela do espelho"""
+        mirrors = MirrorSet(BASE_URL, ["http://espelho:8080/"])
+
+        assert mirrors.url_for(mirrors.mirrors[0], f"{BASE_URL}/posts/1") == (
+            "http://espelho:8080/posts/1"
+        )
+
+
+class TestFailover:
+    """Testes do APIClient com espelhos"""
+
+    @staticmethod
+    def make_client(handler) -> APIClient:
+        client = APIClient()
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client.configure_upstream("api", BASE_URL, urls=["http://a", "http://b"])
+        return client
+
+    @pytest.mark.asyncio
+    async def test_fails_over_on_connection_error_and_5xx(self):
+        """Testa que falhas de conexão e 5xx passam para o próximo espelho"""
+        hosts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            hosts.append(request.url.host)
+            if request.url.host == "a":
+                raise httpx.ConnectError("recusada", request=request)
+            return httpx.Response(200, json={"host": request.url.host})
+
+        client = self.make_client(handler)
+
+        assert await client.get(f"{BASE_URL}/items") == {"host": "b"}
+        # "a" está fora: a próxima vai direto para "b"
+        assert await client.get(f"{BASE_URL}/items") == {"host": "b"}
+        assert hosts == ["a", "b", "b"]
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_fail_over(self):
+        """Testa que respostas 4xx não são repetidas em outro espelho"""
+        hosts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            hosts.append(request.url.host)
+            return httpx.Response(404)
+
+        client = self.make_client(handler)
+
+        with pytest.raises(Exception, match="404"):
+            await client.get(f"{BASE_URL}/items")
+        assert hosts == ["a"]
+        assert client.mirror_stats()["api"][0]["healthy"]
+
+    @pytest.mark.asyncio
+    async def test_all_mirrors_failing_raises(self):
+        """Testa o erro quando nenhum espelho responde"""
+        client = self.make_client(lambda request: httpx.Response(503))
+
+        with pytest.raises(Exception, match="503"):
+            await client.get(f"{BASE_URL}/items")
+        assert not any(m["healthy"] for m in client.mirror_stats()["api"])
+
+
+class TestConfig:
+    """Testes para config.upstream_urls"""
+
+    def test_default_is_base_url(self):
+        """Testa que sem variável vale a URL base do upstream"""
+        assert upstream_urls(JSONPLACEHOLDER, {}) == (JSONPLACEHOLDER.base_url,)
+
+    def test_urls_from_env(self):
+        """Testa a lista de espelhos separada por vírgulas"""
+        env = {"MCP_JSONPLACEHOLDER_URLS": " http://espelho:8080/ , https://jsonplaceholder.typicode.com"}
+
+        assert upstream_urls(JSONPLACEHOLDER, env) == (
+            "http://espelho:8080", "https://jsonplaceholder.typicode.com",
+        )
@@ -0,0 +1,120 @@
+"""
+Testes da codificação e decodificação de JSON fora do event loop
+"""
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+
+from mcp_server_one.api_client import APIClient
+from mcp_server_one.config import offload_settings
+from mcp_server_one.metrics import metrics
+from mcp_server_one.offload import Offloader, estimate_size, offloader
+
+
+ITEMS = [{"id": i, "title": f"Item {i}", "tags": ["a", "b"]} for i in range(1000)]
+
+
+def test_estimate_size_is_close():
+    """Testa que a estimativa fica perto do tamanho real"""
+    real = len(json.dumps(ITEMS))
+    assert 0.5 * real < estimate_size(ITEMS) < 1.5 * real
+    assert estimate_size([]) == 2
+
+
+class TestOffloader:
+    """Testes para Offloader"""
+
+    @pytest.mark.asyncio
+    async def test_small_inline_large_in_pool(self):
+        """Testa que só entradas a partir do limite vão para o pool"""
+        metrics.reset()
+        pool = Offloader(threshold=100)
+        try:
+            assert await pool.run(10, threading.get_ident) == threading.get_ident()
+            assert await pool.run(100, threading.get_ident) != threading.get_ident()
+        finally:
+            pool.shutdown()
+
+        assert metrics.counter("offload_calls", mode="inline") == 1
+        assert metrics.counter("offload_calls", mode="pool") == 1
+
+    @pytest.mark.asyncio
+    async def test_bounded_workers_and_queue(self):
+        """Testa que não passam de max_workers + max_pending ao mesmo tempo"""
+        pool = Offloader(threshold=0, max_workers=1, max_pending=1)
+        release = threading.Event()
+        running = []
+
+        def work():
+            running.append(1)
+            release.wait(5)
+
+        tasks = [asyncio.create_task(pool.run(1, work)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert len(running) == 1
+        assert pool._slots.locked()
+        release.set()
+        await asyncio.gather(*tasks)
+        pool.shutdown()
+        assert len(running) == 3
+
+    @pytest.mark.asyncio
+    async def test_configure_lets_queued_work_finish(self):
+        """Testa que reconfigurar não cancela o que já está na fila do pool antigo"""
+        pool = Offloader(threshold=0, max_workers=1)
+        release = threading.Event()
+
+        tasks = [asyncio.create_task(pool.run(1, release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        pool.configure(0, 2, "thread")
+        release.set()
+        results = await asyncio.gather(*tasks)
+        assert await pool.run(1, threading.get_ident) != threading.get_ident()
+        pool.shutdown()
+
+        assert results == [True, True, True]
+
+    @pytest.mark.asyncio
+    async def test_dumps_and_loads_in_process_pool(self):
+        """Testa o pool de processos"""
+        pool = Offloader(threshold=0, max_workers=1, kind="process")
+        try:
+            text = await pool.dumps(ITEMS, indent=2)
+            assert await pool.loads(text.encode()) == ITEMS
+        finally:
+            pool.shutdown()
+
+    def test_invalid_kind(self):
+        """Testa que um tipo de pool desconhecido é rejeitado"""
+        with pytest.raises(ValueError):
+            Offloader(kind="fibra")
+
+    @pytest.mark.asyncio
+    async def test_client_parses_large_response_in_pool(self):
+        """Testa que o APIClient decodifica respostas grandes no pool"""
+        metrics.reset()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=ITEMS)
+
+        client = APIClient()
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        offloader.configure(threshold=1024, max_workers=1, kind="thread")
+        try:
+            assert await client.get("https://api.test/items") == ITEMS
+        finally:
+            offloader.configure(*offload_settings({}))
+
+        assert metrics.counter("offload_calls", mode="pool") == 1
+
+
+def test_offload_settings():
+    """Testa as variáveis MCP_OFFLOAD_*"""
+    assert offload_settings({}) == (128 * 1024, 2, "thread")
+    assert offload_settings({
+        "MCP_OFFLOAD_THRESHOLD": "4096", "MCP_OFFLOAD_WORKERS": "0",
+        "MCP_OFFLOAD_KIND": "Process",
+    }) == (4096, 0, "process")
@@ -0,0 +1,81 @@
+"""
+Testes para a paginação com cursores
+"""
+import pytest
+
+from mcp_server_one.paging import CursorStore
+
+
+ITEMS = [{"id": i, "title": "x" * 36} for i in range(10)]  # ~50 bytes cada
+
+
+class FakeClock:
+    """Relógio controlado manualmente"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCursorStore:
+    """Testes para CursorStore"""
+
+    def test_small_response_has_no_cursor(self):
+        """Testa que respostas dentro do orçamento não são paginadas"""
+        page = CursorStore().paginate(ITEMS, max_tokens=1000)
+
+        assert page.items == ITEMS
+        assert page.next_cursor is None
+
+    def test_pages_cover_all_items(self):
+        """Testa que as páginas percorrem todos os itens sem repetição"""
+        store = CursorStore()
+        page = store.paginate(ITEMS, max_tokens=30)
+        seen = list(page.items)
+        while page.next_cursor:
+            page = store.next_page(page.next_cursor)
+            seen.extend(page.items)
+
+        assert len(page.items) <= 3
+        assert seen == ITEMS
+
+    def test_oversized_item_is_still_returned(self):
+        """Testa que um item maior que o orçamento é retornado sozinho"""
+        page = CursorStore().paginate(ITEMS, max_tokens=1)
+
+        assert page.items == ITEMS[:1]
+        assert page.next_cursor is not None
+
+    def test_expired_cursor(self):
+        """Testa que cursores expiram"""
+        clock = FakeClock()
+        store = CursorStore(ttl=10, clock=clock)
+        cursor = store.paginate(ITEMS, max_tokens=30).next_cursor
+        clock.now = 11
+
+        with pytest.raises(KeyError):
+            store.next_page(cursor)
+
+    def test_lru_eviction(self):
+        """Testa que os cursores menos usados são removidos"""
+        store = CursorStore(max_cursors=2)
+        first = store.paginate(ITEMS, max_tokens=30).next_cursor
+        store.paginate(ITEMS, max_tokens=30)
+        store.paginate(ITEMS, max_tokens=30)
+
+        assert len(store) == 2
+        with pytest.raises(KeyError):
+            store.next_page(first)
+
+    def test_memory_limit(self):
+        """Testa que os cursores mais antigos saem quando passam de max_bytes"""
+        store = CursorStore(max_bytes=2000)
+        first = store.paginate(ITEMS, max_tokens=30).next_cursor
+        second = store.paginate(list(ITEMS), max_tokens=30).next_cursor
+
+        assert store.memory_bytes() < 2000
+        with pytest.raises(KeyError):
+            store.next_page(first)
+        assert store.next_page(second).offset == 2
@@ -0,0 +1,111 @@
+"""
+Testes para o pool de pré-busca
+"""
+import asyncio
+
+import pytest
+
+from mcp_server_one.deadlines import DeadlineExceeded, deadline_scope, within_deadline
+from mcp_server_one.pool import PrefetchPool
+from mcp_server_one.scheduling import BATCH, current_caller
+
+
+class Batches:
+    """Fonte fake que devolve lotes pré-definidos e conta as buscas"""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.batches.pop(0) if self.batches else []
+
+
+def make_pool(source, **kwargs):
+    return PrefetchPool("test", source, key=lambda item: item["id"], **kwargs)
+
+
+def items(*ids):
+    return [{"id": i} for i in ids]
+
+
+class TestPrefetchPool:
+    """Testes para o PrefetchPool"""
+
+    @pytest.mark.asyncio
+    async def test_serves_items_from_one_batch(self):
+        """Testa que vários itens saem de uma só busca"""
+        source = Batches(items(1, 2, 3))
+        pool = make_pool(source, low_watermark=0)
+
+        taken = [await pool.take() for _ in range(3)]
+
+        assert taken == items(1, 2, 3)
+        assert source.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_duplicates_are_dropped(self):
+        """Testa que itens repetidos no lote não entram no buffer"""
+        pool = make_pool(Batches(items(1, 1, 2)), low_watermark=0)
+
+        await pool.take()
+        assert len(pool) == 1
+
+    @pytest.mark.asyncio
+    async def test_refills_below_low_watermark(self):
+        """Testa o reabastecimento em segundo plano"""
+        source = Batches(items(1, 2, 3), items(4, 5, 6))
+        pool = make_pool(source, low_watermark=3)
+
+        await pool.take()
+        await asyncio.sleep(0)
+
+        assert source.calls == 2
+        assert len(pool) == 5
+
+    @pytest.mark.asyncio
+    async def test_session_does_not_see_item_twice(self):
+        """Testa que a sessão não recebe um item repetido"""
+        source = Batches(items(1, 2), items(1, 3))
+        pool = make_pool(source, low_watermark=0)
+        seen = set()
+
+        first = [await pool.take(seen), await pool.take(seen)]
+        third = await pool.take(seen)
+
+        assert first == items(1, 2)
+        assert third == {"id": 3}
+        assert len(pool) == 1  # o item 1 continua disponível para outras sessões
+        assert await pool.take(set()) == {"id": 1}
+
+    @pytest.mark.asyncio
+    async def test_empty_source(self):
+        """Testa o erro quando a origem não retorna nada"""
+        pool = make_pool(Batches())
+
+        with pytest.raises(LookupError):
+            await pool.take()
+
+    @pytest.mark.asyncio
+    async def test_refill_outlives_caller_deadline(self):
+        """Testa que o prazo de quem iniciou o lote não vale para os demais"""
+        callers = []
+
+        async def slow_batch():
+            callers.append(current_caller())
+            async with within_deadline("lote"):
+                await asyncio.sleep(0.05)
+            return items(1, 2)
+
+        pool = make_pool(slow_batch, low_watermark=0)
+
+        async def hurried():
+            with deadline_scope(0.01):
+                return await pool.take()
+
+        first, second = await asyncio.gather(hurried(), pool.take(), return_exceptions=True)
+
+        assert isinstance(first, DeadlineExceeded)
+        assert second == {"id": 1}
+        assert [caller.priority for caller in callers] == [BATCH]
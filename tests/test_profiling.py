@@ -0,0 +1,180 @@
+"""
+Testes dos perfis de CPU e memória (ferramentas de administração)
+"""
+import threading
+import time
+
+import httpx
+import pytest
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from mcp_server_one.config import admin_settings, load_config_file
+from mcp_server_one.profiling import MemoryTracker, SamplingProfiler
+from mcp_server_one.server import enable_admin, register_admin
+
+
+def busy_work(stop: threading.Event) -> None:
+    """Ocupa a CPU até ``stop``"""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler:
+    """Testes para SamplingProfiler"""
+
+    def test_profile_written_in_folded_format(self, tmp_path):
+        """Testa que o perfil mostra a função ocupada e é gravado em folded"""
+        profiler = SamplingProfiler(str(tmp_path))
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_work, args=(stop,))
+        worker.start()
+        try:
+            profiler.start(duration=5, interval=0.002)
+            time.sleep(0.2)
+            result = profiler.stop()
+        finally:
+            stop.set()
+            worker.join()
+
+        assert result["samples"] > 10
+        lines = (tmp_path / result["path"].split("/")[-1]).read_text().splitlines()
+        assert int(lines[0].rsplit(" ", 1)[1]) > 0
+        assert any("busy_work (tests/test_profiling.py" in line for line in lines)
+
+    def test_one_profile_at_a_time(self, tmp_path):
+        """Testa que não há dois perfis simultâneos"""
+        profiler = SamplingProfiler(str(tmp_path))
+        profiler.start(duration=5)
+        try:
+            with pytest.raises(RuntimeError):
+                profiler.start()
+        finally:
+            profiler.stop()
+        with pytest.raises(RuntimeError):
+            profiler.stop()
+
+    def test_profiles_in_the_same_second_get_distinct_files(self, tmp_path):
+        """Testa que um perfil não sobrescreve o anterior gravado no mesmo segundo"""
+        profiler = SamplingProfiler(str(tmp_path))
+        paths = []
+        for _ in range(2):
+            profiler.start(duration=5)
+            paths.append(profiler.stop()["path"])
+
+        assert paths[0] != paths[1]
+        assert len(list(tmp_path.iterdir())) == 2
+
+    def test_window_ends_by_itself(self, tmp_path):
+        """Testa que o perfil termina sozinho ao fim da janela"""
+        profiler = SamplingProfiler(str(tmp_path))
+        profiler.start(duration=0.05)
+        time.sleep(0.2)
+
+        assert not profiler.running
+        assert profiler.stop()["elapsed"] < 0.2
+
+
+def test_memory_diff_shows_growth():
+    """Testa que o crescimento aparece na linha que alocou"""
+    tracker = MemoryTracker()
+    try:
+        assert tracker.diff()["started"]
+        retained = [bytes(1024) for _ in range(1000)]
+        top = tracker.diff(limit=3)["top"]
+    finally:
+        tracker.stop()
+
+    assert "test_profiling.py" in top[0]["location"]
+    assert top[0]["size_diff"] >= 1000 * 1024
+    assert len(retained) == 1000
+
+
+class TestAdmin:
+    """Testes das ferramentas e rotas de administração"""
+
+    @pytest.mark.asyncio
+    async def test_tools(self, tmp_path):
+        """Testa as ferramentas de perfil pelo protocolo MCP"""
+        admin = FastMCP("admin")
+        register_admin(admin, output_dir=str(tmp_path))
+
+        async with create_connected_server_and_client_session(admin._mcp_server) as client:
+            names = {tool.name for tool in (await client.list_tools()).tools}
+            started = await client.call_tool("profile_start", {"duration": 5})
+            stopped = await client.call_tool("profile_stop", {})
+            again = await client.call_tool("profile_stop", {})
+
+        assert names == {"profile_start", "profile_stop", "memory_snapshot_diff"}
+        assert started.structuredContent["path"] == stopped.structuredContent["path"]
+        assert again.isError
+
+    @pytest.mark.asyncio
+    async def test_http_routes_require_token(self, tmp_path):
+        """Testa que as rotas /admin exigem o token"""
+        admin = FastMCP("admin")
+        register_admin(admin, token="segredo", output_dir=str(tmp_path))
+        transport = httpx.ASGITransport(app=admin.streamable_http_app())
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://server") as client:
+            denied = await client.post("/admin/memory")
+            auth = {"authorization": "Bearer segredo"}
+            first = await client.post("/admin/memory", headers=auth)
+            stopped = await client.post("/admin/memory", params={"stop": "1"}, headers=auth)
+
+        assert denied.status_code == 401
+        assert first.json()["started"]
+        assert stopped.json() == {"stopped": True}
+
+    @pytest.mark.asyncio
+    async def test_tools_over_http_require_token(self, tmp_path):
+        """Testa que as ferramentas pedidas por HTTP exigem o token"""
+        admin = FastMCP("admin", stateless_http=True, json_response=True)
+        register_admin(admin, token="segredo", output_dir=str(tmp_path))
+        transport = httpx.ASGITransport(app=admin.streamable_http_app())
+        call = {
+            "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+            "params": {"name": "memory_snapshot_diff", "arguments": {"stop": True}},
+        }
+        headers = {"accept": "application/json, text/event-stream"}
+
+        async with admin.session_manager.run(), httpx.AsyncClient(
+            transport=transport, base_url="http://localhost:8000"
+        ) as client:
+            denied = await client.post("/mcp", json=call, headers=headers)
+            allowed = await client.post(
+                "/mcp", json=call, headers={**headers, "authorization": "Bearer segredo"}
+            )
+
+        assert denied.json()["result"]["isError"]
+        assert allowed.json()["result"]["structuredContent"] == {"stopped": True}
+
+    @pytest.mark.asyncio
+    async def test_enabled_by_config_file(self, tmp_path, monkeypatch):
+        """Testa que MCP_ADMIN_* vale vindo do arquivo de configuração"""
+        config = tmp_path / "mcp.env"
+        config.write_text("MCP_ADMIN_TOOLS=1\nMCP_ADMIN_TOKEN=segredo\n")
+        monkeypatch.setenv("MCP_CONFIG_FILE", str(config))
+        load_config_file()
+        try:
+            admin = FastMCP("admin")
+            assert enable_admin(admin)
+        finally:
+            monkeypatch.delenv("MCP_CONFIG_FILE")
+            load_config_file()
+        transport = httpx.ASGITransport(app=admin.streamable_http_app())
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            denied = await client.post("/admin/memory", params={"stop": "1"})
+            allowed = await client.post("/admin/memory", params={"stop": "1"},
+                                        headers={"authorization": "Bearer segredo"})
+
+        assert "profile_start" in {tool.name for tool in await admin.list_tools()}
+        assert denied.status_code == 401
+        assert allowed.json() == {"stopped": True}
+
+
+def test_admin_disabled_by_default():
+    """Testa que as ferramentas de administração vêm desligadas"""
+    assert admin_settings({}) == (False, None, None)
+    assert admin_settings({"MCP_ADMIN_TOOLS": "1", "MCP_ADMIN_TOKEN": "t"}) == (True, "t", None)
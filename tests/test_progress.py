@@ -0,0 +1,136 @@
+"""
+Testes da decodificação incremental e do envio de progresso
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_server_one.api_client import ArrayStreamDecoder
+from mcp_server_one.progress import PARTIAL_RESULTS_LOGGER, ProgressReporter
+
+
+class FakeClock:
+    """Relógio controlado manualmente"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSession:
+    """Sessão que registra as mensagens de log enviadas"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def send_log_message(self, level, data, logger=None, related_request_id=None):
+        self.messages.append((logger, data))
+
+
+class FakeContext:
+    """Context mínimo com _meta e registro do progresso enviado"""
+
+    def __init__(self, **meta):
+        self.request_id = "1"
+        self.progress = []
+        self.session = FakeSession()
+        self.request_context = SimpleNamespace(
+            meta=SimpleNamespace(**meta) if meta else None, session=self.session
+        )
+
+    async def report_progress(self, progress, total=None, message=None):
+        self.progress.append((progress, total))
+
+
+class TestArrayStreamDecoder:
+    """Testes para ArrayStreamDecoder"""
+
+    def test_items_split_across_chunks(self):
+        """Testa que itens cortados entre blocos são decodificados inteiros"""
+        data = json.dumps([{"id": 1, "t": "á"}, {"id": 2}, 3, "x"]).encode()
+        decoder = ArrayStreamDecoder()
+        seen = []
+        for i in range(0, len(data), 5):
+            seen.extend(decoder.feed(data[i:i + 5]))
+
+        assert seen == [{"id": 1, "t": "á"}, {"id": 2}, 3, "x"]
+        assert decoder.complete
+
+    def test_number_at_chunk_end_waits_for_more(self):
+        """Testa que um número no fim do bloco não é emitido pela metade"""
+        decoder = ArrayStreamDecoder()
+
+        assert decoder.feed(b"[12") == []
+        assert decoder.feed(b"34]") == [1234]
+
+    def test_non_array_fails(self):
+        """Testa que documentos que não são arrays não produzem itens"""
+        decoder = ArrayStreamDecoder()
+
+        assert decoder.feed(b'{"id": 1}') == []
+        assert decoder.failed
+
+
+class TestProgressReporter:
+    """Testes para ProgressReporter"""
+
+    @pytest.mark.asyncio
+    async def test_inactive_without_progress_token(self):
+        """Testa que nada é enviado sem progressToken"""
+        ctx = FakeContext()
+        reporter = ProgressReporter(ctx)
+        await reporter.update(1, 2)
+        await reporter.finish()
+
+        assert not reporter.active
+        assert ctx.progress == []
+
+    @pytest.mark.asyncio
+    async def test_updates_are_throttled(self):
+        """Testa o intervalo mínimo entre notificações (exceto a final)"""
+        clock = FakeClock()
+        ctx = FakeContext(progressToken="t")
+        reporter = ProgressReporter(ctx, min_interval=1.0, clock=clock)
+        await reporter.update(1, 10)
+        await reporter.update(2, 10)
+        clock.now += 1.0
+        await reporter.update(3, 10)
+        await reporter.finish()
+
+        assert ctx.progress == [(1, 10), (3, 10), (3, 3)]
+
+    @pytest.mark.asyncio
+    async def test_partial_results_are_sent_before_progress(self):
+        """Testa o envio dos itens parciais com o deslocamento de cada lote"""
+        clock = FakeClock()
+        ctx = FakeContext(progressToken="t", partialResults=True)
+        reporter = ProgressReporter(ctx, min_interval=1.0, clock=clock)
+        await reporter.on_fetch(10, 100, [1, 2])
+        await reporter.on_fetch(50, 100, [3])
+        await reporter.on_fetch(100, 100, [4])
+
+        assert ctx.session.messages == [
+            (PARTIAL_RESULTS_LOGGER, {"progressToken": "t", "offset": 0, "items": [1, 2]}),
+            (PARTIAL_RESULTS_LOGGER, {"progressToken": "t", "offset": 2, "items": [3, 4]}),
+        ]
+        assert ctx.progress == [(10, 100), (100, 100)]
+
+    @pytest.mark.asyncio
+    async def test_partial_results_follow_projection_and_page(self):
+        """Testa que os itens parciais saem projetados e só até o fim da página"""
+        ctx = FakeContext(progressToken="t", partialResults=True)
+        reporter = ProgressReporter(
+            ctx, transform=lambda items: [{"id": item["id"]} for item in items],
+            max_bytes=len('{"id":1}{"id":2}'),
+        )
+        await reporter.on_fetch(10, None, [{"id": 1, "body": "x"}])
+        await reporter.on_fetch(20, None, [{"id": 2, "body": "x"}, {"id": 3, "body": "x"}])
+        await reporter.on_fetch(30, None, [{"id": 4, "body": "x"}])
+        await reporter.finish()
+
+        assert [data["items"] for _, data in ctx.session.messages] == [
+            [{"id": 1}], [{"id": 2}],
+        ]
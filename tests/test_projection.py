@@ -0,0 +1,51 @@
+"""
+Testes para a projeção de campos
+"""
+from mcp_server_one.projection import parse_fields, project
+
+
+USER = {
+    "id": 1,
+    "name": "Leanne Graham",
+    "email": "Sincere@april.biz",
+    "address": {"street": "Kulas Light", "city": "Gwenborough", "geo": {"lat": "-37.3159"}},
+    "company": {"name": "Romaguera-Crona", "bs": "harness real-time e-markets"},
+}
+
+
+class TestProjection:
+    """Testes para parse_fields e project"""
+
+    def test_no_fields_returns_same_object(self):
+        """Testa que sem campos o objeto original é retornado"""
+        assert project(USER, parse_fields(None)) is USER
+        assert project(USER, parse_fields([])) is USER
+
+    def test_top_level_fields(self):
+        """Testa a projeção de campos de primeiro nível"""
+        result = project(USER, parse_fields(["id", "name"]))
+
+        assert result == {"id": 1, "name": "Leanne Graham"}
+
+    def test_nested_fields(self):
+        """Testa a projeção de campos aninhados"""
+        result = project(USER, parse_fields(["email", "address.city", "address.geo.lat"]))
+
+        assert result == {
+            "email": "Sincere@april.biz",
+            "address": {"city": "Gwenborough", "geo": {"lat": "-37.3159"}},
+        }
+
+    def test_whole_field_wins_over_subfields(self):
+        """Testa que pedir o campo inteiro mantém todos os subcampos"""
+        tree = parse_fields(["company.name", "company"])
+
+        assert project(USER, tree) == {"company": USER["company"]}
+
+    def test_list_projection_does_not_mutate_source(self):
+        """Testa a projeção de listas sem alterar os dados originais"""
+        users = [USER, {**USER, "id": 2}]
+        result = project(users, parse_fields(["id", "missing"]))
+
+        assert result == [{"id": 1}, {"id": 2}]
+        assert "name" in users[0]
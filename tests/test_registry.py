@@ -0,0 +1,198 @@
+"""
+Testes para o registro declarativo de upstreams
+"""
+import inspect
+from typing import Optional
+
+import pytest
+
+from mcp_server_one.api_client import APIManager
+from mcp_server_one.metrics import Metrics
+from mcp_server_one.registry import (
+    BODY, BYTES, QUERY, SLICE, POST, Endpoint, Param, ToolSpec, Upstream,
+    build_api_class, tool_signature,
+)
+from mcp_server_one.upstreams import UPSTREAMS
+
+
+class RecordingClient:
+    """Cliente fake que registra as chamadas"""
+
+    def __init__(self, result=None):
+        self.calls = []
+        self.result = result if result is not None else {"ok": True}
+
+    async def get(self, url, params=None):
+        self.calls.append(("get", url, params))
+        return self.result
+
+    async def post(self, url, data=None):
+        self.calls.append(("post", url, data))
+        return self.result
+
+    async def get_bytes(self, url, params=None):
+        self.calls.append(("get_bytes", url, params))
+        return b"png"
+
+    async def get_blob(self, url, params=None):
+        self.calls.append(("get_blob", url, params))
+        return self.result
+
+
+EXAMPLE = Upstream(
+    name="example",
+    class_name="ExampleAPI",
+    title="Example",
+    base_url="https://example.test",
+    description="API de exemplo",
+    endpoints=(
+        Endpoint(
+            name="get_items",
+            paths=("/groups/{group}/items", "/items"),
+            description="Busca itens",
+            params=(
+                Param("group", Optional[str], None),
+                Param("limit", Optional[int], None, location=SLICE),
+                Param("sort", Optional[str], None, location=QUERY),
+            ),
+            tool=ToolSpec(name="list_items", description="Lista itens", defaults={"limit": 3}),
+        ),
+        Endpoint(
+            name="create_item",
+            paths=("/items",),
+            description="Cria um item",
+            method=POST,
+            params=(Param("owner_id", int, location=BODY, wire_name="ownerId"),),
+        ),
+        Endpoint(
+            name="get_image",
+            paths=("/images/{name}",),
+            description="Busca uma imagem",
+            method=BYTES,
+            params=(Param("name", str),),
+        ),
+    ),
+)
+
+
+class TestBuildApiClass:
+    """Testes para os clientes gerados"""
+
+    @pytest.mark.asyncio
+    async def test_chooses_path_and_quotes_values(self):
+        """Testa a escolha do caminho e o escape dos valores"""
+        client = RecordingClient()
+        api = build_api_class(EXAMPLE)(client)
+
+        await api.get_items()
+        await api.get_items("a b")
+
+        assert client.calls == [
+            ("get", "https://example.test/items", None),
+            ("get", "https://example.test/groups/a%20b/items", None),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_query_slice_and_body_params(self):
+        """Testa parâmetros de query, de recorte e do corpo"""
+        client = RecordingClient(result=[1, 2, 3, 4])
+        api = build_api_class(EXAMPLE)(client)
+
+        assert await api.get_items(limit=2, sort="name") == [1, 2]
+        await api.create_item(owner_id=7)
+
+        assert client.calls == [
+            ("get", "https://example.test/items", {"sort": "name"}),
+            ("post", "https://example.test/items", {"ownerId": 7}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_bytes_endpoint_also_has_blob_method(self):
+        """Testa que endpoints BYTES geram também o método ``_blob``"""
+        client = RecordingClient()
+        api = build_api_class(EXAMPLE)(client)
+
+        assert await api.get_image("a") == b"png"
+        await api.get_image_blob("a")
+
+        assert client.calls == [
+            ("get_bytes", "https://example.test/images/a", None),
+            ("get_blob", "https://example.test/images/a", None),
+        ]
+        assert not hasattr(api, "get_items_blob")
+
+    @pytest.mark.asyncio
+    async def test_missing_argument(self):
+        """Testa o erro quando falta um argumento obrigatório"""
+        api = build_api_class(EXAMPLE)(RecordingClient())
+
+        with pytest.raises(TypeError, match="owner_id"):
+            await api.create_item()
+
+    def test_signatures(self):
+        """Testa as assinaturas do método e da ferramenta gerados"""
+        cls = build_api_class(EXAMPLE)
+        method = inspect.signature(cls.get_items)
+        tool = {p.name: p.default for p in tool_signature(EXAMPLE.endpoints[0])}
+
+        assert list(method.parameters) == ["self", "group", "limit", "sort"]
+        assert method.parameters["limit"].default is None
+        assert tool == {"group": None, "limit": 3, "sort": None}
+
+
+class TestUpstreams:
+    """Testes para as APIs descritas em upstreams.py"""
+
+    def test_tool_names_are_unique(self):
+        """Testa que não há ferramentas com o mesmo nome"""
+        names = [
+            endpoint.tool.name
+            for upstream in UPSTREAMS
+            for endpoint in upstream.endpoints
+            if endpoint.tool is not None
+        ]
+        assert len(names) == len(set(names))
+
+    @pytest.mark.asyncio
+    async def test_zero_id_keeps_handwritten_paths(self):
+        """Testa que id 0 escolhe o caminho como os clientes escritos à mão"""
+        client = RecordingClient(result=[])
+        api = APIManager().jsonplaceholder
+        api.client = client
+
+        await api.get_comments(post_id=0)
+        await api.get_todos(user_id=0)
+        await api.get_post(0)
+
+        assert [url for _, url, _ in client.calls] == [
+            "https://jsonplaceholder.typicode.com/comments",
+            "https://jsonplaceholder.typicode.com/todos",
+            "https://jsonplaceholder.typicode.com/posts/0",
+        ]
+
+    def test_manager_exposes_every_upstream(self):
+        """Testa que o APIManager cria um cliente para cada upstream"""
+        manager = APIManager()
+        for upstream in UPSTREAMS:
+            api = manager.api(upstream.name)
+            assert api is getattr(manager, upstream.name)
+            assert api.BASE_URL == upstream.base_url
+
+
+class TestMetrics:
+    """Testes para o registro de métricas"""
+
+    def test_counters_and_histograms(self):
+        """Testa contadores com rótulos e histogramas"""
+        m = Metrics()
+        m.incr("requests", upstream="a")
+        m.incr("requests", upstream="a")
+        m.observe("latency", 0.02, buckets=(0.01, 0.1))
+        m.observe("latency", 5.0, buckets=(0.01, 0.1))
+
+        snapshot = m.snapshot()
+        assert m.counter("requests", upstream="a") == 2
+        assert snapshot["counters"] == {"requests{upstream=a}": 2}
+        assert snapshot["histograms"]["latency"]["buckets"] == {
+            "0.01": 0, "0.1": 1, "+Inf": 1
+        }
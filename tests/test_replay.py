@@ -0,0 +1,127 @@
+"""
+Testes da gravação e reprodução do tráfego com as origens
+"""
+import gzip
+import json
+
+import httpx
+import pytest
+
+from mcp_server_one.api_client import APIClient, APIManager
+from mcp_server_one.replay import RecordingTransport, ReplayTransport, transport_from_env
+
+
+def upstream(request: httpx.Request) -> httpx.Response:
+    """API de origem simulada"""
+    if request.url.path == "/png":
+        return httpx.Response(200, content=b"\x89PNG\xff", headers={"content-type": "image/png"})
+    if request.method == "POST":
+        return httpx.Response(201, json={"echo": json.loads(request.content)})
+    page = request.url.params.get("page", "1")
+    return httpx.Response(200, json={"page": page}, headers={"x-ignored": "1"})
+
+
+async def record(path, *requests):
+    transport = RecordingTransport(str(path), httpx.MockTransport(upstream))
+    async with httpx.AsyncClient(transport=transport) as client:
+        for method, url, kwargs in requests:
+            await client.request(method, url, **kwargs)
+
+
+class TestRecordReplay:
+    """Testes para RecordingTransport e ReplayTransport"""
+
+    @pytest.mark.asyncio
+    async def test_replay_serves_recorded_responses(self, tmp_path):
+        """Testa que JSON, binário e POST voltam iguais, sem a origem"""
+        path = tmp_path / "cassete.jsonl"
+        await record(
+            path,
+            ("GET", "https://api.test/items?page=2", {}),
+            ("GET", "https://api.test/png", {}),
+            ("POST", "https://api.test/items", {"json": {"a": 1}}),
+        )
+
+        async with httpx.AsyncClient(transport=ReplayTransport(str(path), 0)) as client:
+            page = await client.get("https://api.test/items?page=2")
+            png = await client.get("https://api.test/png")
+            post = await client.post("https://api.test/items", json={"a": 1})
+
+        assert page.json() == {"page": "2"}
+        assert "x-ignored" not in page.headers
+        assert png.content == b"\x89PNG\xff"
+        assert png.headers["content-type"] == "image/png"
+        assert post.status_code == 201
+        assert post.json() == {"echo": {"a": 1}}
+
+    @pytest.mark.asyncio
+    async def test_unknown_query_falls_back_to_same_path(self, tmp_path):
+        """Testa o casamento pelo caminho e o erro sem nenhuma gravação"""
+        path = tmp_path / "cassete.jsonl.gz"
+        await record(path, ("GET", "https://api.test/items?page=1", {}))
+
+        with gzip.open(path, "rt") as file:
+            assert len(file.readlines()) == 1
+        async with httpx.AsyncClient(transport=ReplayTransport(str(path), 0)) as client:
+            other = await client.get("https://api.test/items?page=7")
+            with pytest.raises(httpx.ConnectError, match="Sem resposta gravada"):
+                await client.get("https://api.test/outro")
+
+        assert other.json() == {"page": "1"}
+
+    @pytest.mark.asyncio
+    async def test_latency_is_scaled(self, tmp_path):
+        """Testa a espera com a latência gravada multiplicada pela escala"""
+        path = tmp_path / "cassete.jsonl"
+        path.write_text(json.dumps({
+            "method": "GET", "url": "https://api.test/items", "status": 200,
+            "headers": {}, "body": "[]", "elapsed": 0.2,
+        }) + "\n")
+        waits = []
+
+        async def sleep(seconds):
+            waits.append(seconds)
+
+        transport = ReplayTransport(str(path), latency_scale=0.5, sleep=sleep)
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("https://api.test/items")
+
+        assert waits == [0.1]
+
+
+class TestTransportFromEnv:
+    """Testes para transport_from_env"""
+
+    def test_live_by_default(self, monkeypatch):
+        """Testa que sem configuração a rede é usada"""
+        monkeypatch.delenv("MCP_UPSTREAM_MODE", raising=False)
+
+        assert transport_from_env() is None
+
+    def test_replay_mode_reaches_api_manager(self, monkeypatch, tmp_path):
+        """Testa que o APIManager usa o cassete indicado no ambiente"""
+        path = tmp_path / "cassete.jsonl"
+        path.write_text("")
+        monkeypatch.setenv("MCP_UPSTREAM_MODE", "replay")
+        monkeypatch.setenv("MCP_CASSETTE", str(path))
+
+        assert isinstance(APIManager().client.transport, ReplayTransport)
+
+    def test_invalid_mode(self, monkeypatch):
+        """Testa o erro com modo desconhecido ou sem cassete"""
+        monkeypatch.setenv("MCP_UPSTREAM_MODE", "replay")
+        monkeypatch.delenv("MCP_CASSETTE", raising=False)
+
+        with pytest.raises(ValueError, match="MCP_CASSETTE"):
+            transport_from_env()
+
+
+@pytest.mark.asyncio
+async def test_api_client_over_replay(tmp_path):
+    """Testa o APIClient completo (cache, métricas) sobre um cassete"""
+    path = tmp_path / "cassete.jsonl"
+    await record(path, ("GET", "https://api.test/items?page=3", {}))
+    client = APIClient(transport=ReplayTransport(str(path), 0))
+
+    assert await client.get("https://api.test/items", {"page": 3}) == {"page": "3"}
+    await client.close()
@@ -0,0 +1,181 @@
+"""
+Testes do escalonamento por prioridade entre sessões
+"""
+import asyncio
+
+import pytest
+
+from mcp_server_one.config import scheduling_settings
+from mcp_server_one.metrics import metrics
+from mcp_server_one.scheduling import (
+    BATCH, INTERACTIVE, Caller, FairScheduler, PriorityRules, as_caller, current_caller,
+    requested_priority, shared_scheduler,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def run_queued(scheduler: FairScheduler, callers, order):
+    """Enfileira ``callers`` com a única vaga ocupada e registra a ordem de entrada"""
+
+    async def call(caller, label):
+        async with scheduler.slot(caller):
+            order.append(label)
+
+    await scheduler.acquire(Caller("ocupante"))
+    tasks = []
+    for caller, label in callers:
+        tasks.append(asyncio.create_task(call(caller, label)))
+        await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+
+
+class TestFairScheduler:
+    """Testes para FairScheduler"""
+
+    @pytest.mark.asyncio
+    async def test_enters_immediately_below_capacity(self):
+        """Testa que sem fila as chamadas entram na hora"""
+        scheduler = FairScheduler("t", capacity=2)
+        await scheduler.acquire(Caller("a"))
+        await scheduler.acquire(Caller("b"))
+
+        assert scheduler.in_use == 2
+        assert scheduler.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_interactive_goes_first_by_weight(self):
+        """Testa que a classe interativa recebe a maior parte das vagas"""
+        scheduler = FairScheduler("t", capacity=1, weights={INTERACTIVE: 2, BATCH: 1})
+        order = []
+        callers = [(Caller("job", BATCH), f"b{i}") for i in range(3)]
+        callers += [(Caller("agente"), f"i{i}") for i in range(3)]
+        await run_queued(scheduler, callers, order)
+
+        assert order == ["i0", "i1", "b0", "i2", "b1", "b2"]
+
+    @pytest.mark.asyncio
+    async def test_sessions_take_turns(self):
+        """Testa o rodízio entre sessões da mesma classe"""
+        scheduler = FairScheduler("t", capacity=1)
+        order = []
+        callers = [(Caller("a"), f"a{i}") for i in range(3)] + [(Caller("b"), "b0")]
+        await run_queued(scheduler, callers, order)
+
+        assert order == ["a0", "b0", "a1", "a2"]
+
+    @pytest.mark.asyncio
+    async def test_long_wait_passes_ahead(self):
+        """Testa que quem espera além de max_wait entra antes das prioridades"""
+        metrics.reset()
+        clock = FakeClock()
+        scheduler = FairScheduler("t", capacity=1, max_wait=5.0, clock=clock)
+        order = []
+
+        async def call(caller, label):
+            async with scheduler.slot(caller):
+                order.append(label)
+
+        await scheduler.acquire(Caller("ocupante"))
+        batch = asyncio.create_task(call(Caller("job", BATCH), "b0"))
+        await asyncio.sleep(0)
+        clock.now = 10.0
+        interactive = asyncio.create_task(call(Caller("agente"), "i0"))
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(batch, interactive)
+
+        assert order == ["b0", "i0"]
+        assert scheduler.starved == 1
+        assert metrics.snapshot()["counters"]["scheduler_starved{scheduler=t}"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Testa que uma espera cancelada sai da fila e não ocupa vaga"""
+        metrics.reset()
+        scheduler = FairScheduler("t", capacity=1)
+        await scheduler.acquire(Caller("a"))
+        waiting = asyncio.create_task(scheduler.acquire(Caller("b", BATCH)))
+        await asyncio.sleep(0)
+        assert metrics.snapshot()["gauges"][
+            "scheduler_queue_depth{priority=batch,scheduler=t}"
+        ] == 1
+
+        # Liberada antes de a tarefa cancelada retomar
+        waiting.cancel()
+        scheduler.release()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert scheduler.in_use == 0
+        assert scheduler.stats()["queued"] == {INTERACTIVE: 0, BATCH: 0}
+        assert metrics.snapshot()["gauges"][
+            "scheduler_queue_depth{priority=batch,scheduler=t}"
+        ] == 0
+
+    @pytest.mark.asyncio
+    async def test_resize(self):
+        """Testa que mais vagas deixam a fila andar e menos vagas seguram as novas"""
+        scheduler = FairScheduler("t", capacity=1)
+        await scheduler.acquire(Caller("a"))
+        waiting = asyncio.create_task(scheduler.acquire(Caller("b")))
+        await asyncio.sleep(0)
+        scheduler.resize(2)
+        await waiting
+        assert scheduler.in_use == 2
+
+        scheduler.resize(1)
+        scheduler.release()
+        late = asyncio.create_task(scheduler.acquire(Caller("c")))
+        await asyncio.sleep(0)
+        assert not late.done()
+        scheduler.release()
+        await late
+        assert scheduler.in_use == 1
+
+
+def test_shared_scheduler():
+    """Testa que o escalonador do processo é um só por nome e recebe a configuração nova"""
+    scheduler = shared_scheduler("teste-compartilhado", 2, max_wait=1.0)
+    same = shared_scheduler("teste-compartilhado", 3)
+
+    assert same is scheduler
+    assert (scheduler.capacity, scheduler.max_wait) == (3, 1.0)
+    assert shared_scheduler("outro-compartilhado", 2) is not scheduler
+
+
+def test_priority_rules():
+    """Testa a classificação por ferramenta, cliente e pedido"""
+    rules = PriorityRules(batch_tools=frozenset({"get_todos"}),
+                          batch_clients=frozenset({"indexador"}))
+
+    assert rules.classify("get_posts", "agente", None) == INTERACTIVE
+    assert rules.classify("get_todos", "agente", INTERACTIVE) == BATCH
+    assert rules.classify("get_posts", "indexador", None) == BATCH
+    assert rules.classify("get_posts", None, BATCH) == BATCH
+    assert requested_priority({"priority": "batch"}) == BATCH
+    assert requested_priority({"priority": "urgente"}) is None
+
+
+def test_caller_context():
+    """Testa que a chamada atual segue pelo contexto"""
+    assert current_caller().session == "-"
+    with as_caller(Caller("s", BATCH)):
+        assert current_caller() == Caller("s", BATCH)
+    assert current_caller().priority == INTERACTIVE
+
+
+def test_scheduling_settings():
+    """Testa a leitura da configuração do ambiente"""
+    assert scheduling_settings({}) == (32, 5.0, frozenset(), frozenset())
+    assert scheduling_settings({
+        "MCP_TOOL_CONCURRENCY": "4", "MCP_BATCH_TOOLS": "get_todos, get_comments",
+        "MCP_BATCH_CLIENTS": "indexador",
+    }) == (4, 5.0, frozenset({"get_todos", "get_comments"}), frozenset({"indexador"}))
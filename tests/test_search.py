@@ -0,0 +1,65 @@
+"""
+Testes para o índice de busca textual
+"""
+from mcp_server_one.search import SearchIndex, tokenize
+
+
+POSTS = [
+    {"id": 1, "title": "Receitas de café", "body": "Como preparar um café coado perfeito"},
+    {"id": 2, "title": "Viagem ao Japão", "body": "Roteiro de duas semanas pelo Japão"},
+    {"id": 3, "title": "Café no Japão", "body": "As cafeterias de Tóquio"},
+]
+
+
+def make_index(items=POSTS):
+    index = SearchIndex(("title", "body"))
+    index.sync(items)
+    return index
+
+
+class TestSearchIndex:
+    """Testes para o SearchIndex"""
+
+    def test_tokenize_folds_case_and_accents(self):
+        """Testa a normalização dos termos"""
+        assert tokenize("Café no JAPÃO!") == ["cafe", "no", "japao"]
+
+    def test_ranking(self):
+        """Testa que documentos com mais ocorrências vêm primeiro"""
+        hits = make_index().search("japao")
+
+        assert [hit["id"] for hit in hits] == [2, 3]
+        assert hits[0]["score"] > hits[1]["score"]
+
+    def test_prefix_matching(self):
+        """Testa a busca por prefixo"""
+        assert {hit["id"] for hit in make_index().search("cafet")} == {3}
+        assert make_index().search("cafet", prefix=False) == []
+
+    def test_snippet(self):
+        """Testa o trecho em volta da palavra encontrada"""
+        index = SearchIndex(("body",), snippet_words=3)
+        index.sync([{"id": 1, "body": "um dois três quatro cinco seis sete"}])
+
+        assert index.search("cinco")[0]["snippet"] == "…quatro cinco seis…"
+
+    def test_same_version_is_not_reindexed(self):
+        """Testa que uma nova leitura da mesma entrada do cache não é comparada"""
+        index = SearchIndex(("title", "body"))
+        index.sync([dict(post) for post in POSTS], version="entrada-1")
+        reread = [dict(post, title="Outro") for post in POSTS]
+
+        assert index.sync(reread, version="entrada-1") == 0
+        assert index.sync(reread, version="entrada-2") == 3
+        assert index.version == "entrada-2"
+
+    def test_incremental_sync(self):
+        """Testa que só documentos alterados são reindexados"""
+        index = make_index()
+        updated = [POSTS[0], {"id": 2, "title": "Viagem à Itália", "body": "Roma"}]
+
+        assert index.sync(POSTS) == 0
+        assert index.sync(updated) == 2
+        assert len(index) == 2
+        assert index.search("japao") == []
+        assert [hit["id"] for hit in index.search("italia")] == [2]
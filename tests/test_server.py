@@ -0,0 +1,667 @@
+"""
+Testes das ferramentas do servidor MCP (com APIs de origem simuladas)
+"""
+import asyncio
+import base64
+import json
+import os
+
+import httpx
+import pytest
+from mcp import types
+from mcp.shared.exceptions import McpError
+from mcp.shared.memory import create_connected_server_and_client_session
+from pydantic import AnyUrl
+
+from mcp_server_one import server
+from mcp_server_one.api_client import APIManager
+from mcp_server_one.config import load_config_file
+
+
+POSTS = [
+    {"userId": 1, "id": 1, "title": "Post 1", "body": "Body 1"},
+    {"userId": 1, "id": 2, "title": "Post 2", "body": "Body 2"},
+    {"userId": 2, "id": 3, "title": "Post 3", "body": "Body 3"},
+]
+
+USER = {"id": 1, "name": "Leanne Graham", "username": "Bret"}
+TODOS = [
+    {"userId": 1, "id": 1, "title": "Todo 1", "completed": True},
+    {"userId": 1, "id": 2, "title": "Todo 2", "completed": False},
+]
+
+
+async def upstream(request: httpx.Request) -> httpx.Response:
+    """API de origem simulada (comentários demoram a responder)"""
+    if request.url.path == "/comments":
+        await asyncio.sleep(5)
+    if request.url.path == "/posts":
+        return httpx.Response(200, json=POSTS)
+    if request.url.path == "/users/1":
+        return httpx.Response(200, json=USER)
+    if request.url.path.endswith("/todos"):
+        return httpx.Response(200, json=TODOS)
+    if request.url.path == "/v1/create-qr-code/":
+        return httpx.Response(
+            200, content=request.url.params["data"].encode(),
+            headers={"content-type": "image/png"},
+        )
+    return httpx.Response(404)
+
+
+@pytest.fixture
+def app_contexts(monkeypatch):
+    """Registra os AppContext criados pelo lifespan"""
+    created = []
+
+    class RecordingAppContext(server.AppContext):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self)
+
+    monkeypatch.setattr(server, "AppContext", RecordingAppContext)
+    return created
+
+
+@pytest.fixture
+def mcp_server(monkeypatch):
+    """Servidor MCP cujo APIManager usa a API de origem simulada"""
+
+    def make_api_manager() -> APIManager:
+        manager = APIManager()
+        manager.client.client = httpx.AsyncClient(
+            transport=httpx.MockTransport(upstream)
+        )
+        return manager
+
+    monkeypatch.setattr(server, "APIManager", make_api_manager)
+    monkeypatch.setattr(server, "session_store", server.SessionStore())
+    return server.mcp._mcp_server
+
+
+class TestTools:
+    """Testes das ferramentas"""
+
+    @pytest.mark.asyncio
+    async def test_get_posts_returns_structured_content(self, mcp_server):
+        """Testa que a ferramenta retorna conteúdo estruturado"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.call_tool("get_posts", {"limit": 2})
+
+        assert not result.isError
+        assert result.structuredContent == {"result": POSTS[:2]}
+
+    @pytest.mark.asyncio
+    async def test_get_posts_with_fields(self, mcp_server):
+        """Testa a projeção de campos na ferramenta"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.call_tool("get_posts", {"fields": ["id", "title"]})
+
+        assert not result.isError
+        assert result.structuredContent["result"][0] == {"id": 1, "title": "Post 1"}
+
+    @pytest.mark.asyncio
+    async def test_large_response_is_paged(self, mcp_server):
+        """Testa a paginação com max_tokens e next_page"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            first = await client.call_tool("get_posts", {"max_tokens": 20})
+            cursor = first.meta["page"]["next_cursor"]
+            second = await client.call_tool("next_page", {"cursor": cursor})
+            invalid = await client.call_tool("next_page", {"cursor": "invalido"})
+
+        assert first.structuredContent == {"result": POSTS[:1]}
+        assert "next_page" in first.content[-1].text
+        assert second.structuredContent == {"result": POSTS[1:2]}
+        assert invalid.isError
+
+    @pytest.mark.asyncio
+    async def test_repeated_call_reuses_serialized_result(self, mcp_server, app_contexts):
+        """Testa que a mesma chamada devolve o resultado pronto até a resposta mudar"""
+        server.metrics.reset()
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            first = await client.call_tool("get_posts", {"limit": 2})
+            outputs = app_contexts[0].outputs
+            cached = outputs.get('get_posts:{"limit":2}', lambda key, entry: True)
+            second = await client.call_tool("get_posts", {"limit": 2})
+            other = await client.call_tool("get_posts", {"limit": 1})
+            app_contexts[0].api_manager.client.cache.clear()
+            third = await client.call_tool("get_posts", {"limit": 2})
+
+        assert cached is not None
+        assert second.content[0].text == first.content[0].text == cached.content[0].text
+        assert other.structuredContent == {"result": POSTS[:1]}
+        assert third.structuredContent == {"result": POSTS[:2]}
+        assert outputs.get('get_posts:{"limit":2}', lambda key, entry: True) is not cached
+        counters = server.metrics.snapshot()["counters"]
+        assert counters["output_cache_requests{result=hit,tool=get_posts}"] == 1
+
+    def test_only_get_tools_reuse_results(self):
+        """Testa que resultados de mutações e imagens não entram no cache de resultados"""
+        assert "get_posts" in server._OUTPUT_CACHED
+        assert "create_post" not in server._OUTPUT_CACHED
+        assert "generate_qrcode" not in server._OUTPUT_CACHED
+
+    @pytest.mark.asyncio
+    async def test_calls_are_refused_while_draining(self, mcp_server):
+        """Testa que durante o encerramento as chamadas novas são recusadas"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            server.drain.draining = True
+            try:
+                with pytest.raises(McpError, match="encerrando"):
+                    await client.call_tool("get_posts", {})
+            finally:
+                server.drain.reset()
+            result = await client.call_tool("get_posts", {})
+
+        assert not result.isError
+
+    @pytest.mark.asyncio
+    async def test_session_end_keeps_offload_pool(self, mcp_server):
+        """Testa que o fim de uma sessão não encerra o pool das outras"""
+        pool = server.offloader._pool()
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            await client.call_tool("get_posts", {})
+
+        assert server.offloader._executor is pool
+
+    @pytest.mark.asyncio
+    async def test_reload_keeps_warm_cache(
+        self, mcp_server, app_contexts, tmp_path, monkeypatch
+    ):
+        """Testa que a recarga aplica TTL e prazo novos sem esvaziar o cache"""
+        config = tmp_path / "mcp.env"
+        config.write_text("MCP_JSONPLACEHOLDER_CACHE_TTL=600\nMCP_TOOL_TIMEOUT=12\n")
+        monkeypatch.setenv("MCP_CONFIG_FILE", str(config))
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            await client.call_tool("get_posts", {})
+            try:
+                assert server.reload_settings()
+            finally:
+                monkeypatch.delenv("MCP_CONFIG_FILE")
+                load_config_file()
+            app_ctx = app_contexts[0]
+            entry = app_ctx.api_manager.client.cache.get(
+                "https://jsonplaceholder.typicode.com/posts"
+            )
+
+        assert entry.policy.ttl == 600
+        assert app_ctx.tool_timeout == 12
+        assert "MCP_TOOL_TIMEOUT" not in os.environ
+
+    @pytest.mark.asyncio
+    async def test_reload_without_sessions_reaches_shared_client(
+        self, mcp_server, tmp_path, monkeypatch
+    ):
+        """Testa que a recarga sem sessões abertas vale para as próximas"""
+        config = tmp_path / "mcp.env"
+        config.write_text("MCP_JSONPLACEHOLDER_CACHE_TTL=600\nMCP_TOOL_TIMEOUT=12\n")
+        async with server.process_lifespan():
+            monkeypatch.setenv("MCP_CONFIG_FILE", str(config))
+            try:
+                assert server.reload_settings()
+            finally:
+                monkeypatch.delenv("MCP_CONFIG_FILE")
+                load_config_file()
+            async with create_connected_server_and_client_session(mcp_server) as client:
+                await client.call_tool("get_posts", {})
+            entry = server._shared.api_manager.client.cache.get(
+                "https://jsonplaceholder.typicode.com/posts"
+            )
+            tool_timeout = server._shared.tool_timeout
+
+        assert entry.policy.ttl == 600
+        assert tool_timeout == 12
+
+    @pytest.mark.asyncio
+    async def test_priority_follows_call_to_upstream(self, mcp_server):
+        """Testa que _meta.priority vale na fila de ferramentas e na da origem"""
+        server.metrics.reset()
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.call_tool("get_todos", {"user_id": 1},
+                                            meta={"priority": "batch"})
+
+        assert not result.isError
+        histograms = server.metrics.snapshot()["histograms"]
+        assert histograms["scheduler_wait_seconds{priority=batch,scheduler=tools}"]["count"] == 1
+        assert histograms[
+            "scheduler_wait_seconds{priority=batch,scheduler=jsonplaceholder}"
+        ]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sessions_share_the_tool_queue(self, mcp_server, app_contexts):
+        """Testa que as sessões esperam na mesma fila de ferramentas, uma vaga cada por vez"""
+        async with (
+            create_connected_server_and_client_session(mcp_server) as first,
+            create_connected_server_and_client_session(mcp_server) as second,
+        ):
+            scheduler = app_contexts[0].scheduler
+            capacity = scheduler.capacity
+            scheduler.resize(1)
+            await scheduler.acquire(server.Caller("ocupante"))
+            try:
+                calls = [
+                    asyncio.create_task(client.call_tool("get_posts", {}))
+                    for client in (first, second)
+                ]
+                for _ in range(100):
+                    if scheduler.queued == 2:
+                        break
+                    await asyncio.sleep(0.01)
+                waiting = scheduler.stats()["sessions_waiting"]["interactive"]
+                scheduler.release()
+                results = await asyncio.gather(*calls)
+            finally:
+                scheduler.resize(capacity)
+
+        assert app_contexts[1].scheduler is scheduler
+        assert waiting == 2
+        assert not any(result.isError for result in results)
+
+    @pytest.mark.asyncio
+    async def test_http_sessions_share_the_cache(self, mcp_server, monkeypatch):
+        """Testa que uma sessão HTTP nova encontra o cache preenchido pelas anteriores"""
+        requested = []
+        original = upstream
+
+        async def counting(request):
+            requested.append(request.url.path)
+            return await original(request)
+
+        monkeypatch.setattr(__name__ + ".upstream", counting)
+        monkeypatch.setattr(server.mcp.settings, "json_response", True)
+        monkeypatch.setattr(server.mcp, "_session_manager", None)
+        transport = httpx.ASGITransport(app=server.mcp.streamable_http_app())
+        headers = {"accept": "application/json, text/event-stream"}
+        initialize = {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": types.LATEST_PROTOCOL_VERSION, "capabilities": {},
+                "clientInfo": {"name": "teste", "version": "1"},
+            },
+        }
+        call = {
+            "jsonrpc": "2.0", "id": 2, "method": "tools/call",
+            "params": {"name": "get_posts", "arguments": {}},
+        }
+        results = []
+
+        async with server.process_lifespan(), server.mcp.session_manager.run(), httpx.AsyncClient(
+            transport=transport, base_url="http://localhost:8000"
+        ) as http:
+            for _ in range(2):
+                init = await http.post("/mcp", json=initialize, headers=headers)
+                session = {**headers, "mcp-session-id": init.headers["mcp-session-id"]}
+                await http.post("/mcp", headers=session,
+                                json={"jsonrpc": "2.0", "method": "notifications/initialized"})
+                response = await http.post("/mcp", json=call, headers=session)
+                results.append(response.json()["result"])
+                await http.delete("/mcp", headers=session)
+
+        assert results[0]["structuredContent"] == results[1]["structuredContent"] == {
+            "result": POSTS
+        }
+        assert requested == ["/posts"]
+
+    @pytest.mark.asyncio
+    async def test_sessions_share_the_prefetch_pool(self, mcp_server, monkeypatch):
+        """Testa que o lote buscado para uma sessão serve às seguintes"""
+        jokes_batch = [
+            {"id": i, "type": "general", "setup": f"Piada {i}", "punchline": "..."}
+            for i in range(1, 11)
+        ]
+        original = upstream
+
+        async def with_jokes(request):
+            if request.url.path == "/random_ten":
+                return httpx.Response(200, json=jokes_batch)
+            return await original(request)
+
+        monkeypatch.setattr(__name__ + ".upstream", with_jokes)
+        server.metrics.reset()
+        jokes = []
+        async with server.process_lifespan():
+            for _ in range(2):
+                async with create_connected_server_and_client_session(mcp_server) as client:
+                    result = await client.call_tool("get_random_joke", {})
+                    jokes.append(result.structuredContent["id"])
+
+        assert jokes[0] != jokes[1]
+        counters = server.metrics.snapshot()["counters"]
+        assert counters["pool_requests{pool=jokes,result=wait}"] == 1
+        assert counters["pool_requests{pool=jokes,result=hit}"] == 1
+
+    @pytest.mark.asyncio
+    async def test_upstream_error_sets_is_error(self, mcp_server):
+        """Testa que falhas da origem são sinalizadas como erro"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.call_tool("get_post_by_id", {"post_id": 999})
+
+        assert result.isError
+        assert "404" in result.content[0].text
+
+    @pytest.mark.asyncio
+    async def test_client_timeout_is_propagated(self, mcp_server):
+        """Testa que o timeout em _meta interrompe a requisição à origem"""
+        loop = asyncio.get_running_loop()
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            start = loop.time()
+            result = await client.call_tool("get_comments", {}, meta={"timeout": 0.05})
+            elapsed = loop.time() - start
+
+        assert result.isError
+        assert "Prazo esgotado" in result.content[0].text
+        assert elapsed < 1
+
+    @pytest.mark.asyncio
+    async def test_output_schema_from_models(self, mcp_server):
+        """Testa que o schema de saída vem dos modelos tipados"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            tools = {tool.name: tool for tool in (await client.list_tools()).tools}
+
+        user_schema = tools["get_user_by_id"].outputSchema
+        assert "company" in user_schema["properties"]
+        assert "userId" in tools["get_post_by_id"].outputSchema["properties"]
+
+
+class TestProgress:
+    """Testes do progresso e dos resultados parciais"""
+
+    @pytest.mark.asyncio
+    async def test_progress_and_partial_results(self, mcp_server):
+        """Testa que o progresso e os itens chegam antes do resultado final"""
+        progress = []
+        partial = []
+
+        async def on_progress(value, total, message):
+            progress.append((value, total))
+
+        async def on_log(params: types.LoggingMessageNotificationParams):
+            if params.logger == "partial_results":
+                partial.extend(params.data["items"])
+
+        async with create_connected_server_and_client_session(
+            mcp_server, logging_callback=on_log
+        ) as client:
+            result = await client.call_tool(
+                "get_posts", {}, progress_callback=on_progress,
+                meta={"partialResults": True},
+            )
+
+        assert result.structuredContent == {"result": POSTS}
+        assert partial == POSTS
+        assert progress and progress[-1][0] == progress[-1][1]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("arguments, expected", [
+        ({"fields": ["id"]}, [{"id": post["id"]} for post in POSTS]),
+        ({"max_tokens": 20}, POSTS[:1]),
+    ])
+    async def test_partial_results_match_final_result(self, mcp_server, arguments, expected):
+        """Testa que os itens parciais respeitam a projeção e a primeira página"""
+        partial = []
+
+        async def on_log(params: types.LoggingMessageNotificationParams):
+            if params.logger == "partial_results":
+                partial.extend(params.data["items"])
+
+        async def on_progress(value, total, message):
+            pass
+
+        async with create_connected_server_and_client_session(
+            mcp_server, logging_callback=on_log
+        ) as client:
+            result = await client.call_tool(
+                "get_posts", arguments, progress_callback=on_progress,
+                meta={"partialResults": True},
+            )
+
+        assert result.structuredContent == {"result": expected}
+        assert partial == expected
+
+    @pytest.mark.asyncio
+    async def test_qrcode_batch_reports_each_image(self, mcp_server):
+        """Testa a geração em lote com progresso por imagem, na ordem pedida"""
+        progress = []
+
+        async def on_progress(value, total, message):
+            progress.append((value, total))
+
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.call_tool(
+                "generate_qrcodes", {"texts": ["a", "b", "c"]},
+                progress_callback=on_progress,
+            )
+
+        assert not result.isError
+        assert [base64.b64decode(item.data) for item in result.content] == [b"a", b"b", b"c"]
+        assert progress[-1] == (3, 3)
+
+    @pytest.mark.asyncio
+    async def test_qrcode_as_resource_link(self, mcp_server):
+        """Testa o QR code como link blob:// lido com resources/read"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.call_tool(
+                "generate_qrcode", {"text": "abc", "as_resource": True}
+            )
+            link = result.content[0]
+            blob = await client.read_resource(link.uri)
+            with pytest.raises(McpError, match="Blob não encontrado"):
+                await client.read_resource(AnyUrl("blob://inexistente"))
+
+        assert link.type == "resource_link"
+        assert link.mimeType == "image/png"
+        assert base64.b64decode(blob.contents[0].blob) == b"abc"
+
+
+class TestBundles:
+    """Testes das ferramentas compostas"""
+
+    @pytest.mark.asyncio
+    async def test_user_profile_bundle(self, mcp_server):
+        """Testa que usuário e estatísticas dos todos vêm em uma só chamada"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.call_tool("get_user_profile_bundle", {"user_id": 1})
+            full = await client.call_tool(
+                "get_user_profile_bundle", {"user_id": 1, "include_todos": True}
+            )
+
+        assert not result.isError
+        assert result.structuredContent == {
+            "user": USER,
+            "todo_stats": {
+                "user_id": 1, "total": 2, "completed": 1, "pending": 1,
+                "completion_rate": 0.5,
+            },
+            "errors": {},
+        }
+        assert full.structuredContent["todos"] == TODOS
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_is_reported(self, mcp_server):
+        """Testa que a falha de uma parte aparece em errors"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.call_tool("get_user_profile_bundle", {"user_id": 2})
+
+        assert not result.isError
+        assert result.structuredContent["todo_stats"]["total"] == 0
+        assert "404" in result.structuredContent["errors"]["user"]
+
+    @pytest.mark.asyncio
+    async def test_all_parts_failing_is_an_error(self, mcp_server):
+        """Testa que é erro quando nenhuma parte é obtida"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.call_tool("get_daily_inspiration_bundle", {})
+
+        assert result.isError
+        assert "cat_fact" in result.content[0].text
+
+
+class TestAnalytics:
+    """Testes das agregações calculadas no servidor"""
+
+    @pytest.mark.asyncio
+    async def test_todo_stats(self, mcp_server):
+        """Testa que as contagens vêm prontas, sem a lista de todos"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.call_tool("get_todo_stats", {})
+
+        assert result.structuredContent == {"result": [{
+            "user_id": 1, "total": 2, "completed": 1, "pending": 1,
+            "completion_rate": 0.5,
+        }]}
+
+    @pytest.mark.asyncio
+    async def test_search_posts(self, mcp_server):
+        """Testa a busca textual em posts"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.call_tool("search_posts", {"query": "post 3"})
+
+        hits = result.structuredContent["result"]
+        assert hits[0]["id"] == 3
+        assert hits[0]["snippet"].startswith("Post 3")
+
+    @pytest.mark.asyncio
+    async def test_unchanged_cache_entry_is_not_decoded_again(self, mcp_server, monkeypatch):
+        """Testa que buscas e agregações sobre a mesma entrada do cache não a relêem"""
+        decoded = []
+        loads = server.offloader.loads
+
+        async def counting_loads(raw):
+            decoded.append(len(raw))
+            return await loads(raw)
+
+        monkeypatch.setattr(server.offloader, "loads", counting_loads)
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            await client.call_tool("search_posts", {"query": "post"})
+            await client.call_tool("get_todo_stats", {"user_id": 1})
+            first = len(decoded)
+            await client.call_tool("search_posts", {"query": "body"})
+            result = await client.call_tool("get_todo_stats", {"user_id": 1})
+
+        assert not result.isError
+        assert len(decoded) == first
+
+
+class TestResources:
+    """Testes dos recursos com dados e assinaturas"""
+
+    @pytest.mark.asyncio
+    async def test_posts_resource_returns_data(self, mcp_server):
+        """Testa que o recurso retorna os posts (e não só a descrição)"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            result = await client.read_resource(AnyUrl("posts://all"))
+
+        assert '"title": "Post 3"' in result.contents[0].text
+
+    @pytest.mark.asyncio
+    async def test_status_lists_upstreams_and_metrics(self, mcp_server):
+        """Testa que o status vem do registro de upstreams e inclui métricas"""
+        async with create_connected_server_and_client_session(mcp_server) as client:
+            await client.call_tool("get_posts", {})
+            result = await client.read_resource(AnyUrl("api://status"))
+
+        status = json.loads(result.contents[0].text)
+        assert set(status["apis"]) == {"jsonplaceholder", "catfacts", "jokes", "qrcode"}
+        assert "/posts/{post_id}" in status["apis"]["jsonplaceholder"]["endpoints"]
+        assert "upstream_requests{upstream=jsonplaceholder}" in status["metrics"]["counters"]
+        assert status["sessions"]["sessions"] == 1
+        assert status["event_loop"]["threshold"] > 0
+        assert status["memory"]["caches"]["responses"] > 0
+        assert status["scheduling"]["tools"]["in_use"] == 0
+        assert "jsonplaceholder" in status["scheduling"]["upstreams"]
+
+    @pytest.mark.asyncio
+    async def test_status_counts_every_session(self, mcp_server, app_contexts):
+        """Testa que as sessões dividem o mesmo registro de estados"""
+        async with (
+            create_connected_server_and_client_session(mcp_server) as first,
+            create_connected_server_and_client_session(mcp_server) as second,
+        ):
+            await first.call_tool("get_posts", {})
+            # Outros argumentos: a mesma chamada viria pronta do cache de resultados
+            await second.call_tool("get_posts", {"limit": 1})
+            result = await first.read_resource(AnyUrl("api://status"))
+
+        status = json.loads(result.contents[0].text)
+        assert status["sessions"]["sessions"] == 2
+        assert app_contexts[0].sessions is app_contexts[1].sessions
+
+    @pytest.mark.asyncio
+    async def test_loop_monitor_belongs_to_process(self, mcp_server):
+        """Testa que o monitor do loop vive com o processo, não com as sessões"""
+        async with server.process_lifespan():
+            async with create_connected_server_and_client_session(mcp_server) as client:
+                await client.call_tool("get_posts", {})
+            before = server.loop_monitor.stats()["samples"]
+            await asyncio.sleep(server.loop_monitor.interval * 2.5)
+            after = server.loop_monitor.stats()["samples"]
+
+        assert after > before
+        assert server.loop_monitor._task is None
+
+    @pytest.mark.asyncio
+    async def test_subscribers_are_notified_on_change(
+        self, mcp_server, app_contexts, monkeypatch
+    ):
+        """Testa o envio de resources/updated quando o refresher detecta mudança"""
+        updated = []
+
+        async def message_handler(message):
+            if isinstance(message, types.ServerNotification) and isinstance(
+                message.root, types.ResourceUpdatedNotification
+            ):
+                updated.append(str(message.root.params.uri))
+
+        async with create_connected_server_and_client_session(
+            mcp_server, message_handler=message_handler
+        ) as client:
+            init = await client.read_resource(AnyUrl("posts://all"))
+            await client.subscribe_resource(AnyUrl("posts://all"))
+            await client.subscribe_resource(AnyUrl("posts://2"))
+            await client.subscribe_resource(AnyUrl("posts://3"))
+
+            changed = [dict(post) for post in POSTS]
+            changed[1]["title"] = "Post 2 (editado)"
+            monkeypatch.setattr(__name__ + ".POSTS", changed)
+            refreshed = await app_contexts[0].refresher.refresh_once()
+            await asyncio.sleep(0.05)
+
+        assert init.contents
+        assert refreshed == ["posts://all", "posts://2"]
+        assert sorted(updated) == ["posts://2", "posts://all"]
+
+    @pytest.mark.asyncio
+    async def test_one_refresher_notifies_every_session(
+        self, mcp_server, app_contexts, monkeypatch
+    ):
+        """Testa que um só refresher revalida os recursos para todas as sessões"""
+        updated = []
+
+        async def message_handler(message):
+            if isinstance(message, types.ServerNotification) and isinstance(
+                message.root, types.ResourceUpdatedNotification
+            ):
+                updated.append(str(message.root.params.uri))
+
+        async with (
+            create_connected_server_and_client_session(
+                mcp_server, message_handler=message_handler
+            ) as first,
+            create_connected_server_and_client_session(
+                mcp_server, message_handler=message_handler
+            ) as second,
+        ):
+            await first.read_resource(AnyUrl("posts://all"))
+            for client in (first, second):
+                await client.subscribe_resource(AnyUrl("posts://all"))
+
+            changed = [dict(post) for post in POSTS]
+            changed[0]["title"] = "Post 1 (editado)"
+            monkeypatch.setattr(__name__ + ".POSTS", changed)
+            refresher = app_contexts[0].refresher
+            await refresher.refresh_once()
+            await asyncio.sleep(0.05)
+
+        assert app_contexts[1].refresher is refresher
+        assert updated == ["posts://all", "posts://all"]
+        assert refresher._task is None
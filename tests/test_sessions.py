@@ -0,0 +1,90 @@
+"""
+Testes para o estado por sessão
+"""
+import gc
+from types import SimpleNamespace
+
+from mcp_server_one.sessions import SessionStore
+
+
+class FakeClock:
+    """Relógio controlado manualmente"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSession:
+    """Sessão fake (referenciada fracamente pelo SessionStore)"""
+
+
+def request_context(session=None, headers=None):
+    request = SimpleNamespace(headers=headers or {}, query_params={}) if headers else None
+    return SimpleNamespace(request=request, session=session)
+
+
+class TestSessionStore:
+    """Testes para SessionStore"""
+
+    def test_state_is_kept_per_session(self):
+        """Testa que cada sessão tem seu próprio estado"""
+        store = SessionStore()
+        store.get("a").seen_in("jokes").add(1)
+
+        assert store.get("a").seen_in("jokes") == {1}
+        assert store.get("b").seen_in("jokes") == set()
+
+    def test_idle_sessions_are_evicted(self):
+        """Testa a remoção de sessões inativas"""
+        clock = FakeClock()
+        store = SessionStore(idle_timeout=10, clock=clock)
+        store.get("a")
+        clock.now = 5
+        store.get("b")
+        clock.now = 12
+        store.get("b")
+
+        assert len(store) == 1
+        assert store.stats()["evicted"] == 1
+
+    def test_max_sessions(self):
+        """Testa o limite de sessões (remove a menos usada)"""
+        store = SessionStore(max_sessions=2)
+        store.get("a")
+        store.get("b")
+        store.get("a")
+        store.get("c")
+
+        assert store.stats()["sessions"] == 2
+        assert store.get("a").seen_in("x") == set()
+        assert len(store) == 2
+
+    def test_session_id_from_http_header(self):
+        """Testa que o ID vem do cabeçalho mcp-session-id"""
+        store = SessionStore()
+        state = store.for_request(request_context(headers={"mcp-session-id": "abc"}))
+
+        assert state.session_id == "abc"
+
+    def test_local_session_is_dropped_when_collected(self):
+        """Testa que sessões sem ID são removidas quando coletadas"""
+        store = SessionStore()
+        session = FakeSession()
+        store.for_request(request_context(session))
+        assert len(store) == 1
+
+        del session
+        gc.collect()
+        assert len(store) == 0
+
+    def test_memory_usage(self):
+        """Testa a estimativa de memória por sessão"""
+        store = SessionStore()
+        state = store.get("a")
+        state.cursors.paginate([{"id": i} for i in range(100)], max_tokens=10)
+        state.seen_in("jokes").update(range(10))
+
+        assert store.stats()["memory_bytes"] == state.memory_bytes() > 0
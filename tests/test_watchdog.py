@@ -0,0 +1,75 @@
+"""
+Testes do monitor do event loop
+"""
+import asyncio
+import logging
+import time
+
+import pytest
+
+from mcp_server_one.config import loop_monitor_settings
+from mcp_server_one.metrics import metrics
+from mcp_server_one.watchdog import LoopMonitor
+
+
+def blocking_call(seconds: float) -> None:
+    """Segura o event loop, como um json.dumps grande"""
+    time.sleep(seconds)
+
+
+class TestLoopMonitor:
+    """Testes para LoopMonitor"""
+
+    def test_record_counts_blocked(self):
+        """Testa o histograma e a contagem de bloqueios a partir do limite"""
+        metrics.reset()
+        monitor = LoopMonitor(threshold=0.05)
+        monitor.record(0.001)
+        monitor.record(0.2)
+
+        stats = monitor.stats()
+        assert stats["samples"] == 2
+        assert stats["blocked"] == 1
+        assert stats["max_lag"] == 0.2
+        assert metrics.snapshot()["histograms"]["event_loop_lag_seconds"]["count"] == 2
+        assert metrics.counter("event_loop_blocked") == 1
+
+    @pytest.mark.asyncio
+    async def test_measures_lag_of_blocking_call(self):
+        """Testa que uma chamada síncrona aparece como atraso do loop"""
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.03)
+            blocking_call(0.1)
+            await asyncio.sleep(0.03)
+        finally:
+            await monitor.stop()
+
+        assert monitor.max_lag >= 0.08
+        assert monitor.blocked >= 1
+        assert monitor.last_block is None
+
+    @pytest.mark.asyncio
+    async def test_debug_logs_blocking_stack(self, caplog):
+        """Testa que o modo de depuração registra a pilha do bloqueio"""
+        monitor = LoopMonitor(interval=0.01, threshold=0.05, debug=True)
+        with caplog.at_level(logging.WARNING, logger="mcp_server_one.watchdog"):
+            monitor.start()
+            try:
+                await asyncio.sleep(0.03)
+                blocking_call(0.2)
+                await asyncio.sleep(0.03)
+            finally:
+                await monitor.stop()
+
+        assert "blocking_call" in caplog.text
+        assert any("time.sleep" in line for line in monitor.last_block["stack"])
+
+
+def test_loop_monitor_settings():
+    """Testa as variáveis MCP_LOOP_DEBUG e MCP_LOOP_BLOCK_THRESHOLD"""
+    assert loop_monitor_settings({}) == (False, 0.1)
+    assert loop_monitor_settings({
+        "MCP_LOOP_DEBUG": "1", "MCP_LOOP_BLOCK_THRESHOLD": "0.25",
+    }) == (True, 0.25)